@@ -0,0 +1,33 @@
+#! /usr/bin/env python
+from __future__ import unicode_literals
+
+import webapp2
+
+from google.appengine.ext.webapp.util import run_wsgi_app
+
+from lib.constants import HTTP_CODE as http_code
+from lib.response import JsonResponse
+
+from models.score import ScoreIngester
+
+class MainPage(webapp2.RequestHandler):
+    def get(self):
+        result = ScoreIngester().ingest()
+
+        self.response.headers['Content-Type'] = 'application/json'
+        self.response.set_status(http_code.OK)
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
+
+
+app = webapp2.WSGIApplication([('/helper/scores', MainPage)],
+                              debug=True)
+
+
+def main():
+    run_wsgi_app(app)
+
+if __name__ == "__main__":
+    main()
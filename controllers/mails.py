@@ -1,21 +1,28 @@
 #! /usr/bin/env python
 
 import datetime
+import hashlib
 import string
 import logging
 try: import simplejson as json
 except ImportError: import json
 
-from lxml import html
-from lxml.html.clean import Cleaner
 from collections import deque
 
+from lib.cache import LocalCache
 from lib.constants import NFL as nfl
+from lib.pick_sheet import PickSheetParser
+from lib.pick_sheet import group_picks
+from lib.pick_sheet import team_abbreviation
 from lib.utils import Utils as utils
 
 from google.appengine.api import mail
+from google.appengine.api import taskqueue
+from google.appengine.ext import db
+from google.appengine.ext import deferred
 from google.appengine.ext import webapp
 
+from models.mail import MailModel
 from models.score import ScoreFactory
 from models.spread import SpreadFactory
 
@@ -23,23 +30,59 @@ from google.appengine.ext.webapp.mail_handlers import InboundMailHandler
 from google.appengine.ext.webapp.util import run_wsgi_app
 
 class ReceiveMail(InboundMailHandler):
-    __SENDER = ''
-
     """
+    Receives the spread sheets mailed in by players
     """
+    __SENDER = ''
+    __GAME_IDS_CAPACITY = 4
+    __GAME_IDS_THRESHOLD = 3600 # 1 hour in seconds
+
+    # Teams of each week, kept for the life of the instance
+    game_ids = LocalCache(__GAME_IDS_CAPACITY, __GAME_IDS_THRESHOLD)
 
     def receive(self, message):
         """Event that is fired upon receiving an email
 
+        The message is stored and left to a task to parse and save, under a
+        hash of the raw message. Messages received again are not queued
+        twice.
+        """
+        # Messages not built from a received MIME message have no original
+        original = getattr(message, 'original', None) or message.to_mime_message()
+        raw = original.as_string()
+        digest = self._message_digest(raw)
+        key = MailModel.build_key(digest)
+
+        if MailModel.get(key) == None:
+            MailModel(
+                key_name=key.name(),
+                sender=getattr(message, 'sender', ""),
+                subject=getattr(message, 'subject', ""),
+                message=db.Text(raw, encoding='utf-8')).put()
+
+        try:
+            deferred.defer(_process_mail, key.name(), _name="mail-" + digest)
+        except (taskqueue.TaskAlreadyExistsError, taskqueue.TombstonedTaskError):
+            logging.info("Mail " + digest + " was already queued")
+
+    def process(self, message):
+        """
+        Parses the spread out of the message, saves it and confirms it to
+        the sender
         """
         result = []
+        errors = []
 
         try:
             spread_data = self._parse_for_spread_data(message)
             player_picks = self._map_data_to_dict(spread_data)
+            (id_table, errors) = self._convert_to_id_table(player_picks)
 
-            for name, pick in self._convert_to_id_table(player_picks).iteritems():
+            for name, pick in id_table.iteritems():
                 result.append(self._convert_to_spread_object(name, pick))
+
+            for error in errors:
+                logging.warning(error)
         except Exception, e:
             logging.error(e)
             result = [e]
@@ -49,34 +92,33 @@ class ReceiveMail(InboundMailHandler):
             logging.info('result')
             logging.info(result)
             spread.save(utils.default_week(), result)
-            self._success(message.to, message.sender, message.subject, result)
+            self._success(message.to, message.sender, message.subject, result, errors)
             #self._debug_message(message.to, message.sender, message.subject, result)
 
         
+    def _message_digest(self, raw):
+        """
+        Hashes the whole raw message, so messages without an HTML body are
+        told apart too
+        """
+        if isinstance(raw, unicode):
+            raw = raw.encode('utf-8')
+
+        return hashlib.sha1(raw).hexdigest()
+
     def _parse_for_spread_data(self, message):
         htmltext = message.bodies('text/html')
-        tree = None
-        tables = None
-        cleaner = Cleaner(style=True,
-                          links=True,
-                          page_structure=True,
-                          javascript=True,
-                          scripts=True,
-                          remove_tags=(['font','div', 'u', 'b', 'i']))
+        parser = PickSheetParser(remove_tags=(['font','div', 'u', 'b', 'i']))
         result = []
 
         for content_type, body in htmltext:
             decoded = body.decode()
 
-            tree = self._filter_and_transform_to_tree(decoded)
-
-            tables = tree.xpath('//tbody')
-            for page in tables:
+            # Rows are read straight off the parser, without a tree
+            for page in parser.tables(self._filter_html(decoded)):
                 spread_data = []
 
-                for row in cleaner.clean_html(page):
-                    cell_row_data = self._extract_elements_from_tr(row)
-
+                for cell_row_data in page:
                     if len(cell_row_data) > 1:
                         if 'DEFAULT PICK' in cell_row_data[0] or 'POINTS' in cell_row_data[0]:
                             # no one cares about season meta-data
@@ -137,85 +179,67 @@ class ReceiveMail(InboundMailHandler):
 
 
     def _convert_to_id_table(self, player_picks):
+        """
+        Maps the picks of every player to the games of the week.
+
+        Teams are stored under the name the scoreboard uses for them.
+        Picks that match no game are left out, and reported back as errors
+        rather than dropping the whole sheet.
+
+        Returns the picks of each player keyed by game_id, and the list of
+        errors
+        """
         mapping = self._get_game_ids_map()
         result = {}
-        picks = []
+        errors = []
 
         for player_name in player_picks:
-            picks = deque(player_picks[player_name])
-            canary = 1000
-
             result[player_name] = {}
-            while len(picks) > 0 and canary > 0:
-                item = []
-                # get the game data
-                if len(picks) > 2:
-                    try:
-                        float(picks[2])
-
-                        # Spread, Over/Under, & Total Score
-                        for i in range(0,3):
-                            item.append(picks.popleft())
-                    except ValueError:
-                        # Single-game pick
-                        item.append(picks.popleft())
-                else:
-                    item.append(picks.popleft())
 
-                # Guard against scratched picks
-                if item[0] != 'X' and item[0] != 'x':
-                    # match to id
-                    try:
-                        game_id = unicode(mapping[item[0]])
-                    except KeyError:
-                        logging.error('KeyError during mapping')
-                        if len(item) > 0:
-                            logging.error(item[0])
-                        logging.error(player_name)
-                        logging.error(player_picks)
+            for (row, item) in group_picks(player_picks[player_name]):
+                game = mapping.get(team_abbreviation(item[0]))
 
+                if game == None:
+                    errors.append(
+                        player_name + ", pick " + unicode(row) + ": no game for '" +
+                        item[0] + "'")
+                    continue
 
-                        # Bail from error
-                        return []
+                (game_id, team_name) = game
+                result[player_name][unicode(game_id)] = [team_name] + item[1:]
 
-                    # Save
-                    result[player_name][game_id] = item
+        return (result, errors)
 
-                canary -= 1
+    def _get_game_ids_map(self):
+        """
+        Returns the game_id of each team playing this week, and the name the
+        scoreboard uses for the team, keyed by the team's abbreviation.
+        """
+        week = utils.default_week()
+        result = ReceiveMail.game_ids.get(week)
 
-        return result
+        if result != None:
+            return result
 
-    def _get_game_ids_map(self):
         score_factory = ScoreFactory().get_instance(depth=4)
-        scores = score_factory.fetch(utils.default_week())
+        scores = score_factory.fetch(week) or []
         result = {}
 
         for game in scores:
-            result[game['home_name']] = game['game_id']
-            result[game['away_name']] = game['game_id']
+            for team_name in (game['home_name'], game['away_name']):
+                result[team_abbreviation(team_name)] = (game['game_id'], team_name)
 
-        # Workaround for arizona
-        # TODO: in wrong place; should trust source of truth
-        if 'ARI' in result:
-            result['AZ'] = result['ARI']
+        if len(result) > 0:
+            ReceiveMail.game_ids.put(week, result)
 
         return result
 
 
-    def _filter_and_transform_to_tree(self, html_string):
+    def _filter_html(self, html_string):
         # Filter out newlines, tabs, return carriages, and '*' characters
         trans_table = string.maketrans('\n\t\r*', '    ')
-        stripped = html_string.encode('utf-8').translate(trans_table)
-
-        # Load html tree & grab the tables
-        return html.fromstring(stripped)
-
-
-    def _extract_elements_from_tr(self, row):
-        transform = lambda x: x.text.strip()
-        condition = lambda x: x.text != None and len(x.text.strip()) > 0 and '/' not in x.text and '-' not in x.text
 
-        return [transform(x) for x in row if condition(x)]
+        return html_string.encode('utf-8').translate(trans_table)
 
 
     def _convert_to_spread_object(self, owner_name, spread_data):
@@ -231,9 +255,9 @@ class ReceiveMail(InboundMailHandler):
         return result
 
 
-    def _success(self, email_sender, email_target, subject, spread_data):
+    def _success(self, email_sender, email_target, subject, spread_data, errors=[]):
         """
-        Sends an email
+        Sends an email, listing the picks that could not be saved
         """
         if subject == None or len(subject) == 0:
             subject = 'OG FOOTBALL LEAGUE'
@@ -247,13 +271,21 @@ class ReceiveMail(InboundMailHandler):
                             Reclaimer,
 
                             This is our notification that the spread was processed and saved.
-
+                            %s
 
                             -- Arbiter
-                            """
+                            """ % self._format_errors(errors)
 
         message_ping.send()
 
+    def _format_errors(self, errors):
+        if len(errors) == 0:
+            return ""
+
+        return ("\n                            These picks matched no game and were left out:\n" +
+                "".join("\n                            " + error for error in errors) +
+                "\n")
+
     def _debug_message(self, email_sender, email_target, subject, spread_data):
         """
         Sends an email
@@ -270,6 +302,20 @@ class ReceiveMail(InboundMailHandler):
 
         message_ping.send()
 
+def _process_mail(key_name):
+    """
+    Deferred task queued by ReceiveMail for every new message
+    """
+    model = MailModel.get_by_key_name(key_name)
+
+    if model == None or model.processed:
+        return
+
+    ReceiveMail().process(mail.InboundEmailMessage(model.message.encode('utf-8')))
+
+    model.processed = True
+    model.put()
+
 application = webapp.WSGIApplication([
     ReceiveMail.mapping()
 ], debug=True)
@@ -12,8 +12,11 @@ from lib.constants import DATA_BLOB as d
 from lib.constants import HTTP_CODE as http_code
 from lib.constants import NFL as nfl
 from lib.constants import PARAM_TYPES as pt
+from lib.http_cache import HttpCache
+from lib.response import JsonResponse
 from lib.utils import Utils as utils
 
+from models.game_record import GameRecord
 from models.score import ScoreFactory
 
 class ScoresHandler(webapp2.RequestHandler):
@@ -30,12 +33,18 @@ class ScoresHandler(webapp2.RequestHandler):
         week = (self._validate_params(d.GAME_WEEK, week_req) or
                 utils.default_week())
 
-        result = score.fetch(week)
+        result = GameRecord.to_dicts(score.fetch(week))
+        body = JsonResponse.encode(self.request, result)
 
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
+
+        if HttpCache.validate(self.request, self.response, "SCORES_W" + unicode(week), body,
+                              JsonResponse.content_encoding(self.request, body)):
+            return
+
         self.response.set_status(http_code.OK)
-        self.response.out.write(json.dumps(result, indent = 4))
+        JsonResponse.write(self.request, self.response, body)
 
     def options(self):
         self.response.headers['Access-Control-Allow-Origin'] = 'http://spread.hellaballer.com'
@@ -69,7 +78,10 @@ class ScoresHandler(webapp2.RequestHandler):
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
         self.response.set_status(result['status_code'])
-        self.response.out.write(json.dumps(result, indent = 4))
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
 
     def _validate_params(self, key, value):
         conversion_key = pt.score.get(key.lower(), "")
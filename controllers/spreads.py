@@ -12,6 +12,8 @@ from lib.constants import DATA_BLOB as d
 from lib.constants import HTTP_CODE as http_code
 from lib.constants import NFL as nfl
 from lib.constants import PARAM_TYPES as pt
+from lib.http_cache import HttpCache
+from lib.response import JsonResponse
 from lib.utils import Utils as utils
 
 from models.spread import SpreadFactory
@@ -28,11 +30,17 @@ class SpreadsHandler(webapp2.RequestHandler):
                 utils.default_week())
 
         result = spread.fetch(week)
+        body = JsonResponse.encode(self.request, result)
 
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
+
+        if HttpCache.validate(self.request, self.response, "SPREADS_W" + unicode(week), body,
+                              JsonResponse.content_encoding(self.request, body)):
+            return
+
         self.response.set_status(http_code.OK)
-        self.response.out.write(json.dumps(result, indent = 4))
+        JsonResponse.write(self.request, self.response, body)
 
     def post(self):
         spread = SpreadFactory().get_instance()
@@ -77,7 +85,10 @@ class SpreadsHandler(webapp2.RequestHandler):
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
         self.response.set_status(result["status_code"])
-        self.response.out.write(json.dumps(result["data"], indent = 4))
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result["data"]))
 
     def _validate_params(self, key, value):
         conversion_key = pt.spread.get(key.lower(), "")
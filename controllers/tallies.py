@@ -14,6 +14,7 @@ from lib.constants import DATA_BLOB as d
 from lib.constants import HTTP_CODE as http_code
 from lib.constants import NFL as nfl
 from lib.constants import PARAM_TYPES as pt
+from lib.response import JsonResponse
 
 from models.tally import TallyCalculator
 
@@ -33,7 +34,10 @@ class MainPage(webapp2.RequestHandler):
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
         self.response.set_status(http_code.OK)
-        self.response.out.write(json.dumps(result, indent = 4))
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
 
     def _default_week(self):
         time_delta = datetime.datetime.now() - nfl.WEEK_ONE[nfl.YEAR]
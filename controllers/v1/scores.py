@@ -1,8 +1,13 @@
 from __future__ import unicode_literals
 
-import json
 import webapp2
 
+from lib.constants import HTTP_CODE as http_code
+from lib.constants import NFL as nfl
+from lib.http_cache import HttpCache
+from lib.response import JsonResponse
+from models.game_record import GameRecord
+from models.score import ScoreFactory
 from models.v1.score import Score
 
 class WeeklyScores(webapp2.RequestHandler):
@@ -22,4 +27,89 @@ class WeeklyScores(webapp2.RequestHandler):
 
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
-        self.response.write(json.dumps(result, indent = 4))
\ No newline at end of file
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
+
+class WeeklyScoreChanges(webapp2.RequestHandler):
+    def get(self, year, week):
+        """
+        GET only the games that changed since the version token given as
+        ?since=<token>. Without a token, or with one that is too old, the
+        full week is returned.
+        """
+        year = int(year)
+        week = int(week)
+        since = self._validate_token(self.request.get('since'))
+        result = None
+
+        self.response.headers['Content-Type'] = 'application/json'
+        self.response.headers['Access-Control-Allow-Origin'] = '*'
+
+        # The score chain only tracks the current season
+        if year == nfl.YEAR:
+            score = ScoreFactory().get_instance()
+            version = score.version(week)
+
+            # Clients holding the current version are answered before any fetch
+            if version != None and HttpCache.validate_version(
+                    self.request, self.response, version):
+                return
+
+            result = score.fetch_changes(week, since)
+
+        self._write_changes(result)
+
+    def _write_changes(self, result):
+        if result == None:
+            self.response.set_status(http_code.NOT_FOUND)
+            result = {}
+        else:
+            result['data'] = GameRecord.to_dicts(result['data'])
+
+            if result['version'] != None and HttpCache.validate_version(
+                    self.request, self.response, result['version']):
+                return
+
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
+
+    def _validate_token(self, token):
+        try:
+            return int(token)
+        except ValueError:
+            return None
+
+class WeeklyScoreStream(WeeklyScoreChanges):
+    MAX_TIMEOUT = 25    # seconds; well under the request deadline
+
+    def get(self, year, week):
+        """
+        Long-poll for changes: GET returns as soon as the week moves past
+        ?since=<token>, or after ?timeout=<seconds> with no games.
+
+        Waiting viewers only check the version of the week, and share the
+        one refresh of it, so they do not each fetch the scoreboard.
+        """
+        year = int(year)
+        week = int(week)
+        since = self._validate_token(self.request.get('since'))
+        timeout = self._validate_token(self.request.get('timeout'))
+        result = None
+
+        if timeout == None or timeout > WeeklyScoreStream.MAX_TIMEOUT:
+            timeout = WeeklyScoreStream.MAX_TIMEOUT
+        elif timeout < 0:
+            timeout = 0
+
+        self.response.headers['Content-Type'] = 'application/json'
+        self.response.headers['Access-Control-Allow-Origin'] = '*'
+
+        # The score chain only tracks the current season
+        if year == nfl.YEAR:
+            result = ScoreFactory().get_instance().watch(week, since, timeout)
+
+        self._write_changes(result)
@@ -0,0 +1,66 @@
+from __future__ import unicode_literals
+
+import webapp2
+
+from lib.constants import HTTP_CODE as http_code
+from lib.constants import NFL as nfl
+from lib.http_cache import HttpCache
+from lib.response import JsonResponse
+from models.tally import TallyCalculator
+
+class WeeklyStandings(webapp2.RequestHandler):
+    def get(self, year, week):
+        """
+        GET the live standings of every owner for the week
+        """
+        year = int(year)
+        week = int(week)
+        result = None
+
+        # Standings are only kept for the current season
+        if year == nfl.YEAR:
+            result = TallyCalculator().standings(week)
+
+        self.response.headers['Content-Type'] = 'application/json'
+        self.response.headers['Access-Control-Allow-Origin'] = '*'
+
+        if result == None:
+            self.response.set_status(http_code.NOT_FOUND)
+            result = {}
+
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
+
+class YearlyStandings(webapp2.RequestHandler):
+    def get(self, year):
+        """
+        GET the ranked standings of every owner for the season, with their
+        total points and the points of each category.
+
+        The standings only change when a week is tallied, so clients keep
+        their copy until then by revalidating it.
+        """
+        year = int(year)
+        result = TallyCalculator().season_standings(year)
+
+        self.response.headers['Content-Type'] = 'application/json'
+        self.response.headers['Access-Control-Allow-Origin'] = '*'
+
+        if result == None:
+            self.response.set_status(http_code.NOT_FOUND)
+            JsonResponse.write(
+                self.request,
+                self.response,
+                JsonResponse.encode(self.request, {}))
+            return
+
+        body = JsonResponse.encode(self.request, result)
+
+        if HttpCache.validate(self.request, self.response, "STANDINGS_S" + unicode(year), body,
+                              JsonResponse.content_encoding(self.request, body)):
+            return
+
+        self.response.set_status(http_code.OK)
+        JsonResponse.write(self.request, self.response, body)
@@ -1,10 +1,14 @@
-import json
 import webapp2
 
+from lib.response import JsonResponse
+
 class StatusPage(webapp2.RequestHandler):
     def get(self):
         result = { 'status': 'OK'}
 
         self.response.headers['Content-Type'] = 'application/json'
         self.response.headers['Access-Control-Allow-Origin'] = '*'
-        self.response.write(json.dumps(result, indent = 4))
\ No newline at end of file
+        JsonResponse.write(
+            self.request,
+            self.response,
+            JsonResponse.encode(self.request, result))
\ No newline at end of file
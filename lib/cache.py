@@ -0,0 +1,67 @@
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from collections import OrderedDict
+
+class LocalCache(object):
+    """
+    Bounded, in-process LRU cache whose entries expire after a fixed age.
+
+    Entries live as long as the instance does, so they are only shared by
+    requests served by the same instance. Those may run on several threads,
+    so every change to the entries is made under a lock.
+    """
+    def __init__(self, capacity, threshold):
+        """
+        arguments:
+        capacity -- maximum number of entries kept
+        threshold -- age in seconds after which an entry is a miss
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+
+            if entry is None or (time.time() - entry[0]) >= self.threshold:
+                self.misses += 1
+                return None
+
+            # Re-insert to mark as most recently used
+            self.entries[key] = entry
+            self.hits += 1
+
+        return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (time.time(), value)
+
+            # Evict the least recently used entries
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def flush(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries)
+        }
@@ -0,0 +1,87 @@
+from __future__ import unicode_literals
+
+try: import simplejson as json
+except ImportError: import json
+import logging
+import marshal
+
+class CacheCodec(object):
+    """
+    Turns cache entries into memcache values and back.
+
+    Binary codecs start every value with their version byte. Values without
+    one are JSON, the way entries were stored before codecs, so they are
+    still read after a codec is switched on. Values of another version are
+    misses, to be refreshed from the rest of the chain.
+    """
+    VERSION = None
+
+    def encode(self, entry):
+        raise NotImplementedError("Subclasses should implement this")
+
+    def decode(self, value):
+        """
+        Returns the entry value holds, or None if it cannot be decoded
+        """
+        try:
+            if self.VERSION != None and value[:1] == self.VERSION:
+                return self._decode(value[1:])
+
+            return json.loads(value)
+        except (EOFError, TypeError, ValueError):
+            logging.warning("Unable to decode a cache entry")
+
+        return None
+
+    def _decode(self, value):
+        raise NotImplementedError("Subclasses should implement this")
+
+class JsonCodec(CacheCodec):
+    """
+    Entries as plain JSON
+    """
+    def __init__(self, default=None):
+        """
+        arguments:
+        default -- encodes what json cannot, as json.dumps(default=...)
+        """
+        self.default = default
+
+    def encode(self, entry):
+        return json.dumps(entry, ensure_ascii=False, default=self.default)
+
+class MarshalCodec(CacheCodec):
+    """
+    Entries in marshal format, which takes built-in types only but encodes
+    and decodes them without going through text.
+
+    Entries marshal cannot take are stored as JSON instead. Subclasses pack
+    entries into built-in types on the way in, and unpack them on the way
+    out.
+    """
+    VERSION = b'\x01'
+    __MARSHAL_VERSION = 2
+
+    def __init__(self, default=None):
+        """
+        arguments:
+        default -- encodes what json cannot, for entries stored as JSON
+        """
+        self.fallback = JsonCodec(default)
+
+    def encode(self, entry):
+        try:
+            return self.VERSION + marshal.dumps(
+                self._pack(entry),
+                MarshalCodec.__MARSHAL_VERSION)
+        except ValueError:
+            return self.fallback.encode(entry)
+
+    def _decode(self, value):
+        return self._unpack(marshal.loads(value))
+
+    def _pack(self, entry):
+        return entry
+
+    def _unpack(self, entry):
+        return entry
@@ -12,8 +12,13 @@ class CONSTANTS():
         "SAT": 5,
         "SUN": 6
     }
+    EASTERN_OFFSET = -5     # hours from UTC in standard time; game days are Eastern
     ENCODING = "UTF-8"
+    FINAL_STATUS = "Final"  # Also prefixes "Final Overtime"
+    LIVE_THRESHOLD = 60
     MEMCACHE_THRESHOLD = 300
+    PREGAME_STATUS = "Pregame"
+    PREGAME_THRESHOLD = 3600
 
 class DATA_BLOB():
     AWAY_NAME = "away_name"
@@ -35,6 +40,7 @@ class DATA_BLOB():
 class HTTP_CODE():
     OK = 200
     CREATED = 201
+    NOT_MODIFIED = 304
     NOT_FOUND = 404
     INTERNAL_SERVER_ERROR = 500
 
@@ -46,6 +52,11 @@ class NFL():
         2015: datetime.datetime(2015, 8, 4, 0, 0, 0),
         2016: datetime.datetime(2015, 8, 9, 0, 0, 0)
     }
+    TEAM_ALIAS = {
+        "AZ": "ARI",
+        "JAC": "JAX",
+        "WSH": "WAS"
+        }
     TEAM_NAME = {
         "ARIZONA": "ARI",
         "ATLANTA": "ATL",
@@ -0,0 +1,125 @@
+from __future__ import unicode_literals
+
+class Future(object):
+    """
+    Result of a fetch that was started, but not yet waited on.
+
+    The resolver waits on whatever the fetch started (memcache, datastore or
+    urlfetch RPCs) and turns it into the result. It runs once, the first
+    time the result is asked for.
+
+    Fetches that go through several steps, such as a cache miss falling
+    through to the next link of a chain, can also be advanced one step at a
+    time, so the steps of several fetches overlap; see wait_all.
+    """
+    def __init__(self, resolver, advance=None):
+        """
+        arguments:
+        resolver -- callable returning the result
+        advance -- callable waiting on the RPC of the current step and
+            starting the next, returning whether a step was started
+        """
+        self.__resolver = resolver
+        self.__advance = advance
+        self.__done = False
+        self.__result = None
+
+    def get_result(self):
+        if not self.__done:
+            self.__result = self.__resolver()
+            self.__done = True
+            self.__resolver = None
+            self.__advance = None
+
+        return self.__result
+
+    def advance(self):
+        """
+        Waits on the RPC of the current step only and starts the RPC of the
+        next step, without waiting on it.
+
+        Returns whether a step was started, i.e. whether there may be more
+        to advance
+        """
+        if self.__advance == None:
+            return False
+
+        return self.__advance()
+
+    def then(self, callback):
+        """
+        Returns a Future of callback(result), advancing as this one does
+        """
+        return Future(lambda: callback(self.get_result()), self.advance)
+
+    @staticmethod
+    def resolved(value):
+        """
+        Returns a Future of a result that is already known
+        """
+        return Future(lambda: value)
+
+    @staticmethod
+    def wait_all(futures):
+        """
+        Advances every future a step at a time, in turns, so the RPCs each
+        step starts run alongside those of the other futures. Returns their
+        results, in order.
+        """
+        while True:
+            # Every future is advanced each turn, not only the first to move
+            started = [future.advance() for future in futures]
+
+            if not any(started):
+                break
+
+        return [future.get_result() for future in futures]
+
+class FallThrough(Future):
+    """
+    Future of a fetch through a chain of links: the link's own read, then,
+    if that misses, the rest of the chain.
+
+    Advancing waits on the link's own read and, on a miss, starts the rest of
+    the chain right away; the rest is then advanced in turn.
+    """
+    def __init__(self, pending, fall_through):
+        """
+        arguments:
+        pending -- Future of the link's own read; None or an empty result is
+            a miss
+        fall_through -- callable starting the rest of the chain, returning a
+            Future of the result to return on a miss
+        """
+        super(FallThrough, self).__init__(self.__resolve, self.__step)
+
+        self.__pending = pending
+        self.__fall_through = fall_through
+        self.__checked = False
+        self.__rest = None
+
+    def __check(self):
+        self.__checked = True
+        result = self.__pending.get_result()
+
+        if result == None or len(result) == 0:
+            self.__rest = self.__fall_through()
+
+    def __step(self):
+        if not self.__checked:
+            self.__check()
+
+            return self.__rest != None
+        elif self.__rest != None:
+            return self.__rest.advance()
+
+        return False
+
+    def __resolve(self):
+        if not self.__checked:
+            self.__check()
+
+        if self.__rest != None:
+            return self.__rest.get_result()
+
+        return self.__pending.get_result()
@@ -0,0 +1,133 @@
+from __future__ import unicode_literals
+
+import datetime
+import hashlib
+
+from email.utils import formatdate
+from email.utils import mktime_tz
+from email.utils import parsedate_tz
+
+from google.appengine.api import memcache
+
+from lib.constants import CONSTANTS as c
+from lib.constants import HTTP_CODE as http_code
+
+class HttpCache(object):
+    """
+    Conditional GET support for JSON handlers.
+
+    The ETag is a hash of the serialized body. Last-Modified is the first
+    time that ETag was seen for a resource, tracked in memcache.
+    """
+    __PREFIX = "LASTMOD_"
+    CACHE_CONTROL = "public, max-age=0, must-revalidate"
+    VARY = "Accept-Encoding"
+
+    @staticmethod
+    def validate(request, response, tag, body, variant=None):
+        """
+        Sets the cache validators for body on the response.
+
+        Returns True if the client's copy is still current, in which case the
+        response has been turned into an empty 304.
+
+        arguments:
+        request -- the incoming webapp2 request
+        response -- the outgoing webapp2 response
+        tag -- name of the resource, e.g. the week being served
+        body -- the serialized response body
+        variant -- content encoding the body is sent with, if any
+        """
+        etag = HttpCache.etag(body)
+        last_modified = HttpCache.last_modified(tag, etag)
+
+        # Each content encoding is its own representation
+        if variant != None:
+            etag = etag[:-1] + '-' + variant + '"'
+
+        HttpCache.__set_validators(response, etag, last_modified)
+
+        if HttpCache.is_current(request, etag, last_modified):
+            response.set_status(http_code.NOT_MODIFIED)
+            return True
+
+        return False
+
+    @staticmethod
+    def validate_version(request, response, version):
+        """
+        Sets the cache validators for a resource whose version token moves
+        every time it changes, so they can be checked before the body is
+        built.
+
+        Returns True if the client's copy is still current, in which case the
+        response has been turned into an empty 304.
+
+        arguments:
+        request -- the incoming webapp2 request
+        response -- the outgoing webapp2 response
+        version -- version token of the resource, in seconds since the epoch
+        """
+        # Weak, as the same version is sent under every content encoding
+        etag = 'W/"' + unicode(version) + '"'
+
+        HttpCache.__set_validators(response, etag, version)
+
+        if HttpCache.is_current(request, etag, version):
+            response.set_status(http_code.NOT_MODIFIED)
+            return True
+
+        return False
+
+    @staticmethod
+    def __set_validators(response, etag, last_modified):
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+        response.headers['Cache-Control'] = HttpCache.CACHE_CONTROL
+        # A 304 must vary as the full response does, or caches may pair it
+        # with the body of another content encoding
+        response.headers['Vary'] = HttpCache.VARY
+
+    @staticmethod
+    def etag(body):
+        if isinstance(body, unicode):
+            body = body.encode(c.ENCODING)
+
+        return '"' + hashlib.md5(body).hexdigest() + '"'
+
+    @staticmethod
+    def last_modified(tag, etag):
+        """
+        Returns the time, in seconds since the epoch, the resource first took
+        on the given ETag.
+        """
+        key = HttpCache.__PREFIX + tag
+        stored = memcache.get(key)
+
+        if stored != None and stored[0] == etag:
+            return stored[1]
+
+        now = int(datetime.datetime.now().strftime('%s'))
+        memcache.set(key, (etag, now))
+
+        return now
+
+    @staticmethod
+    def is_current(request, etag, last_modified):
+        """
+        If-None-Match takes precedence over If-Modified-Since when both are
+        sent.
+        """
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = request.headers.get('If-Modified-Since')
+
+        if if_none_match:
+            tags = [item.strip() for item in if_none_match.split(',')]
+
+            return '*' in tags or etag in tags or ('W/' + etag) in tags
+        elif if_modified_since:
+            since = parsedate_tz(if_modified_since)
+
+            return since != None and last_modified <= mktime_tz(since)
+
+        return False
@@ -0,0 +1,228 @@
+from __future__ import unicode_literals
+
+import re
+
+from lxml import etree
+from lxml.html import defs
+
+from lib.constants import NFL as nfl
+
+# Every known name of a team, by the abbreviation it stands for
+_TEAM_INDEX = dict(
+    [(abbreviation, abbreviation) for abbreviation in nfl.TEAM_NAME.values()] +
+    [(name, abbreviation) for (name, abbreviation) in nfl.TEAM_NAME.items()] +
+    [(alias, abbreviation) for (alias, abbreviation) in nfl.TEAM_ALIAS.items()])
+
+# Totals are anything float() takes; scratched picks are marked with an X
+_PICK_TOKEN = re.compile(
+    r'(?P<total>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)$|(?P<scratch>[Xx])$')
+
+# Tags lxml's Cleaner drops along with everything in them
+_KILL_TAGS = frozenset([
+    'applet',
+    'button',
+    'input',
+    'link',
+    'meta',
+    'script',
+    'select',
+    'style',
+    'textarea'
+]) | frozenset(defs.frame_tags)
+
+# Tags lxml's Cleaner unwraps, keeping what is in them
+_REMOVE_TAGS = frozenset([
+    'blink',
+    'embed',
+    'form',
+    'head',
+    'html',
+    'iframe',
+    'layer',
+    'marquee',
+    'object',
+    'param',
+    'title'
+])
+
+_KEPT = 0
+_REMOVED = 1
+_KILLED = 2
+
+class PickSheetParser(object):
+    """
+    Reads the rows of every <tbody> of a pick sheet in a single pass, from
+    parser events, without building or cleaning a tree.
+
+    Rows and cells come out as lxml's Cleaner (with its default settings)
+    would leave them: unwrapped and unknown tags count towards the
+    element around them, while scripts, styles, form controls and comments
+    are skipped altogether. The text of a cell ends where its first
+    remaining child element starts.
+    """
+    def __init__(self, remove_tags=()):
+        """
+        arguments:
+        remove_tags -- tags to unwrap on top of the Cleaner's own, as with
+            Cleaner(remove_tags=...)
+        """
+        self.remove_tags = _REMOVE_TAGS | frozenset(remove_tags)
+
+    def tables(self, html_string):
+        """
+        Returns the rows of every <tbody>, in document order. Each row is
+        the list of its non-empty cells, stripped, leaving out cells with a
+        '/' or '-' in them.
+
+        arguments:
+        html_string -- the HTML, parsed as lxml.html.fromstring would
+        """
+        target = _PickSheetTarget(self.__kind)
+
+        return etree.fromstring(html_string, etree.HTMLParser(target=target))
+
+    def __kind(self, tag):
+        if tag in _KILL_TAGS:
+            return _KILLED
+        elif tag in self.remove_tags:
+            return _REMOVED
+        elif tag in defs.tags or tag == 'image':
+            return _KEPT
+
+        return _REMOVED
+
+class _PickSheetTarget(object):
+    """
+    Parser target handing every event to the readers of the tables open
+    at the time; nested tables are read on their own as well.
+    """
+    def __init__(self, kind):
+        self.kind = kind
+        self.tables = []
+        self.readers = []
+
+    def start(self, tag, attrib):
+        # The tree keeps only the local name of prefixed tags, e.g. <o:p>
+        tag = tag.rsplit(':', 1)[-1]
+
+        for reader in self.readers:
+            reader.start(tag)
+
+        if tag == 'tbody':
+            reader = _TableReader(self.kind)
+
+            self.tables.append(reader.rows)
+            self.readers.append(reader)
+
+    def end(self, tag):
+        self.readers = [reader for reader in self.readers if not reader.end(tag)]
+
+    def data(self, data):
+        for reader in self.readers:
+            reader.data(data)
+
+    def close(self):
+        return self.tables
+
+class _TableReader(object):
+    """
+    Reads the rows of a single <tbody>.
+
+    Rows are the elements kept right under the table, and cells the
+    elements kept right under a row.
+    """
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows = []
+        self.stack = []
+        self.kept = 0
+        self.killed = 0
+        self.row = None
+        self.cell = None
+        self.cell_text_done = False
+
+    def start(self, tag):
+        kind = _KILLED if self.killed > 0 else self.kind(tag)
+        self.stack.append(kind)
+
+        if kind == _KILLED:
+            self.killed += 1
+        elif kind == _KEPT:
+            self.kept += 1
+
+            if self.kept == 1:
+                self.row = []
+            elif self.kept == 2:
+                self.cell = []
+                self.cell_text_done = False
+            elif self.kept == 3:
+                self.cell_text_done = True
+
+    def end(self, tag):
+        """
+        Returns True once the table itself has ended
+        """
+        if len(self.stack) == 0:
+            return True
+
+        kind = self.stack.pop()
+
+        if kind == _KILLED:
+            self.killed -= 1
+        elif kind == _KEPT:
+            if self.kept == 2:
+                self.__add_cell(''.join(self.cell))
+            elif self.kept == 1:
+                self.rows.append(self.row)
+
+            self.kept -= 1
+
+        return False
+
+    def data(self, data):
+        if self.killed == 0 and self.kept == 2 and not self.cell_text_done:
+            self.cell.append(data)
+
+    def __add_cell(self, text):
+        if len(text.strip()) > 0 and '/' not in text and '-' not in text:
+            self.row.append(text.strip())
+
+def team_abbreviation(name):
+    """
+    Returns the abbreviation of the team going by name (e.g. "AZ" or
+    "ARIZONA" for "ARI"); unknown names come back upper-cased.
+    """
+    key = name.strip().upper()
+
+    return _TEAM_INDEX.get(key, key)
+
+def group_picks(picks):
+    """
+    Splits a player's column of picks into one group per game: a team on
+    its own, or a team followed by an over/under and a total.
+
+    Returns a list of (row, group) tuples, where row counts every group
+    from 1, leaving out scratched picks.
+
+    arguments:
+    picks -- the cells of a player's column, in order
+    """
+    kinds = []
+    for pick in picks:
+        match = _PICK_TOKEN.match(pick)
+        kinds.append(match.lastgroup if match != None else 'team')
+
+    result = []
+    index = 0
+    row = 0
+
+    while index < len(picks):
+        size = 3 if index + 2 < len(picks) and kinds[index + 2] == 'total' else 1
+        row += 1
+
+        if kinds[index] != 'scratch':
+            result.append((row, picks[index:index + size]))
+
+        index += size
+
+    return result
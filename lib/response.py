@@ -0,0 +1,83 @@
+from __future__ import unicode_literals
+
+try: import simplejson as json
+except ImportError: import json
+import zlib
+
+class JsonResponse(object):
+    """
+    Shared JSON encoding for every handler.
+
+    Bodies are compact unless the request asks for ?pretty=1, and are
+    gzipped when the client accepts it and the body is large enough to
+    benefit.
+    """
+    __GZIP = "gzip"
+    __GZIP_LEVEL = 6
+    __GZIP_MIN_SIZE = 1024
+    __PRETTY_VALUES = ("1", "true")
+
+    # Encoders are built once and reused for every response
+    __COMPACT_ENCODER = json.JSONEncoder(separators=(',', ':'))
+    __PRETTY_ENCODER = json.JSONEncoder(indent=4)
+
+    @staticmethod
+    def encode(request, data):
+        if request.get('pretty').lower() in JsonResponse.__PRETTY_VALUES:
+            return JsonResponse.__PRETTY_ENCODER.encode(data)
+
+        return JsonResponse.__COMPACT_ENCODER.encode(data)
+
+    @staticmethod
+    def content_encoding(request, body):
+        """
+        Returns the encoding body will be sent with, or None if it is sent
+        as-is.
+        """
+        if len(body) < JsonResponse.__GZIP_MIN_SIZE:
+            return None
+
+        for item in request.headers.get('Accept-Encoding', '').split(','):
+            params = item.split(';')
+            name = params[0].strip().lower()
+
+            if name != JsonResponse.__GZIP and name != '*':
+                continue
+
+            # Honor an explicit refusal, i.e. "gzip;q=0"
+            for param in params[1:]:
+                key, _, value = param.partition('=')
+                if key.strip() == 'q':
+                    try:
+                        if float(value) <= 0:
+                            return None
+                    except ValueError:
+                        return None
+
+            return JsonResponse.__GZIP
+
+        return None
+
+    @staticmethod
+    def write(request, response, body):
+        encoding = JsonResponse.content_encoding(request, body)
+        response.headers['Vary'] = 'Accept-Encoding'
+
+        if isinstance(body, unicode):
+            body = body.encode('utf-8')
+
+        if encoding == JsonResponse.__GZIP:
+            body = JsonResponse.gzip(body)
+            response.headers['Content-Encoding'] = JsonResponse.__GZIP
+
+        response.out.write(body)
+
+    @staticmethod
+    def gzip(body):
+        # wbits of 16 + MAX_WBITS writes a gzip header and trailer
+        compressor = zlib.compressobj(
+            JsonResponse.__GZIP_LEVEL,
+            zlib.DEFLATED,
+            16 + zlib.MAX_WBITS)
+
+        return compressor.compress(body) + compressor.flush()
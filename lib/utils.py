@@ -2,6 +2,8 @@ from __future__ import unicode_literals
 
 import datetime
 
+from lib.constants import CONSTANTS as c
+from lib.constants import DATA_BLOB as d
 from lib.constants import NFL as nfl
 
 class Utils(object):
@@ -9,4 +11,122 @@ class Utils(object):
     def default_week():
         time_delta = datetime.datetime.now() - nfl.WEEK_ONE[nfl.YEAR]
 
-        return (time_delta.days/7)+1
\ No newline at end of file
+        return (time_delta.days/7)+1
+
+    @staticmethod
+    def season_week(week):
+        """
+        Prefixes week with the current part of the season, unless it
+        already carries a prefix
+        """
+        if week >= nfl.WEEK_PREFIX['PRE']:
+            return week
+
+        current_week = Utils.default_week()
+
+        if current_week <= 0:
+            # Preseason
+            return week + nfl.WEEK_PREFIX['PRE']
+        elif current_week > nfl.WEEKS_IN_REG:
+            return week + nfl.WEEK_PREFIX['POS']
+
+        return week + nfl.WEEK_PREFIX['REG']
+
+    @staticmethod
+    def is_final(game_status):
+        return (game_status or "").startswith(c.FINAL_STATUS)
+
+    @staticmethod
+    def is_live(game_status):
+        return (bool(game_status) and
+                game_status != c.PREGAME_STATUS and
+                not Utils.is_final(game_status))
+
+    @staticmethod
+    def is_game_day(game_day, now=None):
+        """
+        Checks if game_day ("Sun", "Mon", ...) is today, Eastern time
+
+        arguments:
+        now -- current UTC time; defaults to the clock
+        """
+        now = now or datetime.datetime.utcnow()
+        today = now + datetime.timedelta(hours=Utils.eastern_offset(now))
+
+        return c.DAYS.get((game_day or "").upper()) == today.weekday()
+
+    @staticmethod
+    def eastern_offset(now):
+        """
+        Hours from UTC to Eastern time at the UTC time now. Daylight saving
+        time runs from 2am on the second Sunday of March to 2am on the first
+        Sunday of November, local time.
+        """
+        daylight_offset = c.EASTERN_OFFSET + 1
+        start = (Utils.__sunday(now.year, 3, 2) +
+                 datetime.timedelta(hours=2 - c.EASTERN_OFFSET))
+        end = (Utils.__sunday(now.year, 11, 1) +
+               datetime.timedelta(hours=2 - daylight_offset))
+
+        if start <= now < end:
+            return daylight_offset
+
+        return c.EASTERN_OFFSET
+
+    @staticmethod
+    def __sunday(year, month, count):
+        """
+        Returns the count-th Sunday of the month, at midnight
+        """
+        first = datetime.datetime(year, month, 1)
+        days = (c.DAYS["SUN"] - first.weekday()) % 7
+
+        return first + datetime.timedelta(days=days + 7*(count - 1))
+
+    @staticmethod
+    def score_ttl(week, games, default=c.MEMCACHE_THRESHOLD):
+        """
+        Seconds a week of scores stays fresh, or None once it cannot change.
+
+        Weeks before the current one and weeks whose games are all final
+        never change. Live games, and games kicking off today, are short
+        lived; other pregame slates only change with the schedule.
+
+        arguments:
+        week -- week of the games, with or without its season prefix
+        games -- list of score dicts for the week
+        default -- seconds for games of no known status
+        """
+        games = games if isinstance(games, list) else [games or {}]
+        statuses = [game.get(d.GAME_STATUS) for game in games]
+        kickoffs = [game.get(d.GAME_DAY) for game in games
+                    if game.get(d.GAME_STATUS) == c.PREGAME_STATUS]
+
+        if Utils.__week_order(week) < Utils.__week_order(Utils.default_week()):
+            return None
+        elif len(statuses) > 0 and all(Utils.is_final(status) for status in statuses):
+            return None
+        elif any(Utils.is_live(status) for status in statuses):
+            return c.LIVE_THRESHOLD
+        elif any(Utils.is_game_day(game_day) for game_day in kickoffs):
+            # Games kick off today
+            return c.LIVE_THRESHOLD
+        elif len(kickoffs) > 0:
+            return c.PREGAME_THRESHOLD
+
+        return default
+
+    @staticmethod
+    def __week_order(week):
+        """
+        Returns the week with its season prefix, for weeks to compare in the
+        order they are played. Playoff weeks numbered from 1 are counted on
+        from the end of the regular season, as the current week is.
+        """
+        week = Utils.season_week(week)
+
+        if (week >= nfl.WEEK_PREFIX['POS'] and
+                week - nfl.WEEK_PREFIX['POS'] <= nfl.WEEKS_IN_REG):
+            week += nfl.WEEKS_IN_REG
+
+        return week
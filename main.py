@@ -5,8 +5,6 @@ from controllers import scores, spreads
 from google.appengine.ext.webapp import util
 
 def main():
-    application = get_app()
-
     util.run_wsgi_app(application)
 
 def get_app():
@@ -18,5 +16,7 @@ def get_app():
 
     return application
 
+application = get_app()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import json
 import webapp2
 
-from controllers.v1 import scores, status
+from controllers.v1 import scores, standings, status
 from webapp2_extras import routes
 
 
@@ -9,6 +9,10 @@ from webapp2_extras import routes
 application = webapp2.WSGIApplication([
         routes.PathPrefixRoute('/api/v1', [
             webapp2.Route('/scores/year/<year:\d+>/week/<week:\d+>', scores.WeeklyScores),
+            webapp2.Route('/scores/year/<year:\d+>/week/<week:\d+>/changes', scores.WeeklyScoreChanges),
+            webapp2.Route('/scores/year/<year:\d+>/week/<week:\d+>/stream', scores.WeeklyScoreStream),
+            webapp2.Route('/standings/year/<year:\d+>', standings.YearlyStandings),
+            webapp2.Route('/standings/year/<year:\d+>/week/<week:\d+>', standings.WeeklyStandings),
             webapp2.Route('/status', status.StatusPage)
         ])
     ], debug=True)
\ No newline at end of file
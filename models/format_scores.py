@@ -7,6 +7,10 @@ except ImportError:
     import json
 
 import logging
+import operator
+import string
+
+from itertools import izip
 
 from lib.constants import CONSTANTS as c
 from lib.constants import DATA_BLOB as d
@@ -14,14 +18,16 @@ from lib.constants import SCOREBOARD as sb
 from lib.constants import NFL as nfl
 
 class FormatFactory():
-    def get_instance(self):
-        return self._create_instance()
+    def get_instance(self, as_tuples=False):
+        """
+        arguments:
+        as_tuples -- map games to tuples in GAME_FIELDS order, rather than
+            to dicts
+        """
+        return self._create_instance(as_tuples)
 
-    def _create_instance(self):
-        return _FormatPadding(
-            _FormatOvertime(
-                _FormatUnicode(
-                    _FormatMapper(None))))
+    def _create_instance(self, as_tuples=False):
+        return _FormatDecoder(None, as_tuples=as_tuples)
 
 class Formatter(object):
     def __init__(self, nextFormatter=None):
@@ -38,110 +44,230 @@ class Formatter(object):
     def _format(self, input_str):
         raise NotImplementedError("Subclasses should implement this")
 
-class _FormatMapper(Formatter):
-    __TEST_WEEK_THRESHOLD = 100
-
+class _FormatDecoder(Formatter):
     """
+    Decodes the scorestrip feed in one formatter, with the output of the
+    padding, overtime, unicode and mapper chain.
+
+    Empty slots (",,") are filled before the JSON is parsed, in feeds that
+    have them, and byte strings are decoded. Overtime finals are capitalized
+    in the status column as the games are mapped, rather than over the whole
+    feed.
+
     This is a terminating decorator
     """
-    def __init__(self, nextFormatter=None):
-        super(_FormatMapper, self).__init__(nextFormatter=None)
+    def __init__(self, nextFormatter=None, as_tuples=False):
+        """
+        arguments:
+        as_tuples -- map games to tuples in GAME_FIELDS order, rather than
+            to dicts
+        """
+        super(_FormatDecoder, self).__init__(nextFormatter=None)
+        self.map_game = _game_record if as_tuples else _map_game
 
     def _format(self, input_str):
-        scores = []
-        result = []
-
         if not input_str:
             return input_str
 
+        if ",," in input_str:
+            # Every other comma of a run is filled by the first replacement
+            input_str = input_str.replace(",,", ",0,").replace(",,", ",0,")
+
+        if not isinstance(input_str, unicode):
+            input_str = unicode(input_str, c.ENCODING)
+
         try:
-            scores = (json.loads(input_str))[sb.SCOREBOARD_DATA]
+            scores = json.loads(input_str)[sb.SCOREBOARD_DATA]
         except:
             logging.error('Error processing score data')
-            return result
+            return []
 
-        for game in scores:
-            game_tag = game[-2][:3]
-            week_prefix = nfl.WEEK_PREFIX[game_tag]
-
-            # Check if post-season
-            if "POS" == game_tag or "PRO" == game_tag:
-                week = ''.join(i for i in game[sb.POST_GAME_TAG] if i.isdigit())
-                result.append( {
-                    d.AWAY_NAME: game[sb.POST_AWAY_NAME] or "",
-                    d.AWAY_SCORE: int(game[sb.POST_AWAY_SCORE]) or 0,
-                    d.GAME_CLOCK: game[sb.POST_GAME_CLOCK] or "",
-                    d.GAME_DAY: game[sb.POST_GAME_DAY] or "",
-                    d.GAME_SEASON: int(game[sb.POST_GAME_SEASON]) or 0,
-                    d.GAME_STATUS: game[sb.POST_GAME_STATUS] or "",
-                    d.GAME_TAG: game[sb.POST_GAME_TAG],
-                    d.GAME_TIME: game[sb.POST_GAME_TIME] or "",
-                    d.GAME_WEEK: (int(week) or 0) + week_prefix,
-                    d.HOME_NAME: game[sb.POST_HOME_NAME] or "",
-                    d.HOME_SCORE: int(game[sb.POST_HOME_SCORE]) or 0,
-                    d.NFL_GAME_ID: int(game[sb.POST_NFL_GAME_ID]) or 0
-                    } )
-            else:
-                # Regular or Preseason
-                week = ''.join(i for i in game[sb.REG_GAME_TAG] if i.isdigit())
-                week = int(week) or 0
-                week_prefix = week_prefix if week < _FormatMapper.__TEST_WEEK_THRESHOLD else 0
-
-                result.append( {
-                    d.AWAY_NAME: game[sb.REG_AWAY_NAME] or "",
-                    d.AWAY_SCORE: int(game[sb.REG_AWAY_SCORE]) or 0,
-                    d.GAME_CLOCK: game[sb.REG_GAME_CLOCK] or "",
-                    d.GAME_DAY: game[sb.REG_GAME_DAY] or "",
-                    d.GAME_SEASON: int(game[sb.REG_GAME_SEASON]) or 0,
-                    d.GAME_STATUS: game[sb.REG_GAME_STATUS] or "",
-                    d.GAME_TAG: game[sb.REG_GAME_TAG] or "",
-                    d.GAME_TIME: game[sb.REG_GAME_TIME] or "",
-                    d.GAME_WEEK: week + week_prefix,
-                    d.HOME_NAME: game[sb.REG_HOME_NAME] or "",
-                    d.HOME_SCORE: int(game[sb.REG_HOME_SCORE]) or 0,
-                    d.NFL_GAME_ID: int(game[sb.REG_NFL_GAME_ID]) or 0
-                    } )
-
-        return result
-
-class _FormatOvertime(Formatter):
-    def __init__(self, nextFormatter=None):
-        super(_FormatOvertime, self).__init__(nextFormatter=nextFormatter)
+        return [self.map_game(game) for game in scores]
 
-    def _format(self, input_str):
-        return input_str.replace("final overtime", "Final Overtime")
+_TEST_WEEK_THRESHOLD = 100
 
-class _FormatPadding(Formatter):
-    __MAX_ITERATIONS = 100
+# Fields of a mapped game, in the order of tuple records
+GAME_FIELDS = (
+    d.AWAY_NAME,
+    d.AWAY_SCORE,
+    d.GAME_CLOCK,
+    d.GAME_DAY,
+    d.GAME_SEASON,
+    d.GAME_STATUS,
+    d.GAME_TAG,
+    d.GAME_TIME,
+    d.GAME_WEEK,
+    d.HOME_NAME,
+    d.HOME_SCORE,
+    d.NFL_GAME_ID
+)
 
-    def __init__(self, nextFormatter=None):
-        super(_FormatPadding, self).__init__(nextFormatter=nextFormatter)
+def _text(value):
+    return value or ""
 
-    def _format(self, input_str):
-        canary = _FormatPadding.__MAX_ITERATIONS
-        result = input_str
-        length = 0
+def _status(value):
+    """
+    Returns the status of a game, with overtime finals capitalized
+    """
+    if value == "final overtime":
+        return "Final Overtime"
 
-        while length != len(result):
-            length = len(result)
-            result = result.replace(",,", ",0,")
+    return value or ""
 
-            # Prevent infinite loops
-            if canary > 0:
-                canary -= 1
-            else:
-                break
+def _tag_week(game_tag):
+    """
+    Returns the digits of a game tag, e.g. "11" for "REG11"
+    """
+    week = game_tag.lstrip(string.ascii_letters)
 
-        return result
+    if week.isdigit():
+        return week
 
-class _FormatUnicode(Formatter):
-    def __init__(self, nextFormatter=None):
-        # No nextFormatter since this class is a terminator
-        super(_FormatUnicode, self).__init__(nextFormatter=nextFormatter)
+    return ''.join(i for i in game_tag if i.isdigit())
 
-    def _format(self, input_str):
-        if isinstance(input_str, basestring):
-            if not isinstance(input_str, unicode):
-                return unicode(input_str, c.ENCODING)
+def _game_week(game_tag, week_prefix, test_weeks):
+    """
+    Returns the week of a game from its tag, e.g. 211 for "REG11" with a
+    prefix of 200
+
+    arguments:
+    test_weeks -- whether weeks from _TEST_WEEK_THRESHOLD up go without the
+        prefix
+    """
+    week = int(_tag_week(game_tag))
+
+    if test_weeks and week >= _TEST_WEEK_THRESHOLD:
+        return week
+
+    return week + week_prefix
+
+def _getter(indices):
+    """
+    Returns a callable reading the given indices of a sequence as a tuple,
+    however many there are
+    """
+    if len(indices) == 0:
+        return lambda values: ()
+    elif len(indices) == 1:
+        return lambda values: (values[indices[0]],)
+
+    return operator.itemgetter(*indices)
+
+class _RowPlan(object):
+    """
+    Extraction plan for one layout of scorestrip rows.
+
+    The source indices of the plan are read with one itemgetter per
+    converter, so a row is read in a few C calls, and a last itemgetter puts
+    the converted values in GAME_FIELDS order. The week is worked out from
+    the game tag once per tag, as every game of a feed shares a few tags.
+
+    plan.map(game) returns the fields of a row as a dict, and
+    plan.record(game) as a tuple in GAME_FIELDS order (leaving out fields
+    the plan has no column for).
+    """
+    def __init__(self, columns, tag_index, week_prefix, test_weeks=False):
+        """
+        arguments:
+        columns -- (source index, target key, converter) of every field but
+            the week
+        tag_index -- column of the game tag, which the week is read from
+        week_prefix -- added to the week, as in NFL.WEEK_PREFIX
+        test_weeks -- whether weeks from _TEST_WEEK_THRESHOLD up go without
+            a prefix
+        """
+        ints = [column for column in columns if column[2] is int]
+        texts = [column for column in columns if column[2] is _text]
+        others = [column for column in columns
+                  if column[2] is not int and column[2] is not _text]
+
+        # Converted values are laid out as ints, texts, others, then the week
+        laid_out = ints + texts + others + [(tag_index, d.GAME_WEEK, None)]
+        keys = [key for key in GAME_FIELDS
+                if key in set(column[1] for column in laid_out)]
+        positions = dict(
+            (column[1], position) for (position, column) in enumerate(laid_out))
+
+        self.__ints = _getter([index for (index, key, converter) in ints])
+        self.__texts = _getter([index for (index, key, converter) in texts])
+        self.__others = [(index, converter) for (index, key, converter) in others]
+        self.__order = _getter([positions[key] for key in keys])
+        self.__keys = tuple(keys)
+        self.__tag_index = tag_index
+        self.__week_prefix = week_prefix
+        self.__test_weeks = test_weeks
+        self.__weeks = {}
+
+    def record(self, game):
+        tag = game[self.__tag_index]
+        week = self.__weeks.get(tag)
+
+        if week == None:
+            week = self.__weeks[tag] = _game_week(
+                tag, self.__week_prefix, self.__test_weeks)
+
+        values = map(int, self.__ints(game))
+        values.extend([value or "" for value in self.__texts(game)])
+        values.extend([converter(game[index]) for (index, converter) in self.__others])
+        values.append(week)
+
+        return self.__order(values)
 
-        return input_str
+    def map(self, game):
+        return dict(izip(self.__keys, self.record(game)))
+
+
+_REG_COLUMNS = (
+    (sb.REG_AWAY_NAME, d.AWAY_NAME, _text),
+    (sb.REG_AWAY_SCORE, d.AWAY_SCORE, int),
+    (sb.REG_GAME_CLOCK, d.GAME_CLOCK, _text),
+    (sb.REG_GAME_DAY, d.GAME_DAY, _text),
+    (sb.REG_GAME_SEASON, d.GAME_SEASON, int),
+    (sb.REG_GAME_STATUS, d.GAME_STATUS, _status),
+    (sb.REG_GAME_TAG, d.GAME_TAG, _text),
+    (sb.REG_GAME_TIME, d.GAME_TIME, _text),
+    (sb.REG_HOME_NAME, d.HOME_NAME, _text),
+    (sb.REG_HOME_SCORE, d.HOME_SCORE, int),
+    (sb.REG_NFL_GAME_ID, d.NFL_GAME_ID, int)
+)
+
+_POST_COLUMNS = (
+    (sb.POST_AWAY_NAME, d.AWAY_NAME, _text),
+    (sb.POST_AWAY_SCORE, d.AWAY_SCORE, int),
+    (sb.POST_GAME_CLOCK, d.GAME_CLOCK, _text),
+    (sb.POST_GAME_DAY, d.GAME_DAY, _text),
+    (sb.POST_GAME_SEASON, d.GAME_SEASON, int),
+    (sb.POST_GAME_STATUS, d.GAME_STATUS, _status),
+    (sb.POST_GAME_TAG, d.GAME_TAG, _text),
+    (sb.POST_GAME_TIME, d.GAME_TIME, _text),
+    (sb.POST_HOME_NAME, d.HOME_NAME, _text),
+    (sb.POST_HOME_SCORE, d.HOME_SCORE, int),
+    (sb.POST_NFL_GAME_ID, d.NFL_GAME_ID, int)
+)
+
+def _season_plan(season_tag):
+    week_prefix = nfl.WEEK_PREFIX[season_tag]
+
+    # Check if post-season
+    if "POS" == season_tag or "PRO" == season_tag:
+        return _RowPlan(_POST_COLUMNS, sb.POST_GAME_TAG, week_prefix)
+
+    # Regular or Preseason
+    return _RowPlan(_REG_COLUMNS, sb.REG_GAME_TAG, week_prefix, test_weeks=True)
+
+# Plans by the season part of the game tag, which is always next to last
+_PLANS = dict((tag, _season_plan(tag)) for tag in nfl.WEEK_PREFIX)
+
+def _game_record(game):
+    """
+    Maps a row of the scorestrip feed to a tuple of its fields, in
+    GAME_FIELDS order
+    """
+    return _PLANS[game[-2][:3]].record(game)
+
+def _map_game(game):
+    """
+    Maps a row of the scorestrip feed to the dict equivalent of ScoreModel
+    data
+    """
+    return _PLANS[game[-2][:3]].map(game)
@@ -0,0 +1,251 @@
+from __future__ import unicode_literals
+
+from lib.cache_codec import MarshalCodec
+from lib.constants import DATA_BLOB as d
+
+from models.format_scores import GAME_FIELDS
+
+def _restore(game):
+    return GameRecord.from_dict(game)
+
+class GameRecord(object):
+    """
+    Immutable record of a game, in place of the dict equivalent of ScoreModel
+    data within the score chain.
+
+    Fields are named after their DATA_BLOB keys and read like a dict's
+    (record[d.HOME_SCORE], record.get(d.SPREAD_ODDS), d.GAME_WEEK in record);
+    fields a game was never given are left out, as missing keys are. Changes
+    make a new record with merge(), so records are shared rather than copied.
+
+    Records compare equal to the dict of their fields. They are turned back
+    into dicts with to_dict() wherever they leave the chain, e.g. as JSON.
+    """
+    # Fields from the scoreboard first, in the order of tuple records
+    __slots__ = GAME_FIELDS + (d.SPREAD_MARGIN, d.SPREAD_ODDS, d.TIMESTAMP)
+
+    FIELDS = __slots__
+
+    def __init__(self, **fields):
+        for (field, setter) in _SETTERS:
+            if field in fields:
+                setter(self, fields[field])
+
+    @staticmethod
+    def from_dict(game):
+        """
+        Returns a record of the fields of game, leaving out any other key
+
+        arguments:
+        game -- the dict equivalent of ScoreModel data, or a record
+        """
+        if isinstance(game, GameRecord):
+            return game
+
+        record = object.__new__(GameRecord)
+
+        for (field, setter) in _SETTERS:
+            if field in game:
+                setter(record, game[field])
+
+        return record
+
+    @staticmethod
+    def from_values(values):
+        """
+        Returns a record of a tuple of fields, in FIELDS order, such as the
+        scoreboard maps games to
+        """
+        record = object.__new__(GameRecord)
+
+        for ((_, setter), value) in zip(_SETTERS, values):
+            setter(record, value)
+
+        return record
+
+    @staticmethod
+    def records(games):
+        """
+        Returns a list of games as records. Lists that only hold records
+        already are returned as they are, so changes made to them are seen by
+        whoever holds the list.
+        """
+        if not isinstance(games, list):
+            return games
+
+        for game in games:
+            if not isinstance(game, GameRecord):
+                return [GameRecord.from_dict(item) for item in games]
+
+        return games
+
+    @staticmethod
+    def to_dicts(games):
+        """
+        Returns games with every record turned into a dict; anything else is
+        returned as it is
+        """
+        if isinstance(games, GameRecord):
+            return games.to_dict()
+        elif isinstance(games, list):
+            return [GameRecord.to_dicts(game) for game in games]
+
+        return games
+
+    @staticmethod
+    def json_default(value):
+        """
+        Encodes records for json.dumps(..., default=GameRecord.json_default)
+        """
+        if isinstance(value, GameRecord):
+            return value.to_dict()
+
+        raise TypeError(repr(value) + " is not JSON serializable")
+
+    def to_dict(self):
+        result = {}
+
+        for field in GameRecord.FIELDS:
+            value = getattr(self, field, _MISSING)
+
+            if value is not _MISSING:
+                result[field] = value
+
+        return result
+
+    def merge(self, changes):
+        """
+        Returns a record of these fields with the fields of changes (a dict
+        or a record) laid over them
+        """
+        record = object.__new__(GameRecord)
+
+        for (field, setter) in _SETTERS:
+            if field in changes:
+                setter(record, changes[field])
+            else:
+                value = getattr(self, field, _MISSING)
+
+                if value is not _MISSING:
+                    setter(record, value)
+
+        return record
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in _FIELD_SET else default
+
+    def keys(self):
+        return [field for field in GameRecord.FIELDS if hasattr(self, field)]
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __getitem__(self, key):
+        value = getattr(self, key, _MISSING) if key in _FIELD_SET else _MISSING
+
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key):
+        return key in _FIELD_SET and hasattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameRecord is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("GameRecord is immutable")
+
+    def __eq__(self, other):
+        if isinstance(other, GameRecord):
+            return self.__values() == other.__values()
+        elif isinstance(other, dict):
+            return self.to_dict() == other
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self.__values())
+
+    def __repr__(self):
+        return "GameRecord(" + repr(self.to_dict()) + ")"
+
+    def __reduce__(self):
+        return (_restore, (self.to_dict(),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __values(self):
+        return tuple(getattr(self, field, _MISSING) for field in GameRecord.FIELDS)
+
+_MISSING = object()
+
+_FIELD_SET = frozenset(GameRecord.FIELDS)
+
+# Slots are filled through their descriptors, past __setattr__
+_SETTERS = [(field, GameRecord.__dict__[field].__set__) for field in GameRecord.FIELDS]
+
+class GameRecordCodec(MarshalCodec):
+    """
+    Codec for cache entries whose 'data' is a list of games. Games are
+    stored as tuples of their fields in FIELDS order rather than as objects,
+    so field names are not repeated for every game; fields a game was never
+    given are stored as Ellipsis. Games are read back as records.
+    """
+    VERSION = b'\x02'
+
+    def __init__(self):
+        super(GameRecordCodec, self).__init__(default=GameRecord.json_default)
+
+    def _pack(self, entry):
+        games = entry.get('data')
+
+        if not isinstance(games, list):
+            return entry
+
+        packed = dict(entry)
+        packed['data'] = [self.__pack_game(game) for game in games]
+
+        return packed
+
+    def _unpack(self, entry):
+        games = entry.get('data')
+
+        if isinstance(games, list):
+            entry['data'] = [self.__unpack_game(game) for game in games]
+
+        return entry
+
+    def __pack_game(self, game):
+        game = GameRecord.from_dict(game)
+        values = [getattr(game, field, Ellipsis) for field in GameRecord.FIELDS]
+
+        while len(values) > 0 and values[-1] is Ellipsis:
+            values.pop()
+
+        return tuple(values)
+
+    def __unpack_game(self, values):
+        if Ellipsis not in values:
+            return GameRecord.from_values(values)
+
+        return GameRecord.from_dict(dict(
+            (field, value)
+            for (field, value) in zip(GameRecord.FIELDS, values)
+            if value is not Ellipsis))
@@ -0,0 +1,19 @@
+from __future__ import unicode_literals
+
+from google.appengine.ext import db
+
+class MailModel(db.Model):
+    """
+    Raw inbound mail, kept until its spread is parsed and saved. Mails are
+    stored under a hash of the raw message, so a message received twice is
+    only processed once.
+    """
+    sender = db.StringProperty(default="")
+    subject = db.StringProperty(default="")
+    message = db.TextProperty(default="")
+    processed = db.BooleanProperty(default=False)
+    timestamp = db.DateTimeProperty(auto_now_add=True)
+
+    @staticmethod
+    def build_key(digest):
+        return db.Key.from_path('MailModel', "M" + digest)
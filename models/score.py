@@ -1,19 +1,31 @@
 from __future__ import unicode_literals
 
 import datetime
+import logging
+import time
 try: import simplejson as json
 except ImportError: import json
 
+from lib.constants import CONSTANTS as c
 from lib.constants import DATA_BLOB as d
 from lib.constants import HTTP_CODE as http_code
 from lib.constants import NFL as nfl
 from lib.constants import SCOREBOARD as sb
+from lib.cache import LocalCache
+from lib.future import FallThrough
+from lib.future import Future
 from lib.utils import Utils as utils
 
 from models.format_scores import FormatFactory
+from models.game_record import GameRecord
+from models.game_record import GameRecordCodec
+from models.spread import SpreadFactory
+from models.standings import Standings
 
 from google.appengine.ext import db
+from google.appengine.ext import deferred
 from google.appengine.api import memcache
+from google.appengine.api import taskqueue
 from google.appengine.api import urlfetch
 
 class ScoreModel(db.Model):
@@ -33,6 +45,16 @@ class ScoreModel(db.Model):
     spread_margin = db.FloatProperty(default=0.000)
     timestamp = db.DateTimeProperty(auto_now=True)
 
+    @staticmethod
+    def build_key(year, week, game_id):
+        """
+        Games are stored under a key named after their season, week and
+        game_id, e.g. S2016W211G56115
+        """
+        return db.Key.from_path(
+            'ScoreModel',
+            "S" + unicode(year) + "W" + unicode(week) + "G" + unicode(game_id))
+
 class ScoreFactory():
     def get_instance(self, depth=4):
         instance = self.__create_instance(depth)
@@ -49,9 +71,15 @@ class ScoreFactory():
         elif depth == 3:
             return _ScoreMemcache(_ScoreDatastore(_ScoreSource(None)))
 
-        return _ScoreFilter(_ScoreMemcache(_ScoreDatastore(_ScoreSource(None))))
+        return _ScoreFilter(
+            _ScoreLocalCache(
+                _ScoreMemcache(
+                    _ScoreDatastore(
+                        _ScoreSource(None)))))
 
 class Score(object):
+    WATCH_INTERVAL = 1  # seconds between version checks while watching a week
+
     def __init__(self, nextScore=None):
         self.next = nextScore
 
@@ -73,6 +101,10 @@ class Score(object):
     def save(self, week, data):
         result = 0
         result_of_next = 0
+
+        # Every link works on the same records
+        data = GameRecord.records(data)
+
         if self.next != None:
             result_of_next = self.next.save(week, data)
 
@@ -82,88 +114,766 @@ class Score(object):
 
         return result
 
+    def fetch_async(self, week):
+        """
+        Starts fetching the week and returns a Future of what fetch would
+        return, so several fetches can be waited on together.
+
+        Each link starts its own RPC right away. The rest of the chain is
+        only asked once this link missed: when the Future is advanced, or
+        when its result is read.
+        """
+        def fall_through():
+            if self.next == None:
+                return Future.resolved(None)
+
+            return self.next.fetch_async(week).then(keep)
+
+        def keep(result):
+            # Save the result
+            self._save_score(week, result)
+
+            return result
+
+        return FallThrough(self._fetch_score_async(week), fall_through)
+
+    def fetch_many(self, weeks):
+        """
+        Fetches several weeks at once.
+
+        Returns a dict of the games of each week, using the week as the key;
+        weeks nothing was found for map to None. Only the weeks this link
+        missed are asked of the rest of the chain, in a single call.
+        """
+        result = self._fetch_score_many(weeks)
+        missing = [week for week in weeks if not result.get(week)]
+
+        if len(missing) > 0 and self.next != None:
+            fetched = self.next.fetch_many(missing)
+
+            # Save the results
+            self._save_score_many(dict(
+                (week, fetched[week]) for week in missing
+                if fetched.get(week) != None))
+
+            result.update(fetched)
+
+        return dict((week, result.get(week) or None) for week in weeks)
+
+    def fetch_changes(self, week, since):
+        """
+        Fetches the games of the week that changed after the version token
+        since.
+
+        Returns a dict with the current "version" token, whether the "data"
+        is the "full" week rather than only the changed games, and the
+        games themselves.
+        """
+        if self.next != None:
+            return self.next.fetch_changes(week, since)
+
+        return None
+
+    def version(self, week):
+        """
+        Returns the version token fetch_changes would return for the week,
+        or None unless the chain holds a fresh copy of it.
+
+        Only the token is looked up; nothing is fetched or merged, so it is
+        cheap enough to check before every fetch.
+        """
+        if self.next != None:
+            return self.next.version(week)
+
+        return None
+
+    def watch(self, week, since, timeout):
+        """
+        Waits up to timeout seconds for the version of the week to move past
+        the token since, then returns the games that changed as
+        fetch_changes does.
+
+        Only the version is checked while waiting. Once the chain no longer
+        holds a fresh copy, the fetch refreshes the week under the lease, so
+        any number of watchers share that one refresh.
+        """
+        deadline = time.time() + timeout
+        version = self.version(week)
+
+        while version != None and version == since and time.time() < deadline:
+            time.sleep(Score.WATCH_INTERVAL)
+            version = self.version(week)
+
+        return self.fetch_changes(week, since)
+
     def _fetch_score(self, week):
         raise NotImplementedError("Subclasses should implement this")
 
+    def _fetch_score_async(self, week):
+        """
+        Links without an RPC of their own read once the result is asked for
+        """
+        return Future(lambda: self._fetch_score(week))
+
+    def _fetch_score_many(self, weeks):
+        """
+        Links without a batched read fetch one week at a time
+        """
+        return dict((week, self._fetch_score(week)) for week in weeks)
+
     def _save_score(self, week, data):
         raise NotImplementedError("Subclasses should implement this")
 
+    def _save_score_many(self, weeks_data):
+        """
+        Links without a batched write save one week at a time
+
+        arguments:
+        weeks_data -- dict of the games of each week, using the week as the key
+        """
+        for week in weeks_data:
+            self._save_score(week, weeks_data[week])
+
+
+class _ScoreLocalCache(Score):
+    """
+    Keeps decoded weeks in-process, ahead of memcache.
+
+    The cache is shared by every chain built on the instance, so warm
+    instances skip both the memcache RPC and the JSON decode on hot weeks.
+    """
+    __CAPACITY = 32
+    __THRESHOLD = 60    # 1 minute in seconds
+
+    cache = LocalCache(__CAPACITY, __THRESHOLD)
+
+    def __init__(self, nextScore=None):
+        super(_ScoreLocalCache, self).__init__(nextScore=nextScore)
+
+    def fetch(self, week):
+        """
+        Override.
+
+        Only complete results from the rest of the chain are kept.
+        """
+        result = self._fetch_score(week)
+
+        if result != None and len(result) > 0:
+            return result
+        elif self.next != None:
+            result = self.next.fetch(week)
+
+            if result != None and len(result) > 0:
+                _ScoreLocalCache.cache.put(week, self.__copy(result))
+
+            return result
+
+        return None
+
+    def save(self, week, data):
+        """
+        Override.
+
+        Saves go to the rest of the chain; the local copy is dropped rather
+        than merged.
+        """
+        _ScoreLocalCache.cache.discard(week)
+
+        if self.next != None:
+            return self.next.save(week, data)
+
+        return 0
+
+    def fetch_async(self, week):
+        """
+        Override.
+
+        Hits resolve right away; misses keep what the rest of the chain
+        returns, as fetch does.
+        """
+        result = self._fetch_score(week)
+
+        if result != None and len(result) > 0:
+            return Future.resolved(result)
+        elif self.next != None:
+            def keep(result):
+                if result != None and len(result) > 0:
+                    _ScoreLocalCache.cache.put(week, self.__copy(result))
+
+                return result
+
+            return self.next.fetch_async(week).then(keep)
+
+        return Future.resolved(None)
+
+    def fetch_many(self, weeks):
+        """
+        Override.
+
+        Only the weeks missing locally are asked of the rest of the chain.
+        """
+        result = dict((week, self._fetch_score(week)) for week in weeks)
+        missing = [week for week in weeks if not result[week]]
+
+        if len(missing) > 0 and self.next != None:
+            fetched = self.next.fetch_many(missing)
+
+            for week in missing:
+                if fetched.get(week):
+                    _ScoreLocalCache.cache.put(week, self.__copy(fetched[week]))
+
+                result[week] = fetched.get(week)
+
+        return dict((week, result[week] or None) for week in weeks)
+
+    def _fetch_score(self, week):
+        data = _ScoreLocalCache.cache.get(week)
+
+        if data != None:
+            # Callers are free to modify the list they are handed
+            return self.__copy(data)
+
+        return None
+
+    def _save_score(self, week, data):
+        _ScoreLocalCache.cache.discard(week)
+
+        return len(data)
+
+    def __copy(self, data):
+        # Records are immutable, so only the list needs copying
+        if isinstance(data, list):
+            return list(GameRecord.records(data))
+
+        return dict(data)
 
 class _ScoreMemcache(Score):
     __PREFIX = "SCORES_"
+    __LEASE_PREFIX = "LEASE_"
     __THRESHOLD = 300   # 5 minutes in seconds
-
-    def __init__(self, nextScore=None):
+    __HARD_THRESHOLD = 1800
+    __EXPIRATION = 3600 # Stale copies are kept around for waiting requests
+    __LEASE_TIMEOUT = 10
+    __LEASE_RETRIES = 5
+    __LEASE_WAIT = 0.2
+    __REVALIDATE_TIMEOUT = 60
+    __CAS_RETRIES = 5
+    __UNREAD = object()
+
+    def __init__(self, nextScore=None, soft_threshold=None, hard_threshold=None,
+                 codec=None):
+        """
+        arguments:
+        soft_threshold -- age in seconds after which cached data is served
+            while a background refresh is queued; by default it follows the
+            state of the week's games
+        hard_threshold -- age in seconds after which a request has to wait
+            on the refresh itself
+        codec -- CacheCodec the entries are stored with; GameRecordCodec by
+            default
+        """
         super(_ScoreMemcache, self).__init__(nextScore=nextScore)
 
-    def _fetch_score(self, week):
-        data = {}
+        self.soft_threshold = soft_threshold
+        self.hard_threshold = hard_threshold
+        self.codec = codec or GameRecordCodec()
+
+    def fetch(self, week):
+        """
+        Override.
+
+        Data younger than the soft threshold is served as-is. Data younger
+        than the hard threshold is served as-is while a task refreshes it in
+        the background.
+
+        Past that, only the request holding the week's lease refreshes it from
+        the rest of the chain. Every other request is served the stale copy,
+        or waits briefly for the refresh to land.
+        """
+        return self.__serve(week, self.__read(week))
+
+    def fetch_async(self, week):
+        """
+        Override.
+
+        The memcache read starts right away; the freshness checks of fetch
+        run once it is waited on. A week that has to be refreshed starts the
+        rest of the chain's fetch under the week's lease, without waiting on
+        it, as soon as the miss is known.
+        """
         tag = self.__tag(week)
-        query = None
+        rpc = memcache.Client().get_multi_async([tag])
 
-        query = memcache.get(tag)
-        if query != None:
-            if len(query) > 0:
-                data = json.loads(query)
-                now = self.__timestamp()
+        def read():
+            data = self.__decode(tag, rpc.get_result().get(tag))
 
-                # Check if data is fresh enough to be valid
-                if (now - data['timestamp']) < _ScoreMemcache.__THRESHOLD:
-                    return data['data']
-            elif len(query) == 0:
-                # Kick data out of memcache if it exists, but is empty
-                memcache.delete(tag)
+            return data['data'] if self.__servable(week, data) else None
+
+        def fall_through():
+            if self.next == None:
+                return Future.resolved(None)
+            elif self.__acquire_lease(week, _ScoreMemcache.__LEASE_TIMEOUT):
+                return self.next.fetch_async(week).then(keep)
+
+            return Future(lambda: self.__wait_for_refresh(week))
+
+        def keep(result):
+            try:
+                self._save_score(week, result)
+            finally:
+                self.__release_lease(week)
+
+            return result
+
+        return FallThrough(Future(read), fall_through)
+
+    def fetch_many(self, weeks):
+        """
+        Override.
+
+        Every week is read with a single memcache call and served as fetch
+        would serve it. Weeks that have to be refreshed are fetched from the
+        rest of the chain together, under their leases, and stored with one
+        call per expiration. Weeks another request is refreshing are waited
+        on one at a time.
+        """
+        tags = dict((week, self.__tag(week)) for week in weeks)
+        client = memcache.Client()
+        stored = client.get_multi(tags.values(), for_cas=True)
+        entries = dict(
+            (week, self.__decode(tags[week], stored.get(tags[week])))
+            for week in weeks)
+        result = {}
+        missing = []
+
+        for week in weeks:
+            if self.__servable(week, entries[week]):
+                result[week] = entries[week]['data']
+            else:
+                result[week] = None
+                missing.append(week)
+
+        if len(missing) == 0 or self.next == None:
+            return result
+
+        # add_multi returns the leases it could not take
+        lease_tags = dict((self.__lease_tag(week), week) for week in missing)
+        taken = set(lease_tags) - set(memcache.add_multi(
+            dict((tag, self.__timestamp()) for tag in lease_tags),
+            _ScoreMemcache.__LEASE_TIMEOUT))
+        refresh = [week for week in missing if self.__lease_tag(week) in taken]
+
+        if len(refresh) > 0:
+            try:
+                fetched = self.next.fetch_many(refresh)
+                self.__store(dict(
+                    (week, fetched[week]) for week in refresh
+                    if fetched.get(week) != None), client, stored)
+            finally:
+                memcache.delete_multi(list(taken))
+
+            result.update(fetched)
+
+        for week in missing:
+            if week not in refresh:
+                result[week] = self.__wait_for_refresh(week)
+
+        return result
+
+    def __servable(self, week, data):
+        """
+        Whether the stored entry of the week can be served as it is. Entries
+        past their soft threshold are refreshed in the background.
+        """
+        if data != None and len(data['data']) > 0:
+            age = self.__timestamp() - data['timestamp']
+            (soft_threshold, hard_threshold) = self.__thresholds(week, data['data'])
+
+            if soft_threshold == None or age < soft_threshold:
+                return True
+            elif age < hard_threshold and self.next != None:
+                if self.__acquire_lease(week, _ScoreMemcache.__REVALIDATE_TIMEOUT):
+                    self.__queue_refresh(week)
+
+                return True
+
+        return False
+
+    def __serve(self, week, data):
+        """
+        Serves the stored entry of the week, refreshing it as fetch describes
+        """
+        if self.__servable(week, data):
+            return data['data']
+
+        if self.next == None:
+            return None
+
+        if self.__acquire_lease(week, _ScoreMemcache.__LEASE_TIMEOUT):
+            try:
+                result = self.__refresh(week)
+            finally:
+                self.__release_lease(week)
+
+            return result
+
+        return self.__wait_for_refresh(week)
+
+    def revalidate(self, week):
+        """
+        Refreshes the week from the rest of the chain, then hands back the
+        lease taken out when the refresh was queued.
+        """
+        try:
+            return self.__refresh(week)
+        finally:
+            self.__release_lease(week)
+
+    def fetch_changes(self, week, since):
+        """
+        Override.
+
+        Versions are only tracked while the week stays in memcache. Clients
+        whose token predates that history are sent the full week.
+
+        The games, their versions and the token all come from one read of
+        the stored entry, so a save landing in between cannot pair a newer
+        token with older games.
+        """
+        data = self.__read(week)
+
+        if self.__servable(week, data):
+            games = data['data']
+        else:
+            # A refresh stores a new entry, which is read once it lands
+            games = self.__serve(week, data)
+            data = self.__read(week)
+
+            if data != None and isinstance(data['data'], list):
+                games = data['data']
+
+        result = {
+            "version": None,
+            "full": True,
+            "data": games or []
+        }
+
+        if data == None or not isinstance(games, list):
+            return result
+
+        base = data.get('base', data['timestamp'])
+        changes = data.get('changes', {})
+        result['version'] = data.get('version', data['timestamp'])
+
+        if since != None and base <= since <= result['version']:
+            result['full'] = False
+            result['data'] = [
+                game for game in games
+                if changes.get(unicode(game[d.NFL_GAME_ID]), base) > since]
+
+        return result
+
+    def version(self, week):
+        """
+        Override.
+
+        The version moves with every save that changes a game, and never
+        moves backwards while the week stays in memcache.
+        """
+        data = self.__read(week)
+
+        if self.__fresh(week, data) == None:
+            return None
+
+        return data.get('version', data['timestamp'])
+
+    def _fetch_score(self, week):
+        return self.__fresh(week, self.__read(week))
+
+    def __fresh(self, week, data):
+        if data != None:
+            now = self.__timestamp()
+            soft_threshold = self.__thresholds(week, data['data'])[0]
+
+            # Check if data is fresh enough to be valid
+            if soft_threshold == None or (now - data['timestamp']) < soft_threshold:
+                return data['data']
 
         return None
 
     def _save_score(self, week, input_data):
         data = self.__validate_data(input_data)
-        scores = self.__sync_with_scores(week, data)
-        save = {
-            "timestamp": self.__timestamp(),
-            "data": scores
-        }
-        tag = self.__tag(week)
-        status = False
-        valid_keys = []
-
-        status = memcache.set(
-            tag,
-            json.dumps(save, ensure_ascii=False),
-            _ScoreMemcache.__THRESHOLD)
-
-        if status:
-            # Differeniate lengths of lists vs dicts
-            if type(data) is list:
-                return len(data)
-            else:
-                return 1
+
+        if week in self.__store({week: data}):
+            return len(data)
 
         return 0
 
-    def __sync_with_scores(self, week, input_data):
+    def _save_score_many(self, weeks_data):
+        self.__store(weeks_data)
+
+    def __store(self, weeks_data, client=None, stored=None):
+        """
+        Merges the games of each week into its stored entry with
+        compare-and-set, so concurrent saves of a week build on each other
+        instead of dropping each other's games. Weeks whose entry changed in
+        the meantime are read and merged again, up to __CAS_RETRIES times.
+        Weeks still contended after that are dropped from memcache, for the
+        next read to refill from the rest of the chain.
+
+        Returns the weeks that were stored
+
+        arguments:
+        weeks_data -- dict of the games of each week, using the week as the key
+        client -- memcache.Client stored was read with, for_cas
+        stored -- dict of the memcache values of the weeks, using the tag as
+            the key; read here unless given
+        """
+        client = client or memcache.Client()
+        pending = dict((self.__tag(week), week) for week in weeks_data)
+        data = dict(
+            (week, self.__validate_data(weeks_data[week])) for week in weeks_data)
         result = []
 
-        result = self._fetch_score(week)
+        for attempt in range(_ScoreMemcache.__CAS_RETRIES):
+            if stored == None:
+                stored = client.get_multi(pending.keys(), for_cas=True)
+
+            # Entries not in memcache yet can only be added
+            writes = {}
+
+            for tag in pending:
+                week = pending[tag]
+                (save, expiration) = self.__entry(
+                    week, self.__decode(tag, stored.get(tag)), data[week])
+
+                writes.setdefault((tag in stored, expiration), {})[tag] = \
+                    self.codec.encode(save)
+
+            # Both calls return the keys they could not store
+            failed = []
+
+            for ((existing, expiration), values) in writes.items():
+                if existing:
+                    failed.extend(client.cas_multi(values, expiration))
+                else:
+                    failed.extend(client.add_multi(values, expiration))
+
+            for tag in list(pending):
+                if tag not in failed:
+                    result.append(pending.pop(tag))
+
+            if len(pending) == 0:
+                return result
+
+            stored = None
+
+        logging.warning("Gave up storing contended weeks " + unicode(sorted(pending.values())))
+        memcache.delete_multi(pending.keys())
+
+        return result
+
+    def __entry(self, week, previous, data):
+        """
+        Returns the entry to store for the week, and how long to keep it
+
+        arguments:
+        previous -- the stored entry for the week, regardless of its age
+        data -- the validated games to save
+        """
+        scores = self.__sync_with_scores(week, data, previous)
+        save = self.__track_changes(previous, scores)
+        save["timestamp"] = self.__timestamp()
+        save["data"] = scores
+        (soft_threshold, hard_threshold) = self.__thresholds(week, scores)
+
+        # Weeks that can no longer change never expire
+        if soft_threshold == None:
+            return (save, 0)
+
+        return (save, max(_ScoreMemcache.__EXPIRATION, 2*hard_threshold))
+
+    def __sync_with_scores(self, week, input_data, previous=__UNREAD):
+        """
+        arguments:
+        previous -- the stored entry for the week, regardless of its age;
+            read from memcache unless given
+        """
+        result = []
+
+        if previous is _ScoreMemcache.__UNREAD:
+            previous = self.__read(week)
+
+        result = self.__fresh(week, previous)
 
         if result is None or len(result) == 0:
             result = input_data
         else:
+            # Stored games are left as they are, for versioning to compare
+            result = list(result)
+
             # Find the matching game(s)
             for data in input_data:
-                for game in result:
+                for (index, game) in enumerate(result):
                     if game[d.NFL_GAME_ID] == data[d.NFL_GAME_ID]:
-                        # TODO too complicated/fancy
-                        keys = (
-                            val for name, val in vars(d).iteritems()
-                            if not name.startswith("__"))
-                        for key in keys:
-                            # Only use the key if one of the sets contains it
-                            if key in game or key in data:
-                                game[key] = data[key] if key in data else game[key]
+                        result[index] = game.merge(data)
 
         return result
 
+    def __thresholds(self, week, games):
+        """
+        Returns the soft and hard thresholds for the games of the week.
+
+        Unless set on the instance, the soft threshold follows the state of
+        the games, and is None once the week can no longer change. The hard
+        threshold leaves at least as long again to refresh in the background.
+        """
+        soft_threshold = (self.soft_threshold or
+                          utils.score_ttl(week, games, _ScoreMemcache.__THRESHOLD))
+
+        if soft_threshold == None:
+            return (None, None)
+
+        hard_threshold = (self.hard_threshold or
+                          max(_ScoreMemcache.__HARD_THRESHOLD, 2*soft_threshold))
+
+        return (soft_threshold, hard_threshold)
+
+    def __refresh(self, week):
+        result = self.next.fetch(week)
+
+        # Save the result
+        self._save_score(week, result)
+
+        return result
+
+    def __wait_for_refresh(self, week):
+        """
+        Another request holds the lease, so avoid refreshing the week again.
+
+        The stored copy is served, however old, if there is one. Otherwise
+        the refresh is waited on briefly. Should it not land in time, the
+        week is only refreshed here if the lease can be taken over; while
+        another request still holds it, nothing is served.
+        """
+        data = self.__read(week)
+
+        if data != None and len(data['data']) > 0:
+            return data['data']
+
+        for attempt in range(_ScoreMemcache.__LEASE_RETRIES):
+            time.sleep(_ScoreMemcache.__LEASE_WAIT)
+
+            result = self._fetch_score(week)
+            if result != None and len(result) > 0:
+                return result
+
+        logging.warning("Timed out waiting on the refresh of week " + unicode(week))
+
+        # The refresh may have stored a copy that is already stale
+        data = self.__read(week)
+
+        if data != None and len(data['data']) > 0:
+            return data['data']
+
+        if self.__acquire_lease(week, _ScoreMemcache.__LEASE_TIMEOUT):
+            try:
+                return self.__refresh(week)
+            finally:
+                self.__release_lease(week)
+
+        logging.warning("Week " + unicode(week) + " is still being refreshed")
+
+        return None
+
+    def __queue_refresh(self, week):
+        try:
+            deferred.defer(_revalidate_scores, week)
+        except Exception, e:
+            logging.error("Unable to queue a refresh of week " + unicode(week))
+            logging.error(e)
+
+            self.__release_lease(week)
+
+    def __acquire_lease(self, week, timeout):
+        return memcache.add(
+            self.__lease_tag(week),
+            self.__timestamp(),
+            timeout)
+
+    def __release_lease(self, week):
+        memcache.delete(self.__lease_tag(week))
+
+    def __read(self, week):
+        """
+        Returns the stored entry for the week, regardless of its age
+        """
+        tag = self.__tag(week)
+
+        return self.__decode(tag, memcache.get(tag))
+
+    def __decode(self, tag, query):
+        if query != None:
+            if len(query) > 0:
+                entry = self.codec.decode(query)
+
+                if isinstance(entry, dict):
+                    # Legacy JSON entries hold dicts
+                    if isinstance(entry.get('data'), list):
+                        entry['data'] = GameRecord.records(entry['data'])
+
+                    return entry
+            elif len(query) == 0:
+                # Kick data out of memcache if it exists, but is empty
+                memcache.delete(tag)
+
+        return None
+
+    def __track_changes(self, previous, scores):
+        """
+        Versions the week, recording the version at which each game last
+        changed.
+
+        The version only moves when a game actually differs from what was
+        stored before, and never moves backwards.
+
+        arguments:
+        previous -- the stored entry for the week, regardless of its age
+        scores -- the games about to be stored
+        """
+        now = self.__timestamp()
+        keys = [unicode(game[d.NFL_GAME_ID]) for game in scores]
+
+        if (previous == None or 'version' not in previous or
+                not isinstance(previous['data'], list)):
+            return {
+                "base": now,
+                "version": now,
+                "changes": dict((key, now) for key in keys)
+            }
+
+        stored = dict(
+            (unicode(game[d.NFL_GAME_ID]), game) for game in previous['data'])
+        changed = [
+            key for key, game in zip(keys, scores)
+            if stored.get(key) != game]
+        version = previous['version']
+        changes = dict(
+            (key, previous['changes'].get(key, previous['base']))
+            for key in keys)
+
+        if len(changed) > 0:
+            version = max(version + 1, now)
+
+            for key in changed:
+                changes[key] = version
+
+        return {
+            "base": previous['base'],
+            "version": version,
+            "changes": changes
+        }
+
     def __tag(self, week):
         current_season = "S" + unicode(nfl.YEAR)
         current_week = "W"
@@ -175,67 +885,101 @@ class _ScoreMemcache(Score):
 
         return _ScoreMemcache.__PREFIX + current_season + current_week
 
+    def __lease_tag(self, week):
+        return _ScoreMemcache.__LEASE_PREFIX + self.__tag(week)
+
     def __timestamp(self):
         return int(datetime.datetime.now().strftime('%s'))
 
     def __validate_data(self, data):
-        game = {}
-        result = []
-        valid_keys = []
-
-        # Accumulate valid key
-        for item in dir(d):
-            if not item.startswith('_'):
-                valid_keys.append(getattr(d, item))
+        # Records only keep the keys of DATA_BLOB
+        return [GameRecord.from_dict(item) for item in data]
 
-        # Filter for & only save valid keys
-        for item in data:
-            for key in valid_keys:
-                if key in item:
-                    game[key] = item[key]
+def _revalidate_scores(week):
+    """
+    Deferred task queued by _ScoreMemcache when it serves data past its
+    soft threshold.
+    """
+    score = ScoreFactory().get_instance(depth=3)
 
-            result.append(game)
-            game = {}
+    score.revalidate(week)
 
-        return result
+def _update_standings(week, games):
+    """
+    Deferred task queued by _ScoreDatastore when games of the week change
+    score or status. Failures are left to the queue to retry.
+    """
+    Standings(SpreadFactory().get_instance()).update(week, games)
 
 class _ScoreDatastore(Score):
     __THRESHOLD = 300   # 5 minutes in seconds
+    __MAX_IN = 30
 
     def __init__(self, nextScore=None):
         super(_ScoreDatastore, self).__init__(nextScore=nextScore)
 
     def _fetch_score(self, week):
-        stale_timestamp = (
-            datetime.datetime.utcnow() -
-            datetime.timedelta(seconds=_ScoreDatastore.__THRESHOLD))
-        scores = []
-        result = []
+        return self.__fresh_scores(week, self.__query_scores(week))
 
+    def _fetch_score_async(self, week):
+        # Running the query starts fetching its first batch
         scores = self.__query_scores(week)
+
+        return Future(lambda: self.__fresh_scores(week, scores))
+
+    def _fetch_score_many(self, weeks):
+        """
+        Override.
+
+        Reads the weeks with one query per 30 weeks, the most an IN filter
+        takes.
+        """
+        games = dict((week, []) for week in weeks)
+
+        for start in range(0, len(weeks), _ScoreDatastore.__MAX_IN):
+            chunk = weeks[start:start + _ScoreDatastore.__MAX_IN]
+
+            for game in self.__query_weeks(chunk):
+                games[game.week].append(game)
+
+        return dict((week, self.__fresh_scores(week, games[week])) for week in weeks)
+
+    def __fresh_scores(self, week, scores):
+        """
+        Returns the games of the week as records, or nothing if any is stale
+        """
+        result = []
+        oldest = None
+
         for game in scores:
-            # Only check for staleness when dealing with current games
-            if week%100 >= utils.default_week():
-                # Reject data if any of it is stale
-                if game.timestamp <= stale_timestamp:
-                    return []
-
-            result.append( {
-                d.AWAY_NAME: game.away_name,
-                d.AWAY_SCORE: game.away_score,
-                d.GAME_CLOCK: game.game_clock,
-                d.GAME_DAY: game.game_day,
-                d.GAME_SEASON: game.year,
-                d.GAME_STATUS: game.game_status,
-                d.GAME_TAG: game.game_tag,
-                d.GAME_TIME: game.game_time,
-                d.GAME_WEEK: game.week,
-                d.HOME_NAME: game.home_name,
-                d.HOME_SCORE: game.home_score,
-                d.NFL_GAME_ID: game.game_id,
-                d.SPREAD_MARGIN: game.spread_margin,
-                d.SPREAD_ODDS: game.spread_odds
-            } )
+            if oldest == None or game.timestamp < oldest:
+                oldest = game.timestamp
+
+            result.append(self.__model_to_record(game))
+
+        # Past weeks and finished games are never stale
+        threshold = utils.score_ttl(week, result, _ScoreDatastore.__THRESHOLD)
+        if threshold != None and oldest != None:
+            stale_timestamp = (
+                datetime.datetime.utcnow() -
+                datetime.timedelta(seconds=threshold))
+
+            # Reject data if any of it is stale
+            if oldest <= stale_timestamp:
+                return []
+
+        return result
+
+    def fetch_stored(self, week):
+        """
+        Fetches every stored game of the week, however old it is.
+
+        Returns a dict of the games, using the game_id as the key
+        """
+        result = {}
+
+        for game in self.__query_scores(week):
+            result[game.game_id] = self.__model_to_record(game)
 
         return result
 
@@ -251,47 +995,148 @@ class _ScoreDatastore(Score):
 
         Otherwise, add the scores.
 
+        Games are looked up by their keys. Only games missing under their
+        key fall back to a query of the week, which finds rows stored before
+        keys were derived from the game; those are moved under their key.
+
+        All new and updated games are written together in one batch put.
+
         Note:
             Spread data should never be updated by this
         """
-        counter = 0
+        data = GameRecord.records(data)
+
         # Bug 118: Trust the data set over the passed-in week value
         week = data[0][d.GAME_WEEK] if (data != None and d.GAME_WEEK in data[0]) else week
-        query = self.__query_scores(week)
-        current_data = data
-        saved = False
+        keys = [self.__key(week, item) for item in data]
+        games = db.get(keys)
+        legacy = {}
+        entities = []
+        retired = []
+        changed = []
+
+        if None in games:
+            legacy = self.__scores_to_dict(self.__query_scores(week))
+
+        for (index, (item, key, game)) in enumerate(zip(data, keys, games)):
+            game_id = item[d.NFL_GAME_ID]
+
+            if game == None and game_id in legacy:
+                # Move the row under its key
+                retired.append(legacy[game_id])
+                game = self.__migrate(legacy[game_id], key)
+
+            if game != None:
+                played = self.__played(game)
+                updated_game = self.__merge_datasets(game, item)
+
+                if self.__played(updated_game) != played:
+                    changed.append(updated_game)
+
+                # Propogate spread data, since datastore is Source of Truth for spread data
+                # TODO: chck if this hack is needed anymore
+                data[index] = item.merge({
+                    d.SPREAD_MARGIN: game.spread_margin,
+                    d.SPREAD_ODDS: game.spread_odds
+                })
+
+                entities.append(updated_game)
+            else:
+                # new to the data set
+                data[index] = item = item.merge({d.GAME_WEEK: week})
+                entities.append(ScoreModel(key_name=key.name(), **item.to_dict()))
+                changed.append(entities[-1])
 
-        if query != None:
-            scores = self.__scores_to_dict(query)
+        result = self.__put_scores(entities, retired)
+        self.__queue_standings(week, changed)
 
-            for item in data:
-                game_id = item[d.NFL_GAME_ID]
+        return result
 
-                if game_id in scores:
-                    game = scores[game_id]
-                    updated_game = self.__merge_datasets(game, item)
+    def __played(self, game):
+        """The parts of a ScoreModel the standings are scored from"""
+        return (game.away_score, game.home_score, game.game_status)
 
-                    # Propogate spread data, since datastore is Source of Truth for spread data
-                    # TODO: chck if this hack is needed anymore
-                    item[d.SPREAD_MARGIN] = game.spread_margin
-                    item[d.SPREAD_ODDS] = game.spread_odds
+    def __queue_standings(self, week, changed):
+        """Queues a task rescoring the changed games in the week's standings
 
-                    updated_game.put()
-                    counter += 1
-                else:
-                    # new to the data set
-                    item[d.GAME_WEEK] = week
-                    ScoreModel(**item).put()
+        arguments:
+        week -- week the games were saved under
+        changed -- list of ScoreModel data whose score or status changed
+        """
+        if len(changed) == 0:
+            return
 
-                    counter += 1
-        else:
-            for item in data:
-                item[d.GAME_WEEK] = week
-                ScoreModel(**item).put()
+        try:
+            deferred.defer(
+                _update_standings,
+                week,
+                GameRecord.to_dicts([self.__model_to_record(game) for game in changed]))
+        except taskqueue.Error, e:
+            logging.error("Unable to queue the standings of week " + unicode(week))
+            logging.error(e)
+
+    def __key(self, week, item):
+        """Derives the key of a game from its season, week and game_id
 
-                counter += 1
+        arguments:
+        week -- week the game is saved under
+        item -- the record of the game
+        """
+        return ScoreModel.build_key(
+            item.get(d.GAME_SEASON, nfl.YEAR),
+            week,
+            item[d.NFL_GAME_ID])
 
-        return counter
+    def __migrate(self, model, key):
+        """Copies a ScoreModel stored under another key to its derived key
+
+        arguments:
+        model -- the actual ScoreModel data
+        key -- the key derived from the game
+        """
+        properties = dict(
+            (name, getattr(model, name)) for name in ScoreModel.properties()
+            if name != d.TIMESTAMP)
+
+        return ScoreModel(key_name=key.name(), **properties)
+
+    def __model_to_record(self, game):
+        return GameRecord(**{
+            d.AWAY_NAME: game.away_name,
+            d.AWAY_SCORE: game.away_score,
+            d.GAME_CLOCK: game.game_clock,
+            d.GAME_DAY: game.game_day,
+            d.GAME_SEASON: game.year,
+            d.GAME_STATUS: game.game_status,
+            d.GAME_TAG: game.game_tag,
+            d.GAME_TIME: game.game_time,
+            d.GAME_WEEK: game.week,
+            d.HOME_NAME: game.home_name,
+            d.HOME_SCORE: game.home_score,
+            d.NFL_GAME_ID: game.game_id,
+            d.SPREAD_MARGIN: game.spread_margin,
+            d.SPREAD_ODDS: game.spread_odds
+        })
+
+    def __put_scores(self, entities, retired=[]):
+        """Writes every new and merged ScoreModel in a single batch put
+
+        Returns the number of entities the datastore acknowledged with a key.
+
+        arguments:
+        entities -- list of ScoreModel data to be written
+        retired -- list of ScoreModel data moved under another key, deleted
+            once the batch is written
+        """
+        if len(entities) == 0:
+            return 0
+
+        keys = db.put(entities)
+
+        if len(retired) > 0:
+            db.delete(retired)
+
+        return len([key for key in keys if key is not None])
 
 
     def __merge_datasets(self, model, data):
@@ -354,24 +1199,34 @@ class _ScoreDatastore(Score):
 
         return query.run(limit=nfl.TOTAL_TEAMS)
 
+    def __query_weeks(self, weeks):
+        query = db.GqlQuery('SELECT * FROM ScoreModel ' +
+                            'WHERE week IN :1 ' +
+                            'ORDER BY game_id DESC',
+                            list(weeks))
+
+        return query.run(limit=nfl.TOTAL_TEAMS * len(weeks))
+
 
 class _ScoreSource(Score):
     def __init__(self, nextScore=None):
         super(_ScoreSource, self).__init__(nextScore=nextScore)
 
-        self.formatter = FormatFactory().get_instance()
+        self.formatter = FormatFactory().get_instance(as_tuples=True)
 
     def _fetch_score(self, week):
-        return self.__fetch_scores(week)
+        return self._fetch_score_async(week).get_result()
 
-    def __fetch_scores(self, week):
+    def _fetch_score_async(self, week):
+        rpc = self.__start_fetch(week)
+
+        return Future(lambda: self.__fetch_scores(rpc))
+
+    def __start_fetch(self, week):
             """
             NOTE: 'week' is for checking for postseason data
             """
             is_postseason = week > nfl.WEEKS_IN_REG and week >= nfl.WEEK_PREFIX['PRO']
-            scores = {}
-            result = []
-            status_code = 0
 
             rpc = urlfetch.create_rpc()
 
@@ -380,12 +1235,20 @@ class _ScoreSource(Score):
             else:
                 urlfetch.make_fetch_call(rpc, sb.URL_REG)
 
+            return rpc
+
+    def __fetch_scores(self, rpc):
+            result = []
+            status_code = 0
+
             try:
                 response = rpc.get_result()
 
                 # Check if the fetch was successful
                 if response.status_code == http_code.OK:
-                    result = self.formatter.format(response.content)
+                    result = [
+                        GameRecord.from_values(game)
+                        for game in self.formatter.format(response.content) or []]
 
                 # Save the status code
                 status_code = response.status_code
@@ -438,6 +1301,47 @@ class _ScoreFilter(Score):
 
         return result
 
+    def fetch_async(self, week):
+        if week < nfl.WEEK_PREFIX['PRE']:
+            week += self.__week_offset()
+
+        if self.next != None:
+            return self.next.fetch_async(week)
+
+        return Future.resolved(None)
+
+    def fetch_many(self, weeks):
+        """
+        Override.
+
+        Results are keyed by the weeks as they were asked for.
+        """
+        prefixed = dict((week, self.__prefix(week)) for week in weeks)
+        result = {}
+
+        if self.next != None:
+            result = self.next.fetch_many(list(set(prefixed.values())))
+
+        return dict((week, result.get(prefixed[week])) for week in weeks)
+
+    def __prefix(self, week):
+        if week < nfl.WEEK_PREFIX['PRE']:
+            week += self.__week_offset()
+
+        return week
+
+    def fetch_changes(self, week, since):
+        if week < nfl.WEEK_PREFIX['PRE']:
+            week += self.__week_offset()
+
+        return super(_ScoreFilter, self).fetch_changes(week, since)
+
+    def version(self, week):
+        if week < nfl.WEEK_PREFIX['PRE']:
+            week += self.__week_offset()
+
+        return super(_ScoreFilter, self).version(week)
+
     def __week_offset(self):
         current_week = utils.default_week()
 
@@ -449,3 +1353,130 @@ class _ScoreFilter(Score):
         else:
             return nfl.WEEK_PREFIX['REG']
 
+
+
+class ScoreIngester(object):
+    """
+    Polls the scoreboard on a schedule and primes the score chain with it, so
+    user requests are answered from the caches.
+
+    During game windows every run polls the scoreboard. Outside of them, runs
+    poll at most once per idle interval, which is enough to pick up schedule
+    changes and the turn of the week.
+    """
+    __STATE_TAG = "INGEST_STATE"
+    __IDLE_TAG = "INGEST_IDLE"
+    __IDLE_INTERVAL = 3600  # 1 hour in seconds
+
+    def __init__(self):
+        self.source = _ScoreSource(None)
+        self.datastore = _ScoreDatastore(None)
+        self.memcache = _ScoreMemcache(None)
+
+    def ingest(self, now=None):
+        """
+        Polls the scoreboard if due, writes the games that changed since the
+        last poll and primes memcache with the full week.
+
+        Returns a summary of the run
+        """
+        now = now or datetime.datetime.utcnow()
+        result = {
+            "polled": False,
+            "week": None,
+            "changed": 0
+        }
+
+        if not self.in_game_window(now):
+            if not memcache.add(ScoreIngester.__IDLE_TAG, 1, ScoreIngester.__IDLE_INTERVAL):
+                return result
+
+        games = self.source.fetch(self.__feed_week())
+        result["polled"] = True
+
+        if games == None or len(games) == 0:
+            return result
+
+        # Bug 118: Trust the data set over the current week
+        week = games[0][d.GAME_WEEK]
+        stored = self.datastore.fetch_stored(week)
+        changed = [game for game in games
+                   if self.__has_changed(stored.get(game[d.NFL_GAME_ID]), game)]
+
+        if len(changed) > 0:
+            # Saving fills in the spread data held by the datastore
+            self.datastore.save(week, changed)
+
+            saved = dict((game[d.NFL_GAME_ID], game) for game in changed)
+            games = [saved.get(game[d.NFL_GAME_ID], game) for game in games]
+
+        self.memcache.save(week, self.__merge(stored, games))
+        _ScoreLocalCache.cache.discard(week)
+        self.__save_state(week, games)
+
+        result["week"] = week
+        result["changed"] = len(changed)
+
+        return result
+
+    def in_game_window(self, now):
+        """
+        Checks if any game of the last polled week is being played, or is
+        yet to kick off today.
+
+        Without a record of the last poll, it is always time to poll.
+        """
+        state = memcache.get(ScoreIngester.__STATE_TAG)
+
+        if state == None:
+            return True
+
+        for (game_day, game_status) in json.loads(state)["games"]:
+            if utils.is_live(game_status):
+                return True
+            elif game_status == c.PREGAME_STATUS and utils.is_game_day(game_day, now):
+                return True
+
+        return False
+
+    def __feed_week(self):
+        """
+        The source only needs a week in the right season to pick its feed
+        """
+        week = utils.default_week()
+
+        if week > nfl.WEEKS_IN_REG:
+            return week + nfl.WEEK_PREFIX['POS']
+
+        return week + nfl.WEEK_PREFIX['REG']
+
+    def __has_changed(self, stored, game):
+        if stored == None:
+            return True
+
+        for key in game:
+            if stored.get(key) != game[key]:
+                return True
+
+        return False
+
+    def __merge(self, stored, games):
+        """
+        Lays the polled games over their stored copies, keeping the
+        spread data only the datastore has.
+        """
+        result = []
+
+        for game in games:
+            merged = stored.get(game[d.NFL_GAME_ID])
+            result.append(merged.merge(game) if merged != None else game)
+
+        return result
+
+    def __save_state(self, week, games):
+        state = {
+            "week": week,
+            "games": [[game[d.GAME_DAY], game[d.GAME_STATUS]] for game in games]
+        }
+
+        memcache.set(ScoreIngester.__STATE_TAG, json.dumps(state))
@@ -0,0 +1,197 @@
+from __future__ import unicode_literals
+
+import numpy as np
+
+from lib.constants import NFL as nfl
+
+from models.spread import SpreadFactory
+from models.score import ScoreFactory
+from models.tally import _TallyDatastore
+
+class SeasonCalculator():
+    """
+    Scores many weeks of picks at once.
+
+    Every pick of every player and week becomes one row of a set of columns
+    (picked and playing teams, scores, spreads, margins and totals), so the
+    spread, over/under, exact total and within-3 points are computed for the
+    whole season in a single vectorized pass. Results are identical to
+    TallyCalculator.count, week by week.
+    """
+    def count(self, weeks):
+        """
+        Tallies and saves every week in weeks
+
+        Returns a dict of the tallies of each week, using the week as the key
+        """
+        tally = _TallyDatastore()
+        scores = ScoreFactory().get_instance(depth=4)
+        spreads = SpreadFactory().get_instance()
+
+        # Every week is read in one batch per chain
+        weeks = list(weeks)
+        score_data = scores.fetch_many(weeks)
+        spreads_data = spreads.fetch_many(weeks)
+        weeks_data = [(week, score_data[week] or [], spreads_data[week] or [])
+                      for week in weeks]
+
+        result = self.tally(weeks_data)
+
+        for week in result:
+            tally.save(week, result[week])
+
+        return result
+
+    def tally(self, weeks_data):
+        """
+        Scores every player's picks against the games of their week
+
+        arguments:
+        weeks_data -- list of (week, score_data, spreads_data) tuples
+        """
+        columns = _SeasonColumns()
+
+        for (week, score_data, spreads_data) in weeks_data:
+            columns.add_week(week, score_data, spreads_data)
+
+        points = columns.points()
+        result = {}
+
+        for (index, (week, player)) in enumerate(columns.players):
+            tally_up = {
+                'year': player['year'],
+                'week': player['week'],
+                'owner': player['owner']
+            }
+
+            for category in points:
+                tally_up[category] = int(points[category][index])
+
+            tally_up['score'] = (tally_up['spread'] + tally_up['over_under'] +
+                                 tally_up['total'])
+            result.setdefault(week, []).append(tally_up)
+
+        return result
+
+# Teams are coded by their place in a fixed index of the league
+_TEAM_CODES = dict(
+    (team, code) for (code, team) in enumerate(sorted(set(nfl.TEAM_NAME.values()))))
+
+# Over/under picks are coded by the sign the weighted score must have
+_SIDE_CODES = {
+    'O': 1,
+    'U': -1
+}
+
+class _SeasonColumns():
+    """
+    Columnar copy of a season's games and picks.
+
+    Game columns hold one entry per game; pick columns hold one entry per
+    pick and point at their game and player by index. Teams are held as
+    integer codes; names outside of the league index, e.g. of other seasons,
+    are coded past its end.
+    """
+    def __init__(self):
+        self.team_codes = dict(_TEAM_CODES)
+        self.players = []
+        self.games = []
+        self.picks = []
+        self.player_index = []
+        self.game_index = []
+
+    def add_week(self, week, score_data, spreads_data):
+        first_game = len(self.games)
+        game_ids = [unicode(game['game_id']) for game in score_data]
+
+        self.games.extend(score_data)
+
+        for player in spreads_data:
+            player_index = len(self.players)
+            self.players.append((week, player))
+
+            # Don't receive points for non-participating games
+            picked = [first_game + index for (index, game_id) in enumerate(game_ids)
+                      if game_id in player]
+
+            self.player_index.extend([player_index] * len(picked))
+            self.game_index.extend(picked)
+            self.picks.extend([player[game_ids[index - first_game]] for index in picked])
+
+    def points(self):
+        """
+        Returns the points of every player in each category, in the order
+        the players were added
+        """
+        if len(self.picks) == 0:
+            empty = np.zeros(len(self.players), dtype=np.int64)
+
+            return {
+                'spread': empty,
+                'over_under': empty,
+                'total': empty
+            }
+
+        games = self.games
+        picks = self.picks
+        game_index = np.array(self.game_index, dtype=np.int64)
+
+        codes = self.__team_codes(
+            [game['home_name'] for game in games] +
+            [game['away_name'] for game in games] +
+            [pick[0] for pick in picks])
+
+        home_team = np.array([codes[game['home_name']] for game in games], dtype=np.int64)[game_index]
+        away_team = np.array([codes[game['away_name']] for game in games], dtype=np.int64)[game_index]
+        home_score = np.array([game['home_score'] for game in games], dtype=np.int64)[game_index]
+        away_score = np.array([game['away_score'] for game in games], dtype=np.int64)[game_index]
+        spread_odds = np.array([game['spread_odds'] for game in games], dtype=np.float64)[game_index]
+        spread_margin = np.array([game['spread_margin'] for game in games], dtype=np.float64)[game_index]
+
+        pick_team = np.array([codes[pick[0]] for pick in picks], dtype=np.int64)
+        pick_side = np.array(
+            [_SIDE_CODES.get(pick[1][:1], 0) if len(pick) > 1 else 0 for pick in picks],
+            dtype=np.int64)
+        has_total = np.array([len(pick) > 2 for pick in picks], dtype=np.bool_)
+        total = np.array([int(pick[2]) if len(pick) > 2 else 0 for pick in picks], dtype=np.int64)
+
+        # Calculate spread
+        score_diff = home_score - away_score + spread_odds
+        spread_won = (((pick_team == home_team) & (score_diff > 0)) |
+                      ((pick_team == away_team) & (score_diff < 0)))
+
+        # Calculate Over/Under
+        total_score = home_score + away_score
+        weighted_score = total_score - spread_margin
+        over_under_won = (((weighted_score > 0) & (pick_side == 1)) |
+                          ((weighted_score < 0) & (pick_side == -1)))
+
+        # Calculate Total Score
+        exact_total = has_total & (total_score == total)
+        close_total = has_total & (np.abs(total_score - total) <= 3)
+
+        player_index = np.array(self.player_index, dtype=np.int64)
+        totals = exact_total.astype(np.int64) + close_total.astype(np.int64)
+
+        return {
+            'spread': self.__sum(player_index, spread_won.astype(np.int64)),
+            'over_under': self.__sum(player_index, over_under_won.astype(np.int64)),
+            'total': self.__sum(player_index, totals)
+        }
+
+    def __team_codes(self, teams):
+        """
+        Returns the codes of every team, coding the new ones past the end
+        """
+        codes = self.team_codes
+
+        for team in set(teams):
+            codes.setdefault(team, len(codes))
+
+        return codes
+
+    def __sum(self, player_index, points):
+        return np.bincount(
+            player_index,
+            weights=points,
+            minlength=len(self.players)).astype(np.int64)
@@ -1,18 +1,22 @@
 from __future__ import unicode_literals
 
 import datetime
-import json
 import logging
 
 from google.appengine.api import memcache
 from google.appengine.ext import db
 
+from lib.cache_codec import MarshalCodec
 from lib.constants import CONSTANTS as c
 from lib.constants import DATA_BLOB as d
 from lib.constants import SPREAD_DATA_BLOB as sd
 from lib.constants import NFL as nfl
+from lib.future import FallThrough
+from lib.future import Future
 from lib.utils import Utils as utils
 
+from models.standings import Standings
+
 class SpreadModel(db.Expando):
     year = db.IntegerProperty(required=True, default=999)
     week = db.IntegerProperty(required=True, default=999)
@@ -54,28 +58,107 @@ class Spread(object):
 
         return result
 
+    def fetch_async(self, week):
+        """
+        Starts fetching the week and returns a Future of what fetch would
+        return. The rest of the chain is only asked once this link missed:
+        when the Future is advanced, or when its result is read.
+        """
+        def fall_through():
+            if self.next == None:
+                return Future.resolved(None)
+
+            return self.next.fetch_async(week).then(keep)
+
+        def keep(result):
+            # Save the result
+            self._save_spread(week, result)
+
+            return result
+
+        return FallThrough(self._fetch_spread_async(week), fall_through)
+
+    def fetch_many(self, weeks):
+        """
+        Fetches several weeks at once.
+
+        Returns a dict of the spreads of each week, using the week as the
+        key; weeks nothing was found for map to None. Only the weeks this
+        link missed are asked of the rest of the chain, in a single call.
+        """
+        result = self._fetch_spread_many(weeks)
+        missing = [week for week in weeks if not result.get(week)]
+
+        if len(missing) > 0 and self.next != None:
+            fetched = self.next.fetch_many(missing)
+
+            # Save the results
+            self._save_spread_many(dict(
+                (week, fetched[week]) for week in missing
+                if fetched.get(week) != None))
+
+            result.update(fetched)
+
+        return dict((week, result.get(week) or None) for week in weeks)
+
     def _fetch_spread(self, week):
         raise NotImplementedError("Subclasses should implement this")
 
+    def _fetch_spread_async(self, week):
+        return Future(lambda: self._fetch_spread(week))
+
+    def _fetch_spread_many(self, weeks):
+        return dict((week, self._fetch_spread(week)) for week in weeks)
+
     def _save_spread(self, week, data):
         raise NotImplementedError("Subclasses should implement this")
 
+    def _save_spread_many(self, weeks_data):
+        for week in weeks_data:
+            self._save_spread(week, weeks_data[week])
+
 class _SpreadMemcache(Spread):
     __PREFIX = "SPREAD_"
 
+    def __init__(self, nextSpread=None, codec=None):
+        """
+        arguments:
+        codec -- CacheCodec the entries are stored with; MarshalCodec by
+            default
+        """
+        super(_SpreadMemcache, self).__init__(nextSpread=nextSpread)
+
+        self.codec = codec or MarshalCodec()
+
     def _fetch_spread(self, week):
-        data = {}
         tag = self.__tag(week)
-        query = None
 
-        query = memcache.get(tag)
+        return self.__decode(tag, memcache.get(tag))
+
+    def _fetch_spread_async(self, week):
+        tag = self.__tag(week)
+        rpc = memcache.Client().get_multi_async([tag])
+
+        return Future(lambda: self.__decode(tag, rpc.get_result().get(tag)))
+
+    def _fetch_spread_many(self, weeks):
+        tags = dict((week, self.__tag(week)) for week in weeks)
+        stored = memcache.get_multi(tags.values())
+
+        return dict(
+            (week, self.__decode(tags[week], stored.get(tags[week])))
+            for week in weeks)
+
+    def __decode(self, tag, query):
+        data = {}
+
         if query != None:
             if len(query) > 0:
-                data = json.loads(query)
+                data = self.codec.decode(query)
                 now = self.__timestamp()
 
                 # Check if data is fresh enough to be valid
-                if (now - data["timestamp"]) < c.MEMCACHE_THRESHOLD:
+                if data != None and (now - data["timestamp"]) < c.MEMCACHE_THRESHOLD:
                     if isinstance(data["data"], list):
                         return data["data"]
                     else:
@@ -95,7 +178,7 @@ class _SpreadMemcache(Spread):
 
         status = memcache.set(
             self.__tag(week),
-            json.dumps(save, ensure_ascii=False),
+            self.codec.encode(save),
             c.MEMCACHE_THRESHOLD)
 
         if status:
@@ -107,6 +190,19 @@ class _SpreadMemcache(Spread):
 
         return 0
 
+    def _save_spread_many(self, weeks_data):
+        save = {}
+
+        for week in weeks_data:
+            data = weeks_data[week]
+            save[self.__tag(week)] = self.codec.encode({
+                "timestamp": self.__timestamp(),
+                "data": data if isinstance(data, list) else [data]
+            })
+
+        if len(save) > 0:
+            memcache.set_multi(save, c.MEMCACHE_THRESHOLD)
+
     def __tag(self, week):
         current_season = "S" + unicode(nfl.YEAR)
         current_week = "W"
@@ -122,8 +218,35 @@ class _SpreadMemcache(Spread):
         return int(datetime.datetime.now().strftime('%s'))
 
 class _SpreadDatastore(Spread):
+    __MAX_IN = 30
+
     def _fetch_spread(self, week):
+        return self.__query_to_dicts(self.__query_spread(week))
+
+    def _fetch_spread_async(self, week):
+        # Running the query starts fetching its first batch
         query = self.__query_spread(week)
+
+        return Future(lambda: self.__query_to_dicts(query))
+
+    def _fetch_spread_many(self, weeks):
+        """
+        Override.
+
+        Reads the weeks with one query per 30 weeks, the most an IN filter
+        takes.
+        """
+        entries = dict((week, []) for week in weeks)
+
+        for start in range(0, len(weeks), _SpreadDatastore.__MAX_IN):
+            chunk = weeks[start:start + _SpreadDatastore.__MAX_IN]
+
+            for entry in self.__query_weeks(chunk):
+                entries[entry.week].append(entry)
+
+        return dict((week, self.__query_to_dicts(entries[week])) for week in weeks)
+
+    def __query_to_dicts(self, query):
         result = []
 
         for entry in query:
@@ -174,6 +297,9 @@ class _SpreadDatastore(Spread):
 
                 counter += 1
 
+        # Standings of the week are rebuilt with the new picks when next read
+        Standings().invalidate(week)
+
         return counter
 
 
@@ -216,6 +342,14 @@ class _SpreadDatastore(Spread):
                             week)
         return query.run(limit=nfl.TOTAL_TEAMS)
 
+    def __query_weeks(self, weeks):
+        query = db.GqlQuery('SELECT * FROM SpreadModel ' +
+                            'WHERE year = :1 AND week IN :2 ' +
+                            'ORDER BY owner DESC',
+                            nfl.YEAR,
+                            list(weeks))
+        return query.run(limit=nfl.TOTAL_TEAMS * len(weeks))
+
 
 class _SpreadFilter(Spread):
     def __init__(self, nextSpread=None):
@@ -231,6 +365,35 @@ class _SpreadFilter(Spread):
 
         return result
 
+    def fetch_async(self, week):
+        if week < nfl.WEEK_PREFIX['PRE']:
+            week += self.__week_offset()
+
+        if self.next != None:
+            return self.next.fetch_async(week)
+
+        return Future.resolved(None)
+
+    def fetch_many(self, weeks):
+        """
+        Override.
+
+        Results are keyed by the weeks as they were asked for.
+        """
+        prefixed = dict((week, self.__prefix(week)) for week in weeks)
+        result = {}
+
+        if self.next != None:
+            result = self.next.fetch_many(list(set(prefixed.values())))
+
+        return dict((week, result.get(prefixed[week])) for week in weeks)
+
+    def __prefix(self, week):
+        if week < nfl.WEEK_PREFIX['PRE']:
+            week += self.__week_offset()
+
+        return week
+
     def save(self, week, data):
         if week < nfl.WEEK_PREFIX['PRE']:
             week += self.__week_offset()
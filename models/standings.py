@@ -0,0 +1,343 @@
+from __future__ import unicode_literals
+
+try: import simplejson as json
+except ImportError: import json
+
+from lib.constants import DATA_BLOB as d
+from lib.constants import NFL as nfl
+from lib.constants import SPREAD_DATA_BLOB as sd
+
+from google.appengine.ext import db
+
+class StandingsModel(db.Model):
+    """
+    Materialized standings of a week: the points each owner earned on each
+    game they picked, kept as JSON ({owner: {game_id: points}}).
+    """
+    year = db.IntegerProperty(required=True, default=999)
+    week = db.IntegerProperty(required=True, default=999)
+    contributions = db.TextProperty(default="{}")
+    timestamp = db.DateTimeProperty(auto_now=True)
+
+    @staticmethod
+    def build_key(year, week):
+        return db.Key.from_path(
+            'StandingsModel',
+            "S" + unicode(year) + "W" + unicode(week))
+
+def score_game(picks, game):
+    """
+    Points an owner earned on a single game: one for the spread winner, one
+    for the over/under, one for the exact total and one for a total within 3.
+
+    arguments:
+    picks -- the owner's spread data, keyed by game_id
+    game -- the dict equivalent of ScoreModel data
+    """
+    categories = score_categories(picks, game)
+
+    return categories['spread'] + categories['over_under'] + categories['total']
+
+def score_categories(picks, game):
+    """
+    Points an owner earned on a single game, by category: 'spread',
+    'over_under' and 'total' (exact total and total within 3).
+
+    arguments:
+    picks -- the owner's spread data, keyed by game_id
+    game -- the dict equivalent of ScoreModel data
+    """
+    game_id = unicode(game[d.NFL_GAME_ID])
+    result = {
+        'spread': 0,
+        'over_under': 0,
+        'total': 0
+    }
+
+    # Don't receive points for non-participating games
+    if game_id not in picks:
+        return result
+
+    pick = picks[game_id]
+
+    # Calculate spread
+    score_diff = game[d.HOME_SCORE] - game[d.AWAY_SCORE] + game[d.SPREAD_ODDS]
+    if game[d.HOME_NAME] == pick[0] and score_diff > 0:
+        result['spread'] += 1
+    elif game[d.AWAY_NAME] == pick[0] and score_diff < 0:
+        result['spread'] += 1
+
+    if len(pick) > 1:
+        # Calculate Over/Under
+        total_score = game[d.HOME_SCORE] + game[d.AWAY_SCORE]
+        weighted_score = total_score - game[d.SPREAD_MARGIN]
+        if weighted_score > 0 and pick[1][0] == 'O':
+            result['over_under'] += 1
+        elif weighted_score < 0 and pick[1][0] == 'U':
+            result['over_under'] += 1
+
+        if len(pick) > 2:
+            player_total = int(pick[2])
+            # Calculate Total Score
+            if total_score == player_total:
+                result['total'] += 1
+
+            difference = total_score - player_total
+            if difference <= 3 and difference >= -3:
+                result['total'] += 1
+
+    return result
+
+class Standings(object):
+    """
+    Keeps the standings of a week current as its games change.
+
+    The record is built once from every game of the week. From then on, each
+    saved game only rescores that game for every owner who picked it.
+    """
+    def __init__(self, spreads=None):
+        """
+        arguments:
+        spreads -- spread chain the picks of a week are fetched from; only
+            needed to build or update standings
+        """
+        self.spreads = spreads
+
+    def fetch(self, week):
+        """
+        Returns the tally of every owner for the week, or None if the week
+        has no standings yet.
+        """
+        model = StandingsModel.get(StandingsModel.build_key(nfl.YEAR, week))
+
+        if model == None:
+            return None
+
+        return self.__tally(model)
+
+    def rebuild(self, week, games):
+        """
+        Scores every game of the week for every owner and stores the result
+
+        arguments:
+        week -- season-prefixed week
+        games -- every game of the week, as dicts of ScoreModel data
+        """
+        contributions = {}
+
+        for player in self.__spreads(week):
+            contributions[player[sd.SPREAD_OWNER]] = self.__score_games(player, games)
+
+        model = StandingsModel(
+            key_name=StandingsModel.build_key(nfl.YEAR, week).name(),
+            year=nfl.YEAR,
+            week=week,
+            contributions=json.dumps(contributions))
+        model.put()
+
+        return self.__tally(model)
+
+    def update(self, week, games):
+        """
+        Rescores only the given games of the week. Weeks without standings
+        are left alone; they are built in full when first read.
+
+        Returns the number of owners whose standings were updated
+        """
+        key = StandingsModel.build_key(nfl.YEAR, week)
+
+        if StandingsModel.get(key) == None:
+            return 0
+
+        changes = {}
+        for player in self.__spreads(week):
+            changes[player[sd.SPREAD_OWNER]] = self.__score_games(player, games)
+
+        def apply_changes():
+            model = StandingsModel.get(key)
+
+            if model == None:
+                return 0
+
+            contributions = json.loads(model.contributions)
+            for owner in changes:
+                contributions.setdefault(owner, {}).update(changes[owner])
+
+            model.contributions = json.dumps(contributions)
+            model.put()
+
+            return len(changes)
+
+        return db.run_in_transaction(apply_changes)
+
+    def invalidate(self, week):
+        """
+        Drops the standings of the week, e.g. once its picks change
+        """
+        db.delete(StandingsModel.build_key(nfl.YEAR, week))
+
+    def __spreads(self, week):
+        if self.spreads == None:
+            return []
+
+        return self.spreads.fetch(week) or []
+
+    def __score_games(self, player, games):
+        result = {}
+
+        for game in games:
+            game_id = unicode(game[d.NFL_GAME_ID])
+
+            if game_id in player:
+                result[game_id] = score_game(player, game)
+
+        return result
+
+    def __tally(self, model):
+        contributions = json.loads(model.contributions)
+        result = []
+
+        for owner in sorted(contributions):
+            result.append({
+                'year': model.year,
+                'week': model.week,
+                'owner': owner,
+                'score': sum(contributions[owner].values())
+            })
+
+        return result
+
+class SeasonStandingsModel(db.Model):
+    """
+    Cumulative standings of a season, kept as JSON: the tally of each owner
+    for each week ({week: {owner: tally}}), and the ranked standings those
+    add up to.
+    """
+    year = db.IntegerProperty(required=True, default=999)
+    weeks = db.TextProperty(default="{}")
+    standings = db.TextProperty(default="[]")
+    timestamp = db.DateTimeProperty(auto_now=True)
+
+    @staticmethod
+    def build_key(year):
+        return db.Key.from_path('SeasonStandingsModel', "S" + unicode(year))
+
+class SeasonStandings(object):
+    """
+    Keeps the ranked standings of a season as tallies are saved, so reading
+    them never touches the tallies themselves.
+    """
+    CATEGORIES = ['spread', 'over_under', 'total']
+
+    def fetch(self, year):
+        """
+        Returns the ranked standings of the season, or None if no week of it
+        was tallied yet.
+        """
+        model = SeasonStandingsModel.get(SeasonStandingsModel.build_key(year))
+
+        if model == None:
+            return None
+
+        return {
+            'year': model.year,
+            'standings': json.loads(model.standings)
+        }
+
+    def update(self, year, week, tallies):
+        """
+        Replaces the tallies of the given owners for the week, then ranks the
+        season again.
+
+        arguments:
+        year -- season of the tallies
+        week -- week of the tallies
+        tallies -- list of tally dicts, with 'owner', 'score' and a count
+            for each category
+        """
+        key = SeasonStandingsModel.build_key(year)
+
+        def apply_tallies():
+            model = SeasonStandingsModel.get(key)
+
+            if model == None:
+                model = SeasonStandingsModel(key_name=key.name(), year=year)
+
+            weeks = json.loads(model.weeks)
+            week_tallies = weeks.setdefault(unicode(week), {})
+
+            for tally in tallies:
+                week_tallies[tally['owner']] = self.__week_tally(tally)
+
+            model.weeks = json.dumps(weeks)
+            model.standings = json.dumps(self.__rank(weeks))
+            model.put()
+
+            return len(tallies)
+
+        return db.run_in_transaction(apply_tallies)
+
+    def rebuild(self, year, tallies):
+        """
+        Ranks the season from every tally of it, replacing the standings
+        kept so far. Seasons tallied before their standings were kept are
+        built this way.
+
+        Returns the standings as fetch does, or None if there are no tallies
+
+        arguments:
+        year -- season of the tallies
+        tallies -- list of every tally dict of the season, each with its
+            'week'
+        """
+        if len(tallies) == 0:
+            return None
+
+        weeks = {}
+
+        for tally in tallies:
+            weeks.setdefault(unicode(tally['week']), {})[tally['owner']] = \
+                self.__week_tally(tally)
+
+        model = SeasonStandingsModel(
+            key_name=SeasonStandingsModel.build_key(year).name(),
+            year=year,
+            weeks=json.dumps(weeks),
+            standings=json.dumps(self.__rank(weeks)))
+        model.put()
+
+        return {
+            'year': model.year,
+            'standings': json.loads(model.standings)
+        }
+
+    def __week_tally(self, tally):
+        return dict(
+            [('score', tally.get('score') or 0)] +
+            [(category, tally.get(category) or 0)
+             for category in SeasonStandings.CATEGORIES])
+
+    def __rank(self, weeks):
+        owners = {}
+
+        for week_tallies in weeks.values():
+            for (owner, tally) in week_tallies.items():
+                totals = owners.setdefault(owner, dict(
+                    [('owner', owner), ('points', 0), ('weeks', 0)] +
+                    [(category, 0) for category in SeasonStandings.CATEGORIES]))
+
+                totals['points'] += tally['score']
+                totals['weeks'] += 1
+                for category in SeasonStandings.CATEGORIES:
+                    totals[category] += tally[category]
+
+        result = sorted(owners.values(), key=lambda k: (-k['points'], k['owner']))
+
+        # Owners with the same points share a rank
+        for (index, totals) in enumerate(result):
+            if index > 0 and totals['points'] == result[index - 1]['points']:
+                totals['rank'] = result[index - 1]['rank']
+            else:
+                totals['rank'] = index + 1
+
+        return result
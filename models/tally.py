@@ -3,9 +3,14 @@ from __future__ import unicode_literals
 import datetime
 
 from lib.constants import NFL as nfl
+from lib.future import Future
+from lib.utils import Utils as utils
 
 from models.spread import SpreadFactory
 from models.score import ScoreFactory
+from models.standings import SeasonStandings
+from models.standings import Standings
+from models.standings import score_categories
 
 from google.appengine.ext import db
 
@@ -14,33 +19,82 @@ class TallyModel(db.Model):
     week = db.IntegerProperty(required=True, default=999)
     owner = db.StringProperty(required=True, default="Nobody")
     score = db.IntegerProperty(default=0)
+    spread = db.IntegerProperty(default=0)
+    over_under = db.IntegerProperty(default=0)
+    total = db.IntegerProperty(default=0)
+
+    @staticmethod
+    def build_key(year, week, owner):
+        """
+        Tallies are stored under a key named after their season, week and
+        owner, e.g. S2016W211OMegaMan
+        """
+        return db.Key.from_path(
+            'TallyModel',
+            "S" + unicode(year) + "W" + unicode(week) + "O" + owner)
 
 class _TallyDatastore():
     def save(self, week, data):
+        """
+        Loads the week's tallies once, merges the incoming tallies into them
+        by owner and writes every change in a single batch put.
+
+        Tallies are stored under a key derived from season, week and owner,
+        so an owner has one tally per week. Rows stored before that,
+        including duplicates of an owner, are folded into the keyed row and
+        deleted.
+        """
         counter = 0
-        saved = False
-        query = self.__query(week)
-
-        for (index, item) in reversed(list(enumerate(data))):
-            if query != None:
-                for tally_data in query:
-                    # Perform Update
-                    if tally_data.owner == item['owner']:
-                        tally_data.year = item['year'] if 'year' in item else tally_data.year
-                        tally_data.week = item['week'] if 'week' in item else tally_data.week
-                        tally_data.score = item['score'] if 'score' in item else tally_data.score
-
-                        tally_data.put()
-                        counter += 1
-                        saved = True
-
-            # Fresh save
-            if not saved:
-                TallyModel(**item).put()
-                counter += 1
-                saved = True
-
-            saved = False
+        # Tallies carry the week they were counted under, which need not
+        # match the week they are saved with
+        weeks = set([week] + [item['week'] for item in data if 'week' in item])
+        tallies = self.__tallies_to_dict(
+            TallyModel.all().filter("week IN", sorted(weeks)))
+        entities = {}
+        retired = []
+
+        for item in data:
+            owner = item['owner']
+            key = self.__key(week, item)
+
+            if owner in entities:
+                tally_data = entities[owner]
+            else:
+                stored = tallies.get(owner, [])
+                tally_data = None
+
+                for legacy in stored:
+                    if legacy.key() == key:
+                        tally_data = legacy
+                    else:
+                        retired.append(legacy)
+
+                if tally_data == None and len(stored) > 0:
+                    # Move the first row under its key
+                    tally_data = self.__migrate(stored[0], key)
+
+            if tally_data != None:
+                # Perform Update
+                tally_data.year = item['year'] if 'year' in item else tally_data.year
+                tally_data.week = item['week'] if 'week' in item else tally_data.week
+                tally_data.score = item['score'] if 'score' in item else tally_data.score
+                tally_data.spread = item['spread'] if 'spread' in item else tally_data.spread
+                tally_data.over_under = item['over_under'] if 'over_under' in item else tally_data.over_under
+                tally_data.total = item['total'] if 'total' in item else tally_data.total
+            else:
+                # Fresh save
+                tally_data = TallyModel(key_name=key.name(), **item)
+
+            entities[owner] = tally_data
+            counter += 1
+
+        if len(entities) > 0:
+            db.put(entities.values())
+
+        if len(retired) > 0:
+            db.delete(retired)
+
+        self.__update_season(entities.values())
 
         return counter
 
@@ -49,12 +103,77 @@ class _TallyDatastore():
         result = []
 
         for item in query:
-            result.append({
-                'year': item.year,
-                'week': item.week,
-                'owner': item.owner,
-                'score': item.score
-            })
+            result.append(self.__model_to_dict(item))
+
+        return result
+
+    def fetch_season(self, year):
+        """
+        Returns every tally of the season
+        """
+        result = []
+
+        for item in TallyModel.all().filter("year =", year):
+            result.append(self.__model_to_dict(item))
+
+        return result
+
+    def __model_to_dict(self, item):
+        return {
+            'year': item.year,
+            'week': item.week,
+            'owner': item.owner,
+            'score': item.score,
+            'spread': item.spread,
+            'over_under': item.over_under,
+            'total': item.total
+        }
+
+    def __update_season(self, entities):
+        """Adds the saved tallies to the standings of their season
+
+        arguments:
+        entities -- list of TallyModel data that was written
+        """
+        weeks = {}
+
+        for item in entities:
+            weeks.setdefault((item.year, item.week), []).append(self.__model_to_dict(item))
+
+        season = SeasonStandings()
+
+        for ((year, week), tallies) in weeks.items():
+            if season.fetch(year) == None:
+                # Weeks tallied before the season's standings were kept
+                # are counted in first
+                season.rebuild(year, self.fetch_season(year))
+
+            season.update(year, week, tallies)
+
+    def __key(self, week, item):
+        return TallyModel.build_key(
+            item.get('year', nfl.YEAR),
+            item.get('week', week),
+            item['owner'])
+
+    def __migrate(self, model, key):
+        return TallyModel(
+            key_name=key.name(),
+            year=model.year,
+            week=model.week,
+            owner=model.owner,
+            score=model.score)
+
+    def __tallies_to_dict(self, tallies):
+        """ Groups a list of tally models by owner
+
+        arguments:
+        tallies -- list of TallyModel data
+        """
+        result = {}
+
+        for item in tallies:
+            result.setdefault(item.owner, []).append(item)
 
         return result
 
@@ -74,56 +193,84 @@ class TallyCalculator():
         if week == None or week == 0:
             week = self._default_week()
 
-        score_data = scores.fetch(week)
-        spreads_data = spreads.fetch(week)
+        # Both chains start their reads, and on a miss fall through to their
+        # next links, before either is waited on
+        (score_data, spreads_data) = Future.wait_all([
+            scores.fetch_async(week),
+            spreads.fetch_async(week)])
 
-        for player in spreads_data:
-            points = 0
+        result = self.tally(score_data, spreads_data)
+        tally.save(week, result)
 
-            for game in score_data:
-                game_id = unicode(game['game_id'])
-                # Don't receive points for non-participating games
-                if game_id not in player:
-                    continue
-
-                # Calculate spread
-                score_diff = game['home_score'] - game['away_score'] + game['spread_odds']
-                if game['home_name'] == player[game_id][0] and score_diff > 0:
-                    points += 1
-                elif game['away_name'] == player[game_id][0] and score_diff < 0:
-                    points += 1
-
-                if len(player[game_id]) > 1:
-                    # Calculate Over/Under
-                    total_score = game['home_score'] + game['away_score']
-                    weighted_score = total_score - game['spread_margin']
-                    if weighted_score > 0 and player[game_id][1][0] == 'O':
-                        points += 1
-                    elif weighted_score < 0 and player[game_id][1][0] == 'U':
-                        points += 1
-
-                    if len(player[game_id]) > 2:
-                        player_total = int(player[game_id][2])
-                        # Calculate Total Score
-                        if total_score == player_total:
-                            points += 1
-
-                        difference = total_score - player_total
-                        if difference <= 3 and difference >= -3:
-                            points += 1
+        return result
+
+    def tally(self, score_data, spreads_data):
+        """
+        Scores every player's picks against the games of a single week
+
+        arguments:
+        score_data -- list of score dicts of the week
+        spreads_data -- list of spread dicts of the week, one per player
+        """
+        result = []
 
+        for player in spreads_data:
             tally_up = {
                 'year': player['year'],
                 'week': player['week'],
                 'owner': player['owner'],
-                'score': points
-            } 
+                'score': 0,
+                'spread': 0,
+                'over_under': 0,
+                'total': 0
+            }
+
+            for game in score_data:
+                categories = score_categories(player, game)
+
+                for category in categories:
+                    tally_up[category] += categories[category]
+                    tally_up['score'] += categories[category]
 
             result.append(tally_up)
-            tally.save(week, [tally_up])
 
         return result
 
+    def standings(self, week=0):
+        """
+        Live standings of the week, built from the score and spread chains
+        the first time they are read and kept current as games are saved.
+        """
+        standings = Standings(SpreadFactory().get_instance())
+        result = None
+
+        if week == None or week == 0:
+            week = self._default_week()
+
+        week = utils.season_week(week)
+        result = standings.fetch(week)
+
+        if result == None:
+            scores = ScoreFactory().get_instance(depth=4)
+            result = standings.rebuild(week, scores.fetch(week) or [])
+
+        return result
+
+
+    def season_standings(self, year):
+        """
+        Ranked standings of the season, kept current as weeks are tallied.
+        Seasons without them yet are built from their stored tallies.
+
+        Returns None if the season has no tallies
+        """
+        season = SeasonStandings()
+        result = season.fetch(year)
+
+        if result == None:
+            result = season.rebuild(year, _TallyDatastore().fetch_season(year))
+
+        return result
 
     def _default_week(self):
         time_delta = datetime.datetime.now() - nfl.WEEK_ONE[nfl.YEAR]
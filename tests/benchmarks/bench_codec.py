@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+"""
+Compares the JSON memcache entries of scores and spreads against the binary
+cache codecs: time to encode and decode a week, and the bytes it takes.
+
+Run from the repository root:
+    PYTHONPATH=".:./tests" python tests/benchmarks/bench_codec.py
+"""
+from __future__ import unicode_literals
+
+import timeit
+
+from lib.cache_codec import JsonCodec
+from lib.cache_codec import MarshalCodec
+from lib.constants import DATA_BLOB as d
+from lib.constants import NFL as nfl
+from lib.constants import SPREAD_DATA_BLOB as sd
+
+from models.game_record import GameRecord
+from models.game_record import GameRecordCodec
+
+GAMES_PER_WEEK = 16
+ITERATIONS = 5000
+
+def score_entry():
+    games = [
+        GameRecord(**{
+            d.AWAY_NAME: "MIN",
+            d.AWAY_SCORE: 24,
+            d.GAME_CLOCK: "",
+            d.GAME_DAY: "Sun",
+            d.GAME_SEASON: nfl.YEAR,
+            d.GAME_STATUS: "Final",
+            d.GAME_TAG: "REG11",
+            d.GAME_TIME: "1:00",
+            d.GAME_WEEK: 11,
+            d.HOME_NAME: "BUF",
+            d.HOME_SCORE: 17,
+            d.NFL_GAME_ID: 56100 + index,
+            d.SPREAD_MARGIN: 41.5,
+            d.SPREAD_ODDS: -3.5
+        })
+        for index in range(GAMES_PER_WEEK)]
+
+    return {
+        "timestamp": 1479600000,
+        "base": 1479600000,
+        "version": 1479600000 + GAMES_PER_WEEK,
+        "changes": dict(
+            (unicode(game[d.NFL_GAME_ID]), 1479600000 + index)
+            for (index, game) in enumerate(games)),
+        "data": games
+    }
+
+def spread_entry():
+    picks = ["MIN", "BUF", "SEA", "NE", "KC", "DEN", "OAK", "SD", "GB", "CHI",
+             "DET", "PIT", "CLE", "BAL", "CIN", "HOU"]
+    spreads = []
+
+    for owner in range(12):
+        spread = {
+            d.GAME_SEASON: nfl.YEAR,
+            d.GAME_WEEK: 11,
+            sd.SPREAD_OWNER: "Owner" + unicode(owner)
+        }
+        spread.update(
+            (unicode(56100 + index), team) for (index, team) in enumerate(picks))
+        spreads.append(spread)
+
+    return {
+        "timestamp": 1479600000,
+        "data": spreads
+    }
+
+def measure(codec, entry):
+    value = codec.encode(entry)
+
+    assert codec.decode(value) == entry
+
+    encode_time = timeit.timeit(lambda: codec.encode(entry), number=ITERATIONS)
+    decode_time = timeit.timeit(lambda: codec.decode(value), number=ITERATIONS)
+
+    return (encode_time * 1e6 / ITERATIONS,
+            decode_time * 1e6 / ITERATIONS,
+            len(value))
+
+def main():
+    print "%d games per score week, %d iterations" % (GAMES_PER_WEEK, ITERATIONS)
+    print "%-8s %-16s %12s %12s %8s" % (
+        "entry", "codec", "encode usec", "decode usec", "bytes")
+
+    for (name, entry, codecs) in [
+            ("scores", score_entry(), [
+                ("json", JsonCodec(default=GameRecord.json_default)),
+                ("game record", GameRecordCodec())]),
+            ("spreads", spread_entry(), [
+                ("json", JsonCodec()),
+                ("marshal", MarshalCodec())])]:
+        for (codec_name, codec) in codecs:
+            print "%-8s %-16s %12.1f %12.1f %8d" % (
+                (name, codec_name) + measure(codec, entry))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+"""
+Compares decoding a full week of the scorestrip feed with the padding,
+overtime, unicode and mapper formatters, as frozen in test_lib, against the
+decoder FormatFactory hands out, both to dicts and to tuples. Production
+decodes the feed to tuples.
+
+Run from the repository root:
+    PYTHONPATH=".:./tests" python tests/benchmarks/bench_format.py
+"""
+from __future__ import unicode_literals
+
+import timeit
+
+from models.format_scores import FormatFactory
+from test_lib.baseline_format import FormatMapper
+from test_lib.baseline_format import FormatOvertime
+from test_lib.baseline_format import FormatPadding
+from test_lib.baseline_format import FormatUnicode
+
+GAMES_PER_WEEK = 16
+ITERATIONS = 2000
+REPEATS = 5
+
+def reg_feed():
+    games = []
+
+    for index in range(GAMES_PER_WEEK):
+        # Games not yet started leave most slots empty, as the live feed does
+        if index % 2 == 0:
+            games.append(
+                '["Sun","1:00","Pregame",,"MIN",,"BUF",,,,"%d",,"REG11","2016"]' %
+                (56100 + index))
+        else:
+            games.append(
+                '["Sun","1:00","final overtime",,"SF","15","KC","13",,,"%d",,"REG11","2016"]' %
+                (56100 + index))
+
+    return (b'{"ss":[' + b','.join(games).encode('utf-8') + b']}')
+
+def post_feed():
+    game = ('["Sat","4:30","final overtime",,"Baltimore Ravens","BAL","38",'
+            '"Denver Broncos","DEN","35",,,"%d",,"CBS","POST22","2016"]')
+    games = [game % (55800 + index) for index in range(GAMES_PER_WEEK)]
+
+    return (b'{"ss":[' + b','.join(games).encode('utf-8') + b']}')
+
+def measure(statement):
+    # The best of several runs is the least disturbed by the machine
+    return min(timeit.repeat(statement, number=ITERATIONS, repeat=REPEATS))
+
+def main():
+    chain = FormatPadding(FormatOvertime(FormatUnicode(FormatMapper(None))))
+    decoder = FormatFactory().get_instance()
+    tuple_decoder = FormatFactory().get_instance(as_tuples=True)
+
+    print "%d games per feed, %d iterations" % (GAMES_PER_WEEK, ITERATIONS)
+    print "%-8s %12s %12s %8s %12s %8s" % (
+        "feed", "chain usec", "dict usec", "speedup", "tuple usec", "speedup")
+
+    for (name, feed) in [("REG", reg_feed()), ("POST", post_feed())]:
+        assert chain.format(feed) == decoder.format(feed)
+
+        chain_time = measure(lambda: chain.format(feed))
+        decoder_time = measure(lambda: decoder.format(feed))
+        tuple_time = measure(lambda: tuple_decoder.format(feed))
+
+        print "%-8s %12.1f %12.1f %7.2fx %12.1f %7.2fx" % (
+            name,
+            chain_time * 1e6 / ITERATIONS,
+            decoder_time * 1e6 / ITERATIONS,
+            chain_time / decoder_time,
+            tuple_time * 1e6 / ITERATIONS,
+            chain_time / tuple_time)
+
+if __name__ == "__main__":
+    main()
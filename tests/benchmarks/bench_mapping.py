@@ -0,0 +1,109 @@
+#! /usr/bin/env python
+"""
+Compares mapping decoded scorestrip rows one branch at a time, as the mapper
+used to, against the row plans, both to dicts and to tuples. Production
+decodes the feed to tuples.
+
+Run from the repository root:
+    PYTHONPATH=".:./tests" python tests/benchmarks/bench_mapping.py
+"""
+from __future__ import unicode_literals
+
+import timeit
+
+from lib.constants import DATA_BLOB as d
+from lib.constants import NFL as nfl
+from lib.constants import SCOREBOARD as sb
+
+from models.format_scores import _game_record as game_record
+from models.format_scores import _map_game as map_game
+
+GAMES_PER_WEEK = 16
+ITERATIONS = 5000
+REPEATS = 5
+
+def branch_map_game(game):
+    """
+    Reference mapping, as _FormatMapper did it before row plans
+    """
+    game_tag = game[-2][:3]
+    week_prefix = nfl.WEEK_PREFIX[game_tag]
+
+    if "POS" == game_tag or "PRO" == game_tag:
+        week = ''.join(i for i in game[sb.POST_GAME_TAG] if i.isdigit())
+        return {
+            d.AWAY_NAME: game[sb.POST_AWAY_NAME] or "",
+            d.AWAY_SCORE: int(game[sb.POST_AWAY_SCORE]) or 0,
+            d.GAME_CLOCK: game[sb.POST_GAME_CLOCK] or "",
+            d.GAME_DAY: game[sb.POST_GAME_DAY] or "",
+            d.GAME_SEASON: int(game[sb.POST_GAME_SEASON]) or 0,
+            d.GAME_STATUS: game[sb.POST_GAME_STATUS] or "",
+            d.GAME_TAG: game[sb.POST_GAME_TAG],
+            d.GAME_TIME: game[sb.POST_GAME_TIME] or "",
+            d.GAME_WEEK: (int(week) or 0) + week_prefix,
+            d.HOME_NAME: game[sb.POST_HOME_NAME] or "",
+            d.HOME_SCORE: int(game[sb.POST_HOME_SCORE]) or 0,
+            d.NFL_GAME_ID: int(game[sb.POST_NFL_GAME_ID]) or 0
+            }
+
+    week = ''.join(i for i in game[sb.REG_GAME_TAG] if i.isdigit())
+    week = int(week) or 0
+    week_prefix = week_prefix if week < 100 else 0
+
+    return {
+        d.AWAY_NAME: game[sb.REG_AWAY_NAME] or "",
+        d.AWAY_SCORE: int(game[sb.REG_AWAY_SCORE]) or 0,
+        d.GAME_CLOCK: game[sb.REG_GAME_CLOCK] or "",
+        d.GAME_DAY: game[sb.REG_GAME_DAY] or "",
+        d.GAME_SEASON: int(game[sb.REG_GAME_SEASON]) or 0,
+        d.GAME_STATUS: game[sb.REG_GAME_STATUS] or "",
+        d.GAME_TAG: game[sb.REG_GAME_TAG] or "",
+        d.GAME_TIME: game[sb.REG_GAME_TIME] or "",
+        d.GAME_WEEK: week + week_prefix,
+        d.HOME_NAME: game[sb.REG_HOME_NAME] or "",
+        d.HOME_SCORE: int(game[sb.REG_HOME_SCORE]) or 0,
+        d.NFL_GAME_ID: int(game[sb.REG_NFL_GAME_ID]) or 0
+        }
+
+def reg_rows(tag):
+    return [
+        ["Sun", "1:00", "Final", 0, "MIN", "24", "BUF", "17", 0, 0,
+         unicode(56100 + index), 0, tag, "2016"]
+        for index in range(GAMES_PER_WEEK)]
+
+def post_rows():
+    return [
+        ["Sat", "4:30", "Final Overtime", 0, "Baltimore Ravens", "BAL", "38",
+         "Denver Broncos", "DEN", "35", 0, 0, unicode(55800 + index), 0, "CBS",
+         "POST22", "2016"]
+        for index in range(GAMES_PER_WEEK)]
+
+def measure(statement):
+    # The best of several runs is the least disturbed by the machine
+    return min(timeit.repeat(statement, number=ITERATIONS, repeat=REPEATS))
+
+def main():
+    print "%d games per feed, %d iterations" % (GAMES_PER_WEEK, ITERATIONS)
+    print "%-8s %12s %12s %8s %12s %8s" % (
+        "feed", "branch usec", "plan usec", "speedup", "tuple usec", "speedup")
+
+    for (name, rows) in [("PRE", reg_rows("PRE3")),
+                         ("REG", reg_rows("REG11")),
+                         ("POST", post_rows())]:
+        assert [branch_map_game(game) for game in rows] == \
+            [map_game(game) for game in rows]
+
+        branch_time = measure(lambda: [branch_map_game(game) for game in rows])
+        plan_time = measure(lambda: [map_game(game) for game in rows])
+        tuple_time = measure(lambda: [game_record(game) for game in rows])
+
+        print "%-8s %12.1f %12.1f %7.2fx %12.1f %7.2fx" % (
+            name,
+            branch_time * 1e6 / ITERATIONS,
+            plan_time * 1e6 / ITERATIONS,
+            branch_time / plan_time,
+            tuple_time * 1e6 / ITERATIONS,
+            branch_time / tuple_time)
+
+if __name__ == "__main__":
+    main()
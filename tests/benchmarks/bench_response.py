@@ -0,0 +1,49 @@
+#! /usr/bin/env python
+"""
+Compares the size and encode time of a week of scores as the handlers
+used to send it (indent=4) against the shared JsonResponse encoding.
+
+Run from the repository root:
+    PYTHONPATH=".:./tests" python tests/benchmarks/bench_response.py
+"""
+from __future__ import unicode_literals
+
+try: import simplejson as json
+except ImportError: import json
+import timeit
+
+import webapp2
+
+from lib.response import JsonResponse
+from test_lib.datablob_factory import DataBlobFactory
+
+GAMES_PER_WEEK = 16
+ITERATIONS = 2000
+
+def main():
+    factory = DataBlobFactory()
+    week = [factory.generate_data(week=211) for i in range(GAMES_PER_WEEK)]
+    request = webapp2.Request.blank('/scores')
+
+    before = json.dumps(week, indent = 4)
+    after = JsonResponse.encode(request, week)
+    gzipped = JsonResponse.gzip(after)
+
+    before_time = timeit.timeit(
+        lambda: json.dumps(week, indent = 4),
+        number=ITERATIONS)
+    after_time = timeit.timeit(
+        lambda: JsonResponse.encode(request, week),
+        number=ITERATIONS)
+    gzip_time = timeit.timeit(
+        lambda: JsonResponse.gzip(JsonResponse.encode(request, week)),
+        number=ITERATIONS)
+
+    print "%d games per week, %d iterations" % (GAMES_PER_WEEK, ITERATIONS)
+    print "%-16s %8s %14s" % ("encoding", "bytes", "usec/encode")
+    print "%-16s %8d %14.1f" % ("indent=4", len(before), before_time * 1e6 / ITERATIONS)
+    print "%-16s %8d %14.1f" % ("compact", len(after), after_time * 1e6 / ITERATIONS)
+    print "%-16s %8d %14.1f" % ("compact+gzip", len(gzipped), gzip_time * 1e6 / ITERATIONS)
+
+if __name__ == "__main__":
+    main()
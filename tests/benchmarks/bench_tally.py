@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+"""
+Compares scoring a whole season week by week, as TallyCalculator.count
+does, against the single vectorized pass of SeasonCalculator, at 10x and
+100x the size of our league.
+
+Run from the repository root:
+    PYTHONPATH=".:./tests" python tests/benchmarks/bench_tally.py
+"""
+from __future__ import unicode_literals
+
+import random
+import timeit
+
+from models.season import SeasonCalculator
+from models.tally import TallyCalculator
+
+LEAGUE_OWNERS = 12
+GAMES_PER_WEEK = 16
+WEEKS = range(201, 218)
+SCALES = [1, 10, 100]
+ITERATIONS = 3
+
+def season(owners):
+    teams = ['HOU', 'SD', 'DAL', 'NYG', 'SF', 'KC', 'NE', 'MIA']
+    result = []
+
+    for week in WEEKS:
+        games = []
+        for index in range(GAMES_PER_WEEK):
+            (home_name, away_name) = random.sample(teams, 2)
+            games.append({
+                'away_name': away_name,
+                'away_score': random.randint(0, 40),
+                'home_name': home_name,
+                'home_score': random.randint(0, 40),
+                'game_id': week * 100 + index,
+                'spread_odds': random.choice([-7.0, -3.5, 0.0, 3.0, 6.5]),
+                'spread_margin': random.choice([38.0, 41.5, 44.0, 47.5])
+            })
+
+        spreads = []
+        for owner in range(owners):
+            player = {'year': 2016, 'week': week, 'owner': "Owner" + unicode(owner)}
+            for game in games:
+                player[unicode(game['game_id'])] = [
+                    random.choice(teams),
+                    random.choice(['OV', 'UN']),
+                    unicode(random.randint(30, 60))]
+            spreads.append(player)
+
+        result.append((week, games, spreads))
+
+    return result
+
+def main():
+    weekly = TallyCalculator()
+    vectorized = SeasonCalculator()
+
+    print "%-8s %8s %12s %12s %8s" % ("scale", "picks", "weekly ms", "season ms", "speedup")
+
+    for scale in SCALES:
+        data = season(LEAGUE_OWNERS * scale)
+        picks = LEAGUE_OWNERS * scale * GAMES_PER_WEEK * len(WEEKS)
+
+        weekly_time = timeit.timeit(
+            lambda: [weekly.tally(score_data, spreads_data)
+                     for (week, score_data, spreads_data) in data],
+            number=ITERATIONS) / ITERATIONS
+        season_time = timeit.timeit(
+            lambda: vectorized.tally(data),
+            number=ITERATIONS) / ITERATIONS
+
+        print "%-8s %8d %12.1f %12.1f %7.1fx" % (
+            unicode(scale) + "x", picks, weekly_time * 1000, season_time * 1000,
+            weekly_time / season_time)
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ import unittest
 import webapp2
 
 import main
+from models.game_record import GameRecordCodec
 from models.score import ScoreModel
+from models.score import _ScoreLocalCache as ScoreLocalCache
 
 from lib.constants import DATA_BLOB as d
 from lib.constants import HTTP_CODE as http_code
@@ -25,11 +27,15 @@ class TestApiScores(unittest.TestCase):
         self.testbed.activate()
         self.testbed.init_datastore_v3_stub()
         self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub()
         self.testbed.init_urlfetch_stub()
         # Create the mocked service & inject it into the testbed
         self.fetch_mock = UrlFetchMock()
         self.testbed._register_stub(testbed.URLFETCH_SERVICE_NAME, self.fetch_mock)
 
+        # Weeks cached in-process by earlier tests would mask this one's data
+        ScoreLocalCache.cache.flush()
+
         self.app = main.get_app()
         # Define the endpoint for all our requests
         self.endpoint = "/scores"
@@ -70,6 +76,34 @@ class TestApiScores(unittest.TestCase):
             "application/json",
             "Content-Type is \"application/json\"")
 
+    def test_get_conditional(self):
+        """
+        A GET that presents the current ETag gets an empty 304 back
+        """
+        response = self.request.get_response(self.app)
+        etag = response.headers['ETag']
+
+        self.assertTrue(
+            'Last-Modified' in response.headers,
+            "Last-Modified header is set")
+
+        self.request = webapp2.Request.blank(self.endpoint)
+        self.request.headers['If-None-Match'] = etag
+        response = self.request.get_response(self.app)
+
+        self.assertEqual(
+            response.status_int,
+            http_code.NOT_MODIFIED,
+            "Status code 304 Not Modified")
+        self.assertEqual(
+            len(response.body),
+            0,
+            "Response body is empty")
+        self.assertEqual(
+            response.headers['ETag'],
+            etag,
+            "ETag is unchanged")
+
     def test_get_detect_week_parameter(self):
         """
         Call GET with the week parameter to specify the week to get.
@@ -236,7 +270,7 @@ class TestApiScores(unittest.TestCase):
         self.assertIsNotNone(
             query,
             "Memcache hit")
-        query = json.loads(query)
+        query = GameRecordCodec().decode(query)
         self.assertEqual(
             query['data'][0]['week'],
             self.week,
@@ -291,7 +325,7 @@ class TestApiScores(unittest.TestCase):
         self.assertIsNotNone(
             query,
             "Memcache hit")
-        query = json.loads(query)
+        query = GameRecordCodec().decode(query)
         self.assertEqual(
             query['data'][0]['week'],
             self.week,
@@ -9,6 +9,7 @@ import unittest
 from lib.constants import DATA_BLOB as d
 from lib.constants import SCOREBOARD as sb
 
+from models.game_record import GameRecordCodec
 from models.score import ScoreFactory
 from models.score import Score
 from models.score import ScoreModel
@@ -25,6 +26,7 @@ class TestScoreFactory(unittest.TestCase):
         self.testbed.activate()
         self.testbed.init_datastore_v3_stub()
         self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub()
         self.testbed.init_urlfetch_stub()
 
         # Create the mocked service & inject it into the testbed
@@ -62,7 +64,7 @@ class TestScoreFactory(unittest.TestCase):
             result_str,
             "Memcache miss")
 
-        result_dict = json.loads(result_str)['data'][0]
+        result_dict = GameRecordCodec().decode(result_str)['data'][0]
         self.assertEqual(
             len(result_dict),
             len(data),
@@ -196,7 +198,7 @@ class TestScoreFactory(unittest.TestCase):
             "Memcache hit")
 
         # Validate data retrieved from memcache
-        result_dict = json.loads(result_str)['data'][0]
+        result_dict = GameRecordCodec().decode(result_str)['data'][0]
         self.assertEqual(
             result_dict['away_score'],
             data['away_score'],
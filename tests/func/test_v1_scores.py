@@ -1,10 +1,23 @@
 from __future__ import unicode_literals
 
 
+from test_lib.gamefeed_factory import GameFeedFactory
+from test_lib.mock_service import UrlFetchMock
 from test_lib.test_game_factory import TestGameFactory
 from test_lib.utils import TestRequest
+import json
+import main_v1 as main
+import mock
 import unittest
+import webapp2
 
+from lib.constants import DATA_BLOB as d
+from lib.constants import HTTP_CODE as http_code
+from lib.constants import NFL as nfl
+from lib.constants import SCOREBOARD as sb
+from lib.http_cache import HttpCache
+from models.score import ScoreFactory
+from models.score import _ScoreLocalCache as ScoreLocalCache
 
 from google.appengine.ext import testbed
 from google.appengine.ext import ndb
@@ -15,6 +28,7 @@ class TestScoresAPI(unittest.TestCase):
         self.testbed.activate()
         self.testbed.init_memcache_stub()
         self.testbed.init_datastore_v3_stub()
+        self.testbed.init_taskqueue_stub()
         self.data_generator = TestGameFactory()
         self.request = TestRequest()
 
@@ -42,3 +56,135 @@ class TestScoresAPI(unittest.TestCase):
         check = body[0]
         self.assertEqual(check, test_data[0].to_dict())
 
+
+
+class TestScoreChangesAPI(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_taskqueue_stub()
+        self.testbed.init_urlfetch_stub()
+        # Create the mocked service & inject it into the testbed
+        self.fetch_mock = UrlFetchMock()
+        self.testbed._register_stub(testbed.URLFETCH_SERVICE_NAME, self.fetch_mock)
+        self.fetch_mock.set_return_values(
+            content=GameFeedFactory().generate_data('REG').encode("UTF-8"),
+            final_url=(sb.URL_REG).encode("UTF-8"),
+            status_code=200)
+
+        ScoreLocalCache.cache.flush()
+        self.request = TestRequest()
+        # 11 is the week of the regular season feed, 200 is its prefix
+        self.week = 211
+        self.endpoint = ("/api/v1/scores/year/" + unicode(nfl.YEAR) +
+                         "/week/" + unicode(self.week) + "/changes")
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_changes_since_version(self):
+        """
+        GET the full week, then only the games that changed since
+        """
+        body = self.request.get_request(self.endpoint)
+        self.assertTrue(body['full'], "No token gets the full week")
+        self.assertEqual(len(body['data']), 2, "Full week has both games")
+
+        version = body['version']
+        game = body['data'][0]
+        ScoreFactory().get_instance().save(self.week, [{
+            d.GAME_WEEK: self.week,
+            d.NFL_GAME_ID: game[d.NFL_GAME_ID],
+            d.HOME_SCORE: game[d.HOME_SCORE] + 7
+        }])
+
+        body = self.request.get_request(self.endpoint + "?since=" + unicode(version))
+        self.assertFalse(body['full'], "Current token gets only the changes")
+        self.assertEqual(len(body['data']), 1, "Only the changed game is returned")
+        self.assertEqual(body['data'][0][d.NFL_GAME_ID], game[d.NFL_GAME_ID])
+        self.assertEqual(body['data'][0][d.HOME_SCORE], game[d.HOME_SCORE] + 7)
+
+        body = self.request.get_request(self.endpoint + "?since=" + unicode(body['version']))
+        self.assertEqual(len(body['data']), 0, "Nothing changed since the latest version")
+
+    def test_changes_conditional(self):
+        """
+        The week stays current for the client until a game changes
+        """
+        response = webapp2.Request.blank(self.endpoint).get_response(main.application)
+        etag = response.headers['ETag']
+        game = json.loads(response.body)['data'][0]
+
+        request = webapp2.Request.blank(self.endpoint)
+        request.headers['If-None-Match'] = etag
+        response = request.get_response(main.application)
+        self.assertEqual(
+            response.status_int,
+            http_code.NOT_MODIFIED,
+            "Status code 304 Not Modified")
+
+        ScoreFactory().get_instance().save(self.week, [{
+            d.GAME_WEEK: self.week,
+            d.NFL_GAME_ID: game[d.NFL_GAME_ID],
+            d.HOME_SCORE: game[d.HOME_SCORE] + 7
+        }])
+        request = webapp2.Request.blank(self.endpoint)
+        request.headers['If-None-Match'] = etag
+        response = request.get_response(main.application)
+        self.assertEqual(
+            response.status_int,
+            http_code.OK,
+            "Changed week is sent again")
+        self.assertNotEqual(
+            response.headers['ETag'],
+            etag,
+            "Changed week has a new ETag")
+
+
+    def test_stream(self):
+        """
+        Long-poll for changes; a current token with no wait comes back empty
+        """
+        stream = ("/api/v1/scores/year/" + unicode(nfl.YEAR) +
+                  "/week/" + unicode(self.week) + "/stream")
+
+        body = self.request.get_request(stream + "?timeout=0")
+        self.assertTrue(body['full'], "No token gets the full week")
+        self.assertEqual(len(body['data']), 2, "Full week has both games")
+
+        response = webapp2.Request.blank(
+            stream + "?timeout=0&since=" + unicode(body['version'])).get_response(main.application)
+        self.assertEqual(
+            len(json.loads(response.body)['data']),
+            0,
+            "Nothing changed before the timeout")
+        self.assertEqual(
+            response.headers['Cache-Control'],
+            HttpCache.CACHE_CONTROL,
+            "Shared caches revalidate the response")
+
+    def test_stream_returns_change(self):
+        """
+        A change saved while the viewer waits is sent
+        """
+        stream = ("/api/v1/scores/year/" + unicode(nfl.YEAR) +
+                  "/week/" + unicode(self.week) + "/stream")
+        body = self.request.get_request(stream + "?timeout=0")
+        game = body['data'][0]
+
+        def save(seconds):
+            ScoreFactory().get_instance().save(self.week, [{
+                d.GAME_WEEK: self.week,
+                d.NFL_GAME_ID: game[d.NFL_GAME_ID],
+                d.HOME_SCORE: game[d.HOME_SCORE] + 7
+            }])
+
+        with mock.patch('models.score.time.sleep', side_effect=save) as sleep:
+            body = self.request.get_request(
+                stream + "?since=" + unicode(body['version']))
+
+        self.assertEqual(sleep.call_count, 1, "Waited once for the change")
+        self.assertEqual(len(body['data']), 1, "Only the changed game is returned")
+        self.assertEqual(body['data'][0][d.HOME_SCORE], game[d.HOME_SCORE] + 7)
@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+import unittest
+import webapp2
+
+from test_lib.utils import TestRequest
+
+import main_v1 as main
+
+from lib.constants import HTTP_CODE as http_code
+from models.tally import TallyModel
+from models.tally import _TallyDatastore as TallyDatastore
+
+from google.appengine.ext import testbed
+
+class TestSeasonStandingsAPI(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_datastore_v3_stub()
+        self.request = TestRequest()
+        self.year = 2013
+        self.endpoint = "/api/v1/standings/year/" + unicode(self.year)
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def __save_week(self, week, scores):
+        TallyDatastore().save(week, [
+            {
+                'year': self.year,
+                'week': week,
+                'owner': owner,
+                'score': score,
+                'spread': score,
+                'over_under': 0,
+                'total': 0
+            } for (owner, score) in scores.items()
+        ])
+
+    def test_missing_season(self):
+        response = webapp2.Request.blank(self.endpoint).get_response(main.application)
+
+        self.assertEqual(
+            response.status_int,
+            http_code.NOT_FOUND,
+            "Season without tallies is not found")
+
+    def test_season_standings(self):
+        self.__save_week(201, {'MegaMan': 3, 'Zero': 5})
+        self.__save_week(202, {'MegaMan': 4, 'Zero': 1})
+
+        body = self.request.get_request(self.endpoint)
+        self.assertEqual(
+            [(item['rank'], item['owner'], item['points']) for item in body['standings']],
+            [(1, 'MegaMan', 7), (2, 'Zero', 6)],
+            "Standings are ranked over the season")
+
+    def test_season_standings_from_stored_tallies(self):
+        """
+        Seasons tallied before their standings were kept are built on read
+        """
+        TallyModel(year=self.year, week=201, owner='MegaMan', score=3, spread=3).put()
+        TallyModel(year=self.year, week=202, owner='Zero', score=5, spread=5).put()
+
+        body = self.request.get_request(self.endpoint)
+        self.assertEqual(
+            [(item['rank'], item['owner'], item['points']) for item in body['standings']],
+            [(1, 'Zero', 5), (2, 'MegaMan', 3)],
+            "Standings were built from the stored tallies")
+
+    def test_get_conditional(self):
+        """
+        The standings stay current for the client until the next tally
+        """
+        self.__save_week(201, {'MegaMan': 3})
+        response = webapp2.Request.blank(self.endpoint).get_response(main.application)
+        etag = response.headers['ETag']
+
+        request = webapp2.Request.blank(self.endpoint)
+        request.headers['If-None-Match'] = etag
+        response = request.get_response(main.application)
+        self.assertEqual(
+            response.status_int,
+            http_code.NOT_MODIFIED,
+            "Status code 304 Not Modified")
+
+        self.__save_week(202, {'MegaMan': 2})
+        request = webapp2.Request.blank(self.endpoint)
+        request.headers['If-None-Match'] = etag
+        response = request.get_response(main.application)
+        self.assertEqual(
+            response.status_int,
+            http_code.OK,
+            "New tally changes the standings")
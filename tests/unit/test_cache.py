@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+from __future__ import unicode_literals
+
+import mock
+import unittest
+
+from lib.cache import LocalCache
+
+class TestLocalCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LocalCache(2, 60)
+
+    def test_miss(self):
+        self.assertIsNone(
+            self.cache.get(1),
+            "Empty cache misses")
+        self.assertEqual(
+            self.cache.stats(),
+            {"hits": 0, "misses": 1, "size": 0},
+            "Miss was counted")
+
+    def test_hit(self):
+        self.cache.put(1, "MegaMan")
+
+        self.assertEqual(
+            self.cache.get(1),
+            "MegaMan",
+            "Cached value returned")
+        self.assertEqual(
+            self.cache.stats(),
+            {"hits": 1, "misses": 0, "size": 1},
+            "Hit was counted")
+
+    def test_expired_entry_is_a_miss(self):
+        with mock.patch('lib.cache.time.time', return_value=1000):
+            self.cache.put(1, "MegaMan")
+
+        with mock.patch('lib.cache.time.time', return_value=1060):
+            self.assertIsNone(
+                self.cache.get(1),
+                "Entry expired after the threshold")
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put(1, "MegaMan")
+        self.cache.put(2, "Zero")
+
+        # Touch the oldest entry so the other one is evicted instead
+        self.cache.get(1)
+        self.cache.put(3, "Bass")
+
+        self.assertEqual(
+            self.cache.get(1),
+            "MegaMan",
+            "Recently used entry is kept")
+        self.assertIsNone(
+            self.cache.get(2),
+            "Least recently used entry was evicted")
+        self.assertEqual(
+            self.cache.stats()["size"],
+            2,
+            "Size is bounded by the capacity")
+
+    def test_discard_and_flush(self):
+        self.cache.put(1, "MegaMan")
+        self.cache.put(2, "Zero")
+
+        self.cache.discard(1)
+        self.assertIsNone(
+            self.cache.get(1),
+            "Discarded entry is gone")
+
+        self.cache.flush()
+        self.assertEqual(
+            self.cache.stats(),
+            {"hits": 0, "misses": 0, "size": 0},
+            "Flush clears entries and counters")
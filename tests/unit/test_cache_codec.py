@@ -0,0 +1,62 @@
+from __future__ import unicode_literals
+
+import unittest
+
+try: import simplejson as json
+except ImportError: import json
+
+from lib.cache_codec import JsonCodec
+from lib.cache_codec import MarshalCodec
+
+class TestCacheCodec(unittest.TestCase):
+    def setUp(self):
+        self.entry = {
+            "timestamp": 1476000000,
+            "data": [{"owner": "MegaMan", "picks": [1, 2.5, "Zürich", None]}]
+        }
+
+    def test_json_round_trip(self):
+        codec = JsonCodec()
+
+        self.assertEqual(
+            codec.decode(codec.encode(self.entry)),
+            self.entry,
+            "Entry survived JSON")
+
+    def test_marshal_round_trip(self):
+        codec = MarshalCodec()
+        value = codec.encode(self.entry)
+
+        self.assertEqual(
+            value[:1],
+            MarshalCodec.VERSION,
+            "Value starts with the version byte")
+        self.assertEqual(
+            codec.decode(value),
+            self.entry,
+            "Entry survived marshal")
+
+    def test_marshal_reads_legacy_json(self):
+        self.assertEqual(
+            MarshalCodec().decode(json.dumps(self.entry)),
+            self.entry,
+            "Entries stored as JSON are still read")
+
+    def test_marshal_falls_back_to_json(self):
+        codec = MarshalCodec(default=lambda value: "owner")
+        value = codec.encode({"data": [object()]})
+
+        self.assertEqual(
+            codec.decode(value),
+            {"data": ["owner"]},
+            "Entry marshal could not take was stored as JSON")
+
+    def test_undecodable(self):
+        codec = MarshalCodec()
+
+        self.assertIsNone(
+            codec.decode(MarshalCodec.VERSION + b'\xff'),
+            "Broken values are misses")
+        self.assertIsNone(
+            codec.decode(b'\x7f'),
+            "Values of unknown versions are misses")
@@ -37,16 +37,37 @@ class TestConstants(unittest.TestCase):
             c.DAYS["SUN"],
             6)
 
+    def test_eastern_offset(self):
+        self.assertEqual(
+            c.EASTERN_OFFSET,
+            -5)
+
     def test_encoding(self):
         self.assertEqual(
             c.ENCODING,
             "UTF-8")
 
+    def test_game_status(self):
+        self.assertEqual(
+            c.FINAL_STATUS,
+            "Final")
+        self.assertEqual(
+            c.PREGAME_STATUS,
+            "Pregame")
+
     def test_memcache_threshold(self):
         self.assertEqual(
             c.MEMCACHE_THRESHOLD,
             300)
 
+    def test_score_thresholds(self):
+        self.assertEqual(
+            c.LIVE_THRESHOLD,
+            60)
+        self.assertEqual(
+            c.PREGAME_THRESHOLD,
+            3600)
+
 class TestDataBlob(unittest.TestCase):
     def test_data_blob(self):
         self.assertEqual(
@@ -111,6 +132,9 @@ class TestHttpCode(unittest.TestCase):
         self.assertEqual(
             http_code.CREATED,
             201)
+        self.assertEqual(
+            http_code.NOT_MODIFIED,
+            304)
         self.assertEqual(
             http_code.NOT_FOUND,
             404)
@@ -120,6 +144,15 @@ class TestHttpCode(unittest.TestCase):
 
 class TestNfl(unittest.TestCase):
     def test_nfl(self):
+        self.assertEqual(
+            n.TEAM_ALIAS["AZ"],
+            "ARI")
+        self.assertEqual(
+            n.TEAM_ALIAS["JAC"],
+            "JAX")
+        self.assertEqual(
+            n.TEAM_ALIAS["WSH"],
+            "WAS")
         self.assertEqual(
             n.TEAM_NAME["ARIZONA"],
             "ARI")
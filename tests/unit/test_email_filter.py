@@ -1,3 +1,148 @@
 from __future__ import unicode_literals
 
-import unittest
\ No newline at end of file
+import unittest
+
+from lxml import html
+from lxml.html.clean import Cleaner
+
+from lib.pick_sheet import PickSheetParser
+from lib.pick_sheet import group_picks
+from lib.pick_sheet import team_abbreviation
+
+class TestPickSheetParser(unittest.TestCase):
+    REMOVE_TAGS = ['font', 'div', 'u', 'b', 'i']
+
+    def setUp(self):
+        self.parser = PickSheetParser(remove_tags=self.REMOVE_TAGS)
+
+    def __cleaned_tables(self, html_string):
+        """
+        Rows as read from a cleaned tree, one <tbody> at a time
+        """
+        cleaner = Cleaner(style=True,
+                          links=True,
+                          page_structure=True,
+                          javascript=True,
+                          scripts=True,
+                          remove_tags=self.REMOVE_TAGS)
+        result = []
+
+        for page in html.fromstring(html_string).xpath('//tbody'):
+            rows = []
+
+            for row in cleaner.clean_html(page):
+                rows.append([
+                    x.text.strip() for x in row
+                    if x.text != None and len(x.text.strip()) > 0 and
+                    '/' not in x.text and '-' not in x.text])
+
+            result.append(rows)
+
+        return result
+
+    def __assert_same_as_cleaner(self, html_string):
+        self.assertEqual(
+            self.parser.tables(html_string),
+            self.__cleaned_tables(html_string),
+            "Rows match the cleaned tree")
+
+    def test_pick_sheet(self):
+        sheet = ('<html><head><style>td { color: red; }</style></head><body>'
+                 '<table><tbody>'
+                 '<tr><td><b>Name</b></td><td><font>MegaMan</font></td><td>Zero</td></tr>'
+                 '<tr><td>1</td><td><font><b>HOU</b></font></td><td>SD</td></tr>'
+                 '<tr><td>2</td><td>UN<o:p></o:p></td><td>OV</td></tr>'
+                 '<tr><td>3</td><td>49</td><td>10/12</td></tr>'
+                 '</tbody></table></body></html>')
+
+        self.assertEqual(
+            self.parser.tables(sheet),
+            [[
+                ['Name', 'MegaMan', 'Zero'],
+                ['1', 'HOU', 'SD'],
+                ['2', 'UN', 'OV'],
+                ['3', '49']
+            ]],
+            "Every row of the sheet was read")
+        self.__assert_same_as_cleaner(sheet)
+
+    def test_cell_text_ends_at_kept_child(self):
+        sheet = ('<table><tbody><tr>'
+                 '<td>HOU<span>ignored</span>tail</td>'
+                 '<td><b>S</b>D<br>tail</td>'
+                 '<td>D<!-- comment -->AL<script>x</script></td>'
+                 '<td><select><option>NYG</option></select></td>'
+                 '</tr></tbody></table>')
+
+        self.assertEqual(
+            self.parser.tables(sheet),
+            [[['HOU', 'SD', 'DAL']]],
+            "Unwrapped tags, comments and scripts do not end the cell text")
+        self.__assert_same_as_cleaner(sheet)
+
+    def test_multiple_and_nested_tables(self):
+        sheet = ('<div><table><tbody><tr><td>Name</td><td>MegaMan</td></tr>'
+                 '<tr><td>1</td><td><table><tbody><tr><td>HOU</td><td>SD</td></tr>'
+                 '</tbody></table></td></tr></tbody></table>'
+                 '<table><tbody><font><tr><td>Name</td><td>Zero</td></tr></font>'
+                 '</tbody></table><table><tr><td>no</td><td>tbody</td></tr></table></div>')
+
+        self.assertEqual(
+            len(self.parser.tables(sheet)),
+            3,
+            "Tables without a <tbody> are not read")
+        self.__assert_same_as_cleaner(sheet)
+
+    def test_empty_document(self):
+        self.assertEqual(
+            self.parser.tables(''),
+            [],
+            "No tables in an empty document")
+
+class TestTeamAbbreviation(unittest.TestCase):
+    def test_known_names(self):
+        answer_key = [
+            ('HOU', 'HOU'),
+            ('hou', 'HOU'),
+            ('AZ', 'ARI'),
+            ('Green Bay', 'GB'),
+            (' JAC ', 'JAX')
+        ]
+
+        for (name, expected_result) in answer_key:
+            self.assertEqual(
+                team_abbreviation(name),
+                expected_result,
+                name + " goes by " + expected_result)
+
+    def test_unknown_name(self):
+        self.assertEqual(
+            team_abbreviation('lac'),
+            'LAC',
+            "Unknown names are upper-cased")
+
+class TestGroupPicks(unittest.TestCase):
+    def test_groups(self):
+        picks = ['HOU', 'UN', '49', 'SD', 'DAL', 'OV', '44.5', 'NYG']
+
+        self.assertEqual(
+            group_picks(picks),
+            [
+                (1, ['HOU', 'UN', '49']),
+                (2, ['SD']),
+                (3, ['DAL', 'OV', '44.5']),
+                (4, ['NYG'])
+            ],
+            "Picks followed by a total take the over/under with them")
+
+    def test_scratched_picks(self):
+        self.assertEqual(
+            group_picks(['x', 'HOU', 'X', 'SD', 'UN', '12']),
+            [(2, ['HOU']), (4, ['SD', 'UN', '12'])],
+            "Scratched picks are left out, but still counted")
+
+    def test_total_without_pick(self):
+        self.assertEqual(
+            group_picks(['UN', '49']),
+            [(1, ['UN']), (2, ['49'])],
+            "Trailing picks are taken one at a time")
@@ -9,12 +9,16 @@ from simplejson import JSONDecodeError
 
 from models.format_scores import FormatFactory
 from models.format_scores import Formatter
+from models.format_scores import GAME_FIELDS
 from test_lib.gamefeed_factory import GameFeedFactory
 
-from models.format_scores import _FormatMapper as FormatMapper
-from models.format_scores import _FormatOvertime as FormatOvertime
-from models.format_scores import _FormatPadding as FormatPadding
-from models.format_scores import _FormatUnicode as FormatUnicode
+from test_lib.baseline_format import FormatMapper
+from test_lib.baseline_format import FormatOvertime
+from test_lib.baseline_format import FormatPadding
+from test_lib.baseline_format import FormatUnicode
+
+from models.format_scores import _FormatDecoder as FormatDecoder
+from models.format_scores import _RowPlan as RowPlan
 
 class TestFormatFactory(unittest.TestCase):
     def setUp(self):
@@ -32,198 +36,171 @@ class TestFormatFactory(unittest.TestCase):
             issubclass(product.__class__, Formatter),
             "Received a Formatter from format factory")
 
-class TestFormatterAbstract(unittest.TestCase):
+class TestFormatDecoder(unittest.TestCase):
     def setUp(self):
-        self.formatter = Formatter()
-        self.input_str = "qwerasdfzxcv"
-
-    def tearDown(self):
-        pass
-
-    def test_initial(self):
-        self.assertIsNone(
-            self.formatter.next,
-            "Testing initial state")
-
-    def test_format_is_not_implemented(self):
-        with self.assertRaises(NotImplementedError):
-            self.formatter.format(self.input_str)
-
-    def test_protected_format_is_unimplemented(self):
-        with self.assertRaises(NotImplementedError):
-            self.formatter._format(self.input_str)
-
-class TestFormatPadding(unittest.TestCase):
-    def setUp(self):
-        self.formatter = FormatPadding(None)
-        pass
-
-    def tearDown(self):
-        pass
-
-    def test_creation(self):
-        formatter = FormatPadding(None)
-
-    def test_initial(self):
-        # Check super class
-        self.assertTrue(
-            issubclass(FormatPadding, Formatter),
-            "FormatPadding is a subclass of Formatter")
-
-        # Check next chain is missing
-        self.assertTrue(hasattr(self.formatter, "next"))
-        self.assertIsNone(
-            self.formatter.next,
-            "Default doesn't have next in chain")
-
-    def test_format_basic(self):
-        input_str = "a,b,c,d,e,f,g"
-
-        result = self.formatter.format(input_str)
-        self.assertEquals(
-            input_str,
-            result,
-            "Format did nothing")
-
-    def test_format_nothing(self):
-        input_str = ""
-
-        result = self.formatter.format(input_str)
-        self.assertEquals(
-            input_str,
-            result,
-            "Input & result strings are equals")
-
-    def test_format_to_pad(self):
-        input_str = "a,b,c,,,,d,e,f"
-
-        result = self.formatter.format(input_str)
-        self.assertEquals(
-            result,
-            "a,b,c,0,0,0,d,e,f",
-            "String was formatted properly")
-
-
-class TestFormatOvertime(unittest.TestCase):
-    def setUp(self):
-        self.formatter = FormatOvertime(None)
-        self.input_str = ""
-
-    def tearDown(self):
-        pass
+        self.formatter = FormatDecoder()
+        self.chain = FormatPadding(FormatOvertime(FormatUnicode(FormatMapper(None))))
+        self.data_generator = GameFeedFactory()
 
     def test_initial(self):
-        # Check super class
         self.assertTrue(
-            issubclass(FormatPadding, Formatter),
-            "FormatPadding is a subclass of Formatter")
-
-        # Check next chain is missing
-        self.assertTrue(hasattr(self.formatter, "next"))
+            issubclass(FormatDecoder, Formatter),
+            "FormatDecoder is a subclass of Formatter")
         self.assertIsNone(
             self.formatter.next,
             "Default doesn't have next in chain")
 
     def test_format_nothing(self):
-        self.input_str = ""
-
-        result = self.formatter.format(self.input_str)
         self.assertEquals(
-            self.input_str,
-            result,
+            self.formatter.format(""),
+            "",
             "Input & result strings are equal")
 
-    def test_format_basic(self):
-        self.input_str = "a,b,Final Overtime,final,overtime,Final Overtime,g"
-
-        result = self.formatter.format(self.input_str)
+    def test_format_invalid(self):
         self.assertEquals(
-            self.input_str,
-            result,
-            "Format did nothing")
-
-    def test_format_game_data_with_overtime(self):
-        self.input_str = "a,b,c,final overtime,e,f,g"
-
-        result = self.formatter.format(self.input_str)
-        self.assertEquals(
-            "a,b,c,Final Overtime,e,f,g",
-            result,
-            "String was formatted properly")
+            self.formatter.format("{\"ss\":[["),
+            [],
+            "Nothing decoded from an invalid feed")
+
+    def test_same_as_chain(self):
+        for data_type in ['PRE', 'POS', 'REG', 'TST']:
+            feed = self.data_generator.generate_data(data_type=data_type)
+            # The live feed leaves empty slots out
+            sparse = feed.replace(",0,", ",,").replace(",0,", ",,")
+
+            for input_str in [feed, sparse, sparse.encode('utf-8')]:
+                self.assertEqual(
+                    self.formatter.format(input_str),
+                    self.chain.format(input_str),
+                    "Decoded " + data_type + " feed as the chain does")
+
+    def test_format_pads_empty_slots(self):
+        result = self.formatter.format(
+            '{"ss":[["Sat","4:30","final overtime",,"BAL",'
+            '"38","DEN","35",,,"55829",,"REG11","2012"]]}')
+
+        self.assertEqual(
+            result[0][d.GAME_STATUS],
+            "Final Overtime",
+            "Overtime finals are capitalized")
+        self.assertEqual(
+            result[0][d.GAME_CLOCK],
+            "",
+            "Empty slots are filled")
+
+    def test_format_pads_runs_of_empty_slots(self):
+        result = self.formatter.format(
+            '{"ss":[["Sun","1:00","Pregame",,,,,,,,"56100",,"REG11","2016"]]}')
+        game = result[0]
+
+        self.assertEqual(
+            (game[d.AWAY_NAME], game[d.AWAY_SCORE], game[d.HOME_NAME], game[d.HOME_SCORE]),
+            ("", 0, "", 0),
+            "Every slot of a run is filled")
+        self.assertEqual(
+            game[d.NFL_GAME_ID],
+            56100,
+            "Columns after a run are in place")
+
+    def test_format_leaves_other_statuses(self):
+        for status in ["Final", "Final Overtime", "final", "overtime"]:
+            result = self.formatter.format(
+                '{"ss":[["Sun","1:00","' + status + '",,"MIN","16","BUF","20",'
+                ',,"56115",,"REG11","2013"]]}')
+
+            self.assertEqual(
+                result[0][d.GAME_STATUS],
+                status,
+                "Only overtime finals are capitalized")
+
+    def test_format_unicode(self):
+        feed = self.data_generator.generate_data(data_type='POS')
+
+        for input_str in [feed, feed.encode('utf-8')]:
+            result = self.formatter.format(input_str)
+
+            self.assertTrue(
+                all(isinstance(result[0][key], unicode)
+                    for key in [d.AWAY_NAME, d.GAME_STATUS, d.GAME_TAG]),
+                "Text is decoded to unicode strings")
+
+    def test_format_as_tuples(self):
+        formatter = FormatDecoder(as_tuples=True)
+
+        for data_type in ['PRE', 'POS', 'REG', 'TST']:
+            feed = self.data_generator.generate_data(data_type=data_type)
+
+            self.assertEqual(
+                formatter.format(feed),
+                [tuple(game[key] for key in GAME_FIELDS)
+                 for game in self.formatter.format(feed)],
+                "Tuples hold the " + data_type + " fields in GAME_FIELDS order")
+
+class TestRowPlan(unittest.TestCase):
+    def test_record(self):
+        plan = RowPlan(
+            [
+                (2, d.HOME_NAME, unicode),
+                (0, d.AWAY_SCORE, int),
+                (1, d.AWAY_NAME, unicode)
+            ],
+            3,
+            200)
+
+        self.assertEqual(
+            plan.record(["7", "HOU", "SD", "REG11"]),
+            ("HOU", 7, 211, "SD"),
+            "Columns were converted and put in GAME_FIELDS order")
+        self.assertEqual(
+            plan.map(["7", "HOU", "SD", "REG11"]),
+            {d.AWAY_NAME: "HOU", d.AWAY_SCORE: 7, d.GAME_WEEK: 211, d.HOME_NAME: "SD"},
+            "Columns were converted and keyed")
+        self.assertEqual(
+            plan.record(["0", "", "SD", "REG12"]),
+            ("", 0, 212, "SD"),
+            "Each tag has its own week")
+
+    def test_test_weeks(self):
+        columns = [(0, d.AWAY_NAME, unicode)]
+
+        self.assertEqual(
+            RowPlan(columns, 1, 100, test_weeks=True).record(["HOU", "PRE1234"]),
+            ("HOU", 1234),
+            "Test weeks go without a prefix")
+        self.assertEqual(
+            RowPlan(columns, 1, 300).record(["HOU", "POST1234"]),
+            ("HOU", 1534),
+            "Other plans always add the prefix")
 
-class TestFormatUnicode(unittest.TestCase):
+class TestFormatterAbstract(unittest.TestCase):
     def setUp(self):
-        self.formatter = FormatUnicode()
+        self.formatter = Formatter()
+        self.input_str = "qwerasdfzxcv"
 
     def tearDown(self):
         pass
 
     def test_initial(self):
-        # Check super class
-        self.assertTrue(
-            issubclass(FormatUnicode, Formatter),
-            "FormatPadding is a subclass of Formatter")
-
-        # Check next chain is missing
-        self.assertTrue(hasattr(self.formatter, "next"))
         self.assertIsNone(
             self.formatter.next,
-            "Default doesn't have next in chain")   
-
-    def test_format_nothing(self):
-        self.input_str = ""
-
-        result = self.formatter.format(self.input_str)
-        self.assertEquals(
-            self.input_str,
-            result,
-            "Input & result strings are equal")
-
-    def test_format_basic(self):
-        self.input_str = "a,b,c,d,e,f,g"
-
-        result = self.formatter.format(self.input_str)
-        self.assertTrue(
-            isinstance(result, unicode),
-            "String is unicode string")
+            "Testing initial state")
 
-    def test_format_unicode_string(self):
-        self.input_str = "a,b,c,d,e,f,g"
+    def test_format_is_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            self.formatter.format(self.input_str)
 
-        result = self.formatter.format(self.input_str)
-        self.assertTrue(
-            isinstance(result, unicode),
-            "String is unicode string")
+    def test_protected_format_is_unimplemented(self):
+        with self.assertRaises(NotImplementedError):
+            self.formatter._format(self.input_str)
 
-class TestFormatMapper(unittest.TestCase):
+class TestFormatDecoderMapping(unittest.TestCase):
     def setUp(self):
-        self.formatter = FormatMapper()
+        self.formatter = FormatDecoder()
         self.data_generator = GameFeedFactory()
     
     def tearDown(self):
         pass
 
-    def test_initial(self):
-        # Check super class
-        self.assertTrue(
-            issubclass(FormatUnicode, Formatter),
-            "FormatPadding is a subclass of Formatter")
-
-        # Check next chain is missing
-        self.assertTrue(hasattr(self.formatter, "next"))
-        self.assertIsNone(
-            self.formatter.next,
-            "Default doesn't have next in chain")
-
-    def test_format_nothing(self):
-        self.input_str = ""
-
-        result = self.formatter.format(self.input_str)
-        self.assertEquals(
-            self.input_str,
-            result,
-            "Input & result strings are equal")
-
     def test_format_regular_season(self):
         self.input_str = self.data_generator.generate_data(data_type='REG')
 
@@ -282,7 +259,7 @@ class TestFormatMapper(unittest.TestCase):
                 d.GAME_CLOCK: "",
                 d.GAME_DAY: "Sat",
                 d.GAME_SEASON: 2012,
-                d.GAME_STATUS: "final overtime",
+                d.GAME_STATUS: "Final Overtime",
                 d.GAME_TAG: "POST22",
                 d.GAME_TIME: "4:30",
                 d.GAME_WEEK: 22 + nfl.WEEK_PREFIX['POS'],
@@ -354,7 +331,7 @@ class TestFormatMapper(unittest.TestCase):
         self.input_str = (
             '{"ss":[["Thu","7:30","Final",,"ATL","23","BAL","27",,,"56112",,'
             '"PRE2","2013"],["Thu","7:30","Final",,"DET","6","CLE","24",,,'
-            '"56113",,"PRE2","2013"]]}')
+            '"56113",,"PRE2"')
 
         try:
             result = self.formatter.format(self.input_str)
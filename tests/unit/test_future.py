@@ -0,0 +1,104 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from lib.future import FallThrough
+from lib.future import Future
+
+class TestFuture(unittest.TestCase):
+    def test_resolves_once(self):
+        calls = []
+
+        def resolver():
+            calls.append(1)
+            return len(calls)
+
+        future = Future(resolver)
+        self.assertEqual(
+            len(calls),
+            0,
+            "Nothing is waited on until the result is asked for")
+        self.assertEqual(
+            future.get_result(),
+            1,
+            "Result comes from the resolver")
+        self.assertEqual(
+            future.get_result(),
+            1,
+            "Result is kept")
+        self.assertEqual(
+            len(calls),
+            1,
+            "Resolver ran once")
+
+    def test_resolved(self):
+        self.assertEqual(
+            Future.resolved([1, 2]).get_result(),
+            [1, 2],
+            "Known result is returned as is")
+
+    def test_then(self):
+        future = Future.resolved(2).then(lambda result: result * 3)
+
+        self.assertEqual(
+            future.get_result(),
+            6,
+            "Callback is given the result")
+
+class TestFallThrough(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+
+    def link(self, name, result, rest=None):
+        """
+        A chain link reading result; on a miss it falls through to rest
+        """
+        def read():
+            self.log.append("wait " + name)
+            return result
+
+        def fall_through():
+            if rest == None:
+                return Future.resolved(None)
+
+            return rest()
+
+        self.log.append("start " + name)
+
+        return FallThrough(Future(read), fall_through)
+
+    def test_hit(self):
+        future = self.link("memcache", [1], lambda: self.link("datastore", [2]))
+
+        self.assertEqual(
+            future.get_result(),
+            [1],
+            "Hit is returned")
+        self.assertEqual(
+            self.log,
+            ["start memcache", "wait memcache"],
+            "Rest of the chain was never asked")
+
+    def test_miss(self):
+        future = self.link("memcache", [], lambda: self.link("datastore", [2]))
+
+        self.assertEqual(
+            future.get_result(),
+            [2],
+            "Miss returns the rest of the chain's result")
+
+    def test_wait_all_overlaps_misses(self):
+        scores = self.link("score memcache", None, lambda: self.link("score datastore", [1]))
+        spreads = self.link("spread memcache", None, lambda: self.link("spread datastore", [2]))
+
+        self.assertEqual(
+            Future.wait_all([scores, spreads]),
+            [[1], [2]],
+            "Results in order")
+        self.assertEqual(
+            self.log,
+            ["start score memcache", "start spread memcache",
+             "wait score memcache", "start score datastore",
+             "wait spread memcache", "start spread datastore",
+             "wait score datastore", "wait spread datastore"],
+            "Both chains fell through before either next link was waited on")
@@ -0,0 +1,191 @@
+from __future__ import unicode_literals
+
+import copy
+import pickle
+import unittest
+
+try: import simplejson as json
+except ImportError: import json
+
+from lib.constants import DATA_BLOB as d
+from lib.constants import NFL as nfl
+
+from models.format_scores import GAME_FIELDS
+from models.game_record import GameRecord
+from models.game_record import GameRecordCodec
+
+class TestGameRecord(unittest.TestCase):
+    def setUp(self):
+        self.game = {
+            d.AWAY_NAME: 'HOU',
+            d.AWAY_SCORE: 28,
+            d.HOME_NAME: 'SD',
+            d.HOME_SCORE: 31,
+            d.GAME_SEASON: nfl.YEAR,
+            d.GAME_WEEK: 211,
+            d.NFL_GAME_ID: 1234,
+            d.SPREAD_ODDS: -3.5
+        }
+        self.record = GameRecord.from_dict(self.game)
+
+    def test_reads_like_a_dict(self):
+        self.assertEqual(
+            self.record[d.HOME_SCORE],
+            31,
+            "Fields are read by their key")
+        self.assertEqual(
+            (d.HOME_NAME in self.record, d.SPREAD_MARGIN in self.record, 'owner' in self.record),
+            (True, False, False),
+            "Only the fields given are in the record")
+        self.assertEqual(
+            self.record.get(d.SPREAD_MARGIN, 0.0),
+            0.0,
+            "Missing fields fall back to the default")
+        self.assertEqual(
+            dict(self.record),
+            self.game,
+            "Record turns back into the same dict")
+
+        with self.assertRaises(KeyError):
+            self.record[d.SPREAD_MARGIN]
+
+    def test_extra_keys_left_out(self):
+        record = GameRecord.from_dict(dict(self.game, owner='MegaMan'))
+
+        self.assertEqual(
+            record.to_dict(),
+            self.game,
+            "Keys outside of DATA_BLOB were left out")
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.record.home_score = 0
+        with self.assertRaises(TypeError):
+            self.record[d.HOME_SCORE] = 0
+
+    def test_merge(self):
+        result = self.record.merge({d.HOME_SCORE: 38, d.SPREAD_MARGIN: 49.5})
+
+        self.assertEqual(
+            result,
+            dict(self.game, home_score=38, spread_margin=49.5),
+            "Changes were laid over the fields")
+        self.assertEqual(
+            self.record,
+            self.game,
+            "Record itself was left as it was")
+
+    def test_equality(self):
+        self.assertTrue(
+            self.record == GameRecord(**self.game) and self.record == self.game,
+            "Records equal records and dicts of the same fields")
+        self.assertTrue(
+            self.record != self.record.merge({d.HOME_SCORE: 0}),
+            "Records of different fields differ")
+        self.assertEqual(
+            hash(self.record),
+            hash(GameRecord(**self.game)),
+            "Equal records hash alike")
+
+    def test_from_values(self):
+        values = tuple(self.game.get(field) for field in GAME_FIELDS)
+
+        self.assertEqual(
+            GameRecord.from_values(values).to_dict(),
+            dict((field, self.game.get(field)) for field in GAME_FIELDS),
+            "Tuples of the scoreboard fields fill the record in order")
+
+    def test_records(self):
+        records = [self.record]
+
+        self.assertIs(
+            GameRecord.records(records),
+            records,
+            "Lists of records are kept")
+        self.assertEqual(
+            GameRecord.records([self.game, self.record]),
+            [self.record, self.record],
+            "Dicts are made records")
+        self.assertIsNone(
+            GameRecord.records(None),
+            "Nothing to convert")
+
+    def test_to_dicts(self):
+        result = GameRecord.to_dicts([self.record])
+
+        self.assertEqual(
+            (type(result[0]), result),
+            (dict, [self.game]),
+            "Records were made dicts")
+
+    def test_json(self):
+        self.assertEqual(
+            json.loads(json.dumps([self.record], default=GameRecord.json_default)),
+            [self.game],
+            "Records are encoded as objects")
+
+    def test_copy_and_pickle(self):
+        self.assertIs(
+            copy.deepcopy(self.record),
+            self.record,
+            "Immutable records are shared, not copied")
+        self.assertEqual(
+            pickle.loads(pickle.dumps(self.record, pickle.HIGHEST_PROTOCOL)),
+            self.record,
+            "Records survive pickling")
+
+class TestGameRecordCodec(unittest.TestCase):
+    def setUp(self):
+        self.codec = GameRecordCodec()
+        self.game = {
+            d.AWAY_NAME: 'HOU',
+            d.AWAY_SCORE: 28,
+            d.HOME_NAME: 'SD',
+            d.HOME_SCORE: 31,
+            d.NFL_GAME_ID: 1234,
+            d.SPREAD_ODDS: -3.5
+        }
+        self.full_game = dict(
+            (field, index) for (index, field) in enumerate(GameRecord.FIELDS))
+        self.entry = {
+            'timestamp': 1476000000,
+            'version': 1476000000,
+            'data': [self.game, GameRecord.from_dict(self.full_game)]
+        }
+
+    def test_round_trip(self):
+        result = self.codec.decode(self.codec.encode(self.entry))
+
+        self.assertEqual(
+            result,
+            self.entry,
+            "Entry survived the codec")
+        self.assertEqual(
+            [type(game) for game in result['data']],
+            [GameRecord, GameRecord],
+            "Games are read back as records")
+        self.assertNotIn(
+            d.SPREAD_MARGIN,
+            result['data'][0],
+            "Fields never given stay missing")
+
+    def test_games_stored_without_names(self):
+        value = self.codec.encode(self.entry)
+
+        self.assertEqual(
+            value[:1],
+            GameRecordCodec.VERSION,
+            "Value starts with the version byte")
+        self.assertLess(
+            len(value),
+            len(json.dumps(self.entry, default=GameRecord.json_default)),
+            "Games take less room than as JSON objects")
+
+    def test_reads_legacy_json(self):
+        result = self.codec.decode(
+            json.dumps(self.entry, default=GameRecord.json_default))
+
+        self.assertEqual(
+            result,
+            self.entry,
+            "Entries stored as JSON are still read")
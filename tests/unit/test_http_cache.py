@@ -0,0 +1,146 @@
+#! /usr/bin/env python
+from __future__ import unicode_literals
+
+import unittest
+import webapp2
+
+from email.utils import formatdate
+
+from lib.constants import HTTP_CODE as http_code
+from lib.http_cache import HttpCache
+
+from google.appengine.ext import testbed
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_memcache_stub()
+
+        self.body = '[{"game_id": 56115}]'
+        self.tag = "SCORES_W211"
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_etag_is_strong_and_stable(self):
+        etag = HttpCache.etag(self.body)
+
+        self.assertTrue(
+            etag.startswith('"') and etag.endswith('"'),
+            "ETag is quoted")
+        self.assertEqual(
+            etag,
+            HttpCache.etag(self.body),
+            "Same body gives the same ETag")
+        self.assertNotEqual(
+            etag,
+            HttpCache.etag(self.body + ' '),
+            "Different body gives a different ETag")
+
+    def test_last_modified_tracks_etag_changes(self):
+        first = HttpCache.last_modified(self.tag, '"a"')
+
+        self.assertEqual(
+            HttpCache.last_modified(self.tag, '"a"'),
+            first,
+            "Unchanged ETag keeps its timestamp")
+        self.assertTrue(
+            HttpCache.last_modified(self.tag, '"b"') >= first,
+            "Changed ETag moves the timestamp forward")
+
+    def test_validate_without_conditions(self):
+        request = webapp2.Request.blank('/scores')
+        response = webapp2.Response()
+
+        self.assertFalse(
+            HttpCache.validate(request, response, self.tag, self.body),
+            "Unconditional request needs the body")
+        self.assertEqual(
+            response.headers['ETag'],
+            HttpCache.etag(self.body),
+            "ETag header set")
+        self.assertTrue(
+            'Last-Modified' in response.headers,
+            "Last-Modified header set")
+        self.assertEqual(
+            response.headers['Cache-Control'],
+            HttpCache.CACHE_CONTROL,
+            "Cache-Control header set")
+
+    def test_validate_if_none_match(self):
+        request = webapp2.Request.blank('/scores')
+        response = webapp2.Response()
+        request.headers['If-None-Match'] = '"stale", ' + HttpCache.etag(self.body)
+
+        self.assertTrue(
+            HttpCache.validate(request, response, self.tag, self.body),
+            "Matching ETag is current")
+        self.assertEqual(
+            response.status_int,
+            http_code.NOT_MODIFIED,
+            "Status code 304 Not Modified")
+        self.assertEqual(
+            response.headers['Vary'],
+            HttpCache.VARY,
+            "304 varies on the content encoding as the body does")
+
+    def test_validate_if_modified_since(self):
+        request = webapp2.Request.blank('/scores')
+        response = webapp2.Response()
+        last_modified = HttpCache.last_modified(self.tag, HttpCache.etag(self.body))
+
+        request.headers['If-Modified-Since'] = formatdate(last_modified, usegmt=True)
+        self.assertTrue(
+            HttpCache.validate(request, response, self.tag, self.body),
+            "Unmodified since the given date")
+
+        request.headers['If-Modified-Since'] = formatdate(last_modified - 60, usegmt=True)
+        self.assertFalse(
+            HttpCache.validate(request, response, self.tag, self.body),
+            "Modified since the given date")
+
+    def test_if_none_match_takes_precedence(self):
+        request = webapp2.Request.blank('/scores')
+        response = webapp2.Response()
+        last_modified = HttpCache.last_modified(self.tag, HttpCache.etag(self.body))
+
+        request.headers['If-None-Match'] = '"stale"'
+        request.headers['If-Modified-Since'] = formatdate(last_modified, usegmt=True)
+        self.assertFalse(
+            HttpCache.validate(request, response, self.tag, self.body),
+            "Mismatched ETag wins over the date")
+
+    def test_validate_version(self):
+        request = webapp2.Request.blank('/scores/changes')
+        response = webapp2.Response()
+        version = 1479600000
+
+        self.assertFalse(
+            HttpCache.validate_version(request, response, version),
+            "Unconditional request needs the body")
+        self.assertEqual(
+            response.headers['ETag'],
+            'W/"1479600000"',
+            "Weak ETag of the version set")
+        self.assertEqual(
+            response.headers['Last-Modified'],
+            formatdate(version, usegmt=True),
+            "Last-Modified is the version")
+
+        request.headers['If-None-Match'] = response.headers['ETag']
+        self.assertTrue(
+            HttpCache.validate_version(request, response, version),
+            "Current version is current")
+        self.assertEqual(
+            response.status_int,
+            http_code.NOT_MODIFIED,
+            "Status code 304 Not Modified")
+        self.assertEqual(
+            response.headers['Vary'],
+            HttpCache.VARY,
+            "304 varies on the content encoding as the body does")
+        self.assertFalse(
+            HttpCache.validate_version(webapp2.Request.blank('/scores/changes', headers={
+                'If-None-Match': 'W/"1479600000"'}), webapp2.Response(), version + 1),
+            "Newer version needs the body")
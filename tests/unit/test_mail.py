@@ -0,0 +1,92 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from google.appengine.api import mail
+from google.appengine.ext import testbed
+
+from controllers.mails import ReceiveMail
+from models.mail import MailModel
+
+class TestMailModel(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_build_key(self):
+        self.assertEqual(
+            MailModel.build_key('abc123').name(),
+            'Mabc123',
+            "Key is named after the digest")
+
+    def test_initialization(self):
+        key = MailModel.build_key('abc123')
+        MailModel(key_name=key.name(), message="raw").put()
+
+        result = MailModel.get(key)
+        self.assertEqual(
+            result.message,
+            "raw",
+            "Message was stored")
+        self.assertFalse(
+            result.processed,
+            "Message is not processed yet")
+
+class TestReceiveMail(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub()
+        self.taskqueue = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def __message(self, body, content_type='text/html'):
+        """
+        Builds the message from raw MIME, as received mail is
+        """
+        return mail.InboundEmailMessage(
+            "From: megaman@example.com\r\n"
+            "To: spreads@example.com\r\n"
+            "Subject: Week 1\r\n"
+            "Content-Type: " + content_type + "; charset=utf-8\r\n"
+            "\r\n" + body)
+
+    def test_receive_queues_once(self):
+        body = '<table><tbody><tr><td>Name</td><td>MegaMan</td></tr></tbody></table>'
+
+        ReceiveMail().receive(self.__message(body))
+        ReceiveMail().receive(self.__message(body))
+
+        self.assertEqual(
+            MailModel.all().count(),
+            1,
+            "Message was stored once")
+        self.assertEqual(
+            len(self.taskqueue.GetTasks('default')),
+            1,
+            "Message was queued once")
+        self.assertFalse(
+            MailModel.all().get().processed,
+            "Message is left to the task")
+
+    def test_receive_without_html(self):
+        ReceiveMail().receive(self.__message("Week 1 picks", 'text/plain'))
+        ReceiveMail().receive(self.__message("Week 2 picks", 'text/plain'))
+        ReceiveMail().receive(self.__message("", 'text/html'))
+
+        self.assertEqual(
+            MailModel.all().count(),
+            3,
+            "Messages without an HTML body were each stored")
+        self.assertEqual(
+            len(self.taskqueue.GetTasks('default')),
+            3,
+            "Messages without an HTML body were each queued")
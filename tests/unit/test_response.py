@@ -0,0 +1,80 @@
+#! /usr/bin/env python
+from __future__ import unicode_literals
+
+import json
+import unittest
+import webapp2
+import zlib
+
+from lib.response import JsonResponse
+
+class TestJsonResponse(unittest.TestCase):
+    def setUp(self):
+        self.data = [{"game_id": i, "home_name": "HOU", "away_name": "SD"} for i in range(100)]
+
+    def test_encode_compact_by_default(self):
+        request = webapp2.Request.blank('/scores')
+        body = JsonResponse.encode(request, self.data)
+
+        self.assertFalse(
+            ' ' in body or '\n' in body,
+            "Compact body has no whitespace")
+        self.assertEqual(
+            json.loads(body),
+            self.data,
+            "Body decodes to the same data")
+
+    def test_encode_pretty(self):
+        request = webapp2.Request.blank('/scores?pretty=1')
+        body = JsonResponse.encode(request, self.data)
+
+        self.assertTrue(
+            '\n    ' in body,
+            "Pretty body is indented")
+        self.assertEqual(
+            json.loads(body),
+            self.data,
+            "Body decodes to the same data")
+
+    def test_content_encoding(self):
+        request = webapp2.Request.blank('/scores')
+        body = JsonResponse.encode(request, self.data)
+
+        self.assertIsNone(
+            JsonResponse.content_encoding(request, body),
+            "No Accept-Encoding means no compression")
+
+        request.headers['Accept-Encoding'] = 'deflate, gzip'
+        self.assertEqual(
+            JsonResponse.content_encoding(request, body),
+            'gzip',
+            "gzip is accepted")
+        self.assertIsNone(
+            JsonResponse.content_encoding(request, '[]'),
+            "Small bodies are not compressed")
+
+        request.headers['Accept-Encoding'] = 'gzip;q=0'
+        self.assertIsNone(
+            JsonResponse.content_encoding(request, body),
+            "gzip was refused")
+
+    def test_write_gzip(self):
+        request = webapp2.Request.blank('/scores')
+        response = webapp2.Response()
+        body = JsonResponse.encode(request, self.data)
+        request.headers['Accept-Encoding'] = 'gzip'
+
+        JsonResponse.write(request, response, body)
+
+        self.assertEqual(
+            response.headers['Content-Encoding'],
+            'gzip',
+            "Content-Encoding is set")
+        self.assertEqual(
+            response.headers['Vary'],
+            'Accept-Encoding',
+            "Vary is set")
+        self.assertEqual(
+            zlib.decompress(response.body, 16 + zlib.MAX_WBITS),
+            body,
+            "Body decompresses to the encoded data")
@@ -3,23 +3,32 @@ from __future__ import unicode_literals
 
 import datetime
 import json
+import mock
 import unittest
 
 from test_lib.datablob_factory import DataBlobFactory
+from test_lib.gamefeed_factory import GameFeedFactory
 
 from lib.constants import DATA_BLOB as d
 from lib.constants import HTTP_CODE as http_code
 from lib.constants import NFL as nfl
 from lib.constants import SCOREBOARD as sb
+from lib.utils import Utils as utils
 
+from models.game_record import GameRecordCodec
 from models.score import Score
+from models.score import ScoreIngester
 from models.score import ScoreModel
 from models.score import _ScoreDatastore as ScoreDatastore
+from models.score import _ScoreLocalCache as ScoreLocalCache
 from models.score import _ScoreMemcache as ScoreMemcache
 from models.score import _ScoreSource as ScoreSource
 from models.score import _ScoreFilter as ScoreFilter
+from models.standings import Standings
 
 from google.appengine.api import memcache
+from google.appengine.ext import db
+from google.appengine.ext import deferred
 from google.appengine.ext import testbed
 
 from test_lib.mock_service import UrlFetchMock
@@ -96,7 +105,181 @@ class TestScoreAbstract(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             self.score._save_score(self.week, data)
 
+class TestScoreWatch(unittest.TestCase):
+    class TestVersionedScore(Score):
+        def __init__(self, versions):
+            self.versions = versions
+            self.version_count = 0
+            self.fetch_count = 0
+            super(TestScoreWatch.TestVersionedScore, self).__init__()
+
+        def version(self, week):
+            self.version_count += 1
+            return self.versions.pop(0)
+
+        def fetch_changes(self, week, since):
+            self.fetch_count += 1
+            return {"version": since, "full": False, "data": []}
+
+    def test_watch_waits_for_new_version(self):
+        score = self.TestVersionedScore([10, 10, 11])
+
+        with mock.patch('models.score.time.sleep') as sleep:
+            score.watch(211, 10, 60)
+
+        self.assertEqual(
+            score.version_count,
+            3,
+            "Checked the version until it moved")
+        self.assertEqual(
+            sleep.call_count,
+            2,
+            "Waited between checks")
+        self.assertEqual(
+            score.fetch_count,
+            1,
+            "Fetched the changes once")
+
+    def test_watch_fetches_stale_week(self):
+        score = self.TestVersionedScore([None])
+
+        with mock.patch('models.score.time.sleep') as sleep:
+            score.watch(211, 10, 60)
+
+        self.assertEqual(
+            sleep.call_count,
+            0,
+            "A week without a fresh copy is fetched right away")
+        self.assertEqual(
+            score.fetch_count,
+            1,
+            "Fetched the changes once")
+
+    def test_watch_times_out(self):
+        score = self.TestVersionedScore([10])
+
+        result = score.watch(211, 10, 0)
+        self.assertEqual(
+            len(result['data']),
+            0,
+            "Nothing changed before the timeout")
+
+class TestScoreLocalCache(unittest.TestCase):
+    class TestCountingScore(Score):
+        def __init__(self, test_data):
+            self.test_data = test_data
+            self.fetch_count = 0
+            self.save_count = 0
+            super(TestScoreLocalCache.TestCountingScore, self).__init__()
+
+        def _fetch_score(self, week):
+            self.fetch_count += 1
+            return self.test_data
+
+        def _save_score(self, week, data):
+            self.save_count += 1
+            return len(data)
+
+    def setUp(self):
+        ScoreLocalCache.cache.flush()
+
+        self.factory = DataBlobFactory()
+        self.timestamp = int(datetime.datetime.now().strftime('%s'))
+        self.week = self.timestamp % 1000 + 50
+        self.data = [self.factory.generate_data(week=self.week)]
+        self.source = self.TestCountingScore(self.data)
+        self.score_local = ScoreLocalCache(self.source)
+
+    def tearDown(self):
+        ScoreLocalCache.cache.flush()
+
+    def test_super_class(self):
+        self.assertTrue(
+            issubclass(ScoreLocalCache, Score),
+            "ScoreLocalCache is a subclass of Score")
+
+    def test_fetch_caches_decoded_week(self):
+        result = self.score_local.fetch(self.week)
+        self.assertEqual(
+            result[0][d.NFL_GAME_ID],
+            self.data[0][d.NFL_GAME_ID],
+            "NFL game ID matches")
+
+        result = self.score_local.fetch(self.week)
+        self.assertEqual(
+            self.source.fetch_count,
+            1,
+            "Second fetch was served in-process")
+        self.assertEqual(
+            ScoreLocalCache.cache.stats()['hits'],
+            1,
+            "Hit was counted")
+
+    def test_fetch_returns_copies(self):
+        self.score_local.fetch(self.week)
+
+        result = self.score_local.fetch(self.week)
+        del result[:]
+
+        result = self.score_local.fetch(self.week)
+        self.assertEqual(
+            result,
+            self.data,
+            "Cached week is unaffected by callers")
+
+        with self.assertRaises(TypeError):
+            result[0][d.HOME_SCORE] += 7
+
+    def test_fetch_async_caches_week(self):
+        future = self.score_local.fetch_async(self.week)
+        self.assertEqual(
+            future.get_result()[0][d.NFL_GAME_ID],
+            self.data[0][d.NFL_GAME_ID],
+            "NFL game ID matches")
+
+        result = self.score_local.fetch_async(self.week).get_result()
+        self.assertEqual(
+            self.source.fetch_count,
+            1,
+            "Second fetch was served in-process")
+        self.assertEqual(
+            result[0][d.NFL_GAME_ID],
+            self.data[0][d.NFL_GAME_ID],
+            "Cached week matches")
+
+    def test_save_invalidates(self):
+        self.score_local.fetch(self.week)
+
+        result = self.score_local.save(self.week, self.data)
+        self.assertEqual(
+            result,
+            1,
+            "Save went through the chain")
+        self.assertEqual(
+            self.source.save_count,
+            1,
+            "Next link in the chain saved")
+
+        self.score_local.fetch(self.week)
+        self.assertEqual(
+            self.source.fetch_count,
+            2,
+            "Fetch after save goes back to the chain")
+
 class TestScoreMemcache(unittest.TestCase):
+    class TestCountingScore(Score):
+        def __init__(self, test_data):
+            self.test_data = test_data
+            self.fetch_count = 0
+            super(TestScoreMemcache.TestCountingScore, self).__init__()
+
+        def _fetch_score(self, week):
+            self.fetch_count += 1
+            return self.test_data
+
+        def _save_score(self, week, data):
+            return len(data)
+
     def setUp(self):
         self.testbed = testbed.Testbed()
         self.testbed.activate()
@@ -148,6 +331,317 @@ class TestScoreMemcache(unittest.TestCase):
             data['data'][d.NFL_GAME_ID],
             "NFL game ID matches")
 
+    def test_fetch_async(self):
+        data = self.factory.generate_data(
+            timestamp=self.timestamp,
+            week=self.week)
+        tag = "SCORES_S2016W" + unicode(self.week)
+        memcache.add(tag, json.dumps(data))
+
+        result = self.score_memcache.fetch_async(self.week).get_result()
+        self.assertEqual(
+            result,
+            self.score_memcache.fetch(self.week),
+            "Same result as fetch")
+
+    def test_fetch_async_refreshes_from_chain(self):
+        data = [self.factory.generate_data(week=self.week)]
+        source = self.TestCountingScore(data)
+        score_memcache = ScoreMemcache(source)
+
+        future = score_memcache.fetch_async(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            0,
+            "Next link is not asked before the result is")
+        self.assertEqual(
+            future.get_result()[0][d.NFL_GAME_ID],
+            data[0][d.NFL_GAME_ID],
+            "NFL game ID matches")
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Refreshed from the next link in the chain")
+
+        score_memcache.fetch_async(self.week).get_result()
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Second fetch is served from memcache")
+
+    def test_fetch_many(self):
+        cached = self.factory.generate_data(
+            timestamp=self.timestamp,
+            week=self.week)
+        data = [self.factory.generate_data(week=self.week + 1)]
+        source = self.TestCountingScore(data)
+        score_memcache = ScoreMemcache(source)
+        memcache.add("SCORES_S2016W" + unicode(self.week), json.dumps(cached))
+
+        result = score_memcache.fetch_many([self.week, self.week + 1])
+        self.assertEqual(
+            result[self.week],
+            cached['data'],
+            "Cached week was served from memcache")
+        self.assertEqual(
+            result[self.week + 1][0][d.NFL_GAME_ID],
+            data[0][d.NFL_GAME_ID],
+            "Missing week came from the next link")
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Only the missing week was asked for")
+        self.assertIsNone(
+            memcache.get("LEASE_SCORES_S2016W" + unicode(self.week + 1)),
+            "Lease was released")
+
+        score_memcache.fetch_many([self.week, self.week + 1])
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Missing week was stored")
+
+    def test_fetch_refresh_releases_lease(self):
+        """
+        A refresh through the chain holds the week's lease only while it runs
+        """
+        data = [self.factory.generate_data(week=self.week)]
+        source = self.TestCountingScore(data)
+        score_memcache = ScoreMemcache(source)
+        lease_tag = "LEASE_SCORES_S2016W" + unicode(self.week)
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Refreshed from the next link in the chain")
+        self.assertEqual(
+            result[0][d.NFL_GAME_ID],
+            data[0][d.NFL_GAME_ID],
+            "NFL game ID matches")
+        self.assertIsNone(
+            memcache.get(lease_tag),
+            "Lease was released")
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Second fetch is served from memcache")
+
+    def test_fetch_stale_while_leased(self):
+        """
+        Requests that lose the lease are served the stale copy
+        """
+        stale = self.factory.generate_data(
+            timestamp=self.timestamp - 1000,
+            week=self.week)
+        source = self.TestCountingScore([self.factory.generate_data(week=self.week)])
+        score_memcache = ScoreMemcache(source, soft_threshold=300, hard_threshold=1800)
+        tag = "SCORES_S2016W" + unicode(self.week)
+        lease_tag = "LEASE_" + tag
+
+        memcache.add(tag, json.dumps(stale))
+        memcache.add(lease_tag, self.timestamp)
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            0,
+            "Did not refresh while another request holds the lease")
+        self.assertEqual(
+            result[d.NFL_GAME_ID],
+            stale['data'][d.NFL_GAME_ID],
+            "Stale copy was served")
+
+    @mock.patch('models.score.time.sleep')
+    def test_fetch_wait_times_out_while_leased(self, sleep):
+        """
+        Requests that outwait a refresh still running do not refresh too
+        """
+        source = self.TestCountingScore([self.factory.generate_data(week=self.week)])
+        score_memcache = ScoreMemcache(source)
+        lease_tag = "LEASE_SCORES_S2016W" + unicode(self.week)
+
+        memcache.add(lease_tag, self.timestamp)
+
+        self.assertIsNone(
+            score_memcache.fetch(self.week),
+            "Nothing to serve")
+        self.assertEqual(
+            source.fetch_count,
+            0,
+            "Did not refresh while another request holds the lease")
+        self.assertEqual(
+            memcache.get(lease_tag),
+            self.timestamp,
+            "Lease was left to its holder")
+
+    @mock.patch('models.score.time.sleep')
+    def test_fetch_wait_times_out_takes_lease(self, sleep):
+        """
+        Requests that outwait a refresh that died take over its lease
+        """
+        data = [self.factory.generate_data(week=self.week)]
+        source = self.TestCountingScore(data)
+        score_memcache = ScoreMemcache(source)
+        lease_tag = "LEASE_SCORES_S2016W" + unicode(self.week)
+
+        memcache.add(lease_tag, self.timestamp)
+        sleep.side_effect = lambda seconds: memcache.delete(lease_tag)
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Refreshed from the next link in the chain")
+        self.assertEqual(
+            result[0][d.NFL_GAME_ID],
+            data[0][d.NFL_GAME_ID],
+            "Fresh data was served")
+        self.assertIsNone(
+            memcache.get(lease_tag),
+            "Lease was released")
+
+    @mock.patch('models.score.time.sleep')
+    def test_fetch_wait_times_out_serves_stale(self, sleep):
+        """
+        Requests that outwait a refresh serve a copy stored meanwhile, even
+        a stale one
+        """
+        stale = self.factory.generate_data(
+            timestamp=self.timestamp - 4000,
+            week=self.week)
+        source = self.TestCountingScore([self.factory.generate_data(week=self.week)])
+        score_memcache = ScoreMemcache(source, soft_threshold=300, hard_threshold=1800)
+        tag = "SCORES_S2016W" + unicode(self.week)
+
+        memcache.add("LEASE_" + tag, self.timestamp)
+        sleep.side_effect = lambda seconds: memcache.set(tag, json.dumps(stale))
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            0,
+            "Did not refresh while another request holds the lease")
+        self.assertEqual(
+            result[d.NFL_GAME_ID],
+            stale['data'][d.NFL_GAME_ID],
+            "Stale copy was served")
+
+    def test_fetch_soft_stale_queues_refresh(self):
+        """
+        Data past the soft threshold is served while a refresh is queued
+        """
+        self.testbed.init_taskqueue_stub()
+        taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+        stale = self.factory.generate_data(
+            timestamp=self.timestamp - 400,
+            week=self.week)
+        source = self.TestCountingScore([self.factory.generate_data(week=self.week)])
+        score_memcache = ScoreMemcache(source, soft_threshold=300, hard_threshold=1800)
+        tag = "SCORES_S2016W" + unicode(self.week)
+
+        memcache.add(tag, json.dumps(stale))
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            result[d.NFL_GAME_ID],
+            stale['data'][d.NFL_GAME_ID],
+            "Stale copy was served")
+        self.assertEqual(
+            source.fetch_count,
+            0,
+            "Request did not wait on the refresh")
+        self.assertEqual(
+            len(taskqueue_stub.get_filtered_tasks()),
+            1,
+            "Refresh was queued")
+
+        score_memcache.fetch(self.week)
+        self.assertEqual(
+            len(taskqueue_stub.get_filtered_tasks()),
+            1,
+            "Refresh is only queued once")
+
+    def test_fetch_hard_stale_blocks(self):
+        """
+        Data past the hard threshold is refreshed before being served
+        """
+        stale = self.factory.generate_data(
+            timestamp=self.timestamp - 4000,
+            week=self.week)
+        data = [self.factory.generate_data(week=self.week)]
+        source = self.TestCountingScore(data)
+        score_memcache = ScoreMemcache(source, soft_threshold=300, hard_threshold=1800)
+        tag = "SCORES_S2016W" + unicode(self.week)
+
+        memcache.add(tag, json.dumps(stale))
+
+        result = score_memcache.fetch(self.week)
+        self.assertEqual(
+            source.fetch_count,
+            1,
+            "Refreshed from the next link in the chain")
+        self.assertEqual(
+            result[0][d.NFL_GAME_ID],
+            data[0][d.NFL_GAME_ID],
+            "Fresh data was served")
+
+    @mock.patch.object(utils, 'default_week', return_value=11)
+    def test_fetch_finished_week_never_stale(self, default_week):
+        """
+        Weeks that can no longer change are served however old they are
+        """
+        stale = self.factory.generate_data(
+            timestamp=self.timestamp - 100000,
+            week=nfl.WEEK_PREFIX['REG'] + 11)
+        stale['data'][d.GAME_STATUS] = "Final Overtime"
+        source = self.TestCountingScore([self.factory.generate_data(week=self.week)])
+        score_memcache = ScoreMemcache(source)
+
+        memcache.add(
+            "SCORES_S2016W" + unicode(stale['data'][d.GAME_WEEK]),
+            json.dumps(stale))
+
+        result = score_memcache.fetch(stale['data'][d.GAME_WEEK])
+        self.assertEqual(
+            source.fetch_count,
+            0,
+            "Finished week was not refreshed")
+        self.assertEqual(
+            result[d.NFL_GAME_ID],
+            stale['data'][d.NFL_GAME_ID],
+            "Cached copy was served")
+
+    @mock.patch.object(utils, 'default_week', return_value=11)
+    def test_fetch_live_week_refreshes_sooner(self, default_week):
+        """
+        Live games go stale well before the default threshold
+        """
+        self.testbed.init_taskqueue_stub()
+        taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+        stale = self.factory.generate_data(
+            timestamp=self.timestamp - 120,
+            week=nfl.WEEK_PREFIX['REG'] + 11)
+        stale['data'][d.GAME_STATUS] = "Halftime"
+        source = self.TestCountingScore([self.factory.generate_data(week=self.week)])
+        score_memcache = ScoreMemcache(source)
+
+        memcache.add(
+            "SCORES_S2016W" + unicode(stale['data'][d.GAME_WEEK]),
+            json.dumps(stale))
+
+        result = score_memcache.fetch(stale['data'][d.GAME_WEEK])
+        self.assertEqual(
+            result[d.NFL_GAME_ID],
+            stale['data'][d.NFL_GAME_ID],
+            "Stale copy was served")
+        self.assertEqual(
+            len(taskqueue_stub.get_filtered_tasks()),
+            1,
+            "Refresh was queued")
+
     def test_save(self):
         data = [
             self.factory.generate_data(week=self.week)
@@ -164,7 +658,7 @@ class TestScoreMemcache(unittest.TestCase):
             "Memcached exactly 1 item")
 
         result_str = memcache.get(tag)
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.GAME_WEEK],
             self.week,
@@ -175,6 +669,201 @@ class TestScoreMemcache(unittest.TestCase):
             "NFL game ID matches")
 
 
+    def test_save_tracks_versions(self):
+        """
+        The week's version only moves when a game changes
+        """
+        data = [
+            self.factory.generate_data(week=self.week),
+            self.factory.generate_data(week=self.week)
+        ]
+        tag = "SCORES_S2016W" + unicode(self.week)
+
+        data[1][d.NFL_GAME_ID] += 10000
+        self.score_memcache.save(self.week, data)
+        stored = GameRecordCodec().decode(memcache.get(tag))
+        version = stored['version']
+
+        self.score_memcache.save(self.week, data)
+        stored = GameRecordCodec().decode(memcache.get(tag))
+        self.assertEqual(
+            stored['version'],
+            version,
+            "Unchanged save keeps the version")
+
+        self.score_memcache.save(self.week, [{
+            d.GAME_WEEK: self.week,
+            d.NFL_GAME_ID: data[1][d.NFL_GAME_ID],
+            d.HOME_SCORE: data[1][d.HOME_SCORE] + 7
+        }])
+        stored = GameRecordCodec().decode(memcache.get(tag))
+        self.assertTrue(
+            stored['version'] > version,
+            "Changed game moves the version forward")
+        self.assertEqual(
+            stored['changes'][unicode(data[1][d.NFL_GAME_ID])],
+            stored['version'],
+            "Changed game is recorded at the new version")
+        self.assertEqual(
+            stored['changes'][unicode(data[0][d.NFL_GAME_ID])],
+            version,
+            "Unchanged game keeps its version")
+
+    def test_save_merges_concurrent_saves(self):
+        """
+        A save landing between another save's read and write is merged
+        rather than overwritten
+        """
+        data = [
+            self.factory.generate_data(week=self.week),
+            self.factory.generate_data(week=self.week)
+        ]
+        tag = "SCORES_S2016W" + unicode(self.week)
+        cas_multi = memcache.Client.cas_multi
+        concurrent = []
+
+        def save_in_between(client, values, time=0):
+            # Only the first write is raced
+            if len(concurrent) == 0:
+                concurrent.append(0)
+                concurrent[0] = ScoreMemcache().save(self.week, [{
+                    d.GAME_WEEK: self.week,
+                    d.NFL_GAME_ID: data[0][d.NFL_GAME_ID],
+                    d.HOME_SCORE: data[0][d.HOME_SCORE] + 3
+                }])
+
+            return cas_multi(client, values, time)
+
+        data[1][d.NFL_GAME_ID] += 10000
+        self.score_memcache.save(self.week, data)
+
+        with mock.patch.object(memcache.Client, 'cas_multi', autospec=True,
+                               side_effect=save_in_between):
+            result = self.score_memcache.save(self.week, [{
+                d.GAME_WEEK: self.week,
+                d.NFL_GAME_ID: data[1][d.NFL_GAME_ID],
+                d.HOME_SCORE: data[1][d.HOME_SCORE] + 7
+            }])
+
+        stored = GameRecordCodec().decode(memcache.get(tag))['data']
+        self.assertEqual(
+            (concurrent, result),
+            ([1], 1),
+            "Both saves were stored")
+        self.assertEqual(
+            [game[d.HOME_SCORE] for game in stored],
+            [data[0][d.HOME_SCORE] + 3, data[1][d.HOME_SCORE] + 7],
+            "Neither save dropped the other's game")
+
+    def test_save_gives_up_when_contended(self):
+        """
+        Weeks that never stop changing under a save are dropped, to be
+        refilled from the rest of the chain
+        """
+        data = [self.factory.generate_data(week=self.week)]
+        tag = "SCORES_S2016W" + unicode(self.week)
+
+        self.score_memcache.save(self.week, data)
+
+        with mock.patch.object(memcache.Client, 'cas_multi',
+                               side_effect=lambda values, time=0: list(values)) as cas_multi:
+            result = self.score_memcache.save(self.week, data)
+
+        self.assertEqual(
+            result,
+            0,
+            "Nothing was stored")
+        self.assertEqual(
+            cas_multi.call_count,
+            5,
+            "Retries are bounded")
+        self.assertIsNone(
+            memcache.get(tag),
+            "Contended week was dropped")
+
+    def test_version(self):
+        data = [self.factory.generate_data(week=self.week)]
+        tag = "SCORES_S2016W" + unicode(self.week)
+
+        self.assertIsNone(
+            self.score_memcache.version(self.week),
+            "No version without a stored week")
+
+        self.score_memcache.save(self.week, data)
+        self.assertEqual(
+            self.score_memcache.version(self.week),
+            GameRecordCodec().decode(memcache.get(tag))['version'],
+            "Version of the stored week")
+
+    def test_fetch_changes(self):
+        """
+        Only games changed after the given version are returned
+        """
+        data = [
+            self.factory.generate_data(week=self.week),
+            self.factory.generate_data(week=self.week)
+        ]
+        result = None
+
+        data[1][d.NFL_GAME_ID] += 10000
+        self.score_memcache.save(self.week, data)
+
+        result = self.score_memcache.fetch_changes(self.week, None)
+        self.assertTrue(
+            result['full'],
+            "No token gets the full week")
+        self.assertEqual(
+            len(result['data']),
+            2,
+            "Full week has every game")
+        version = result['version']
+
+        self.score_memcache.save(self.week, [{
+            d.GAME_WEEK: self.week,
+            d.NFL_GAME_ID: data[0][d.NFL_GAME_ID],
+            d.AWAY_SCORE: data[0][d.AWAY_SCORE] + 3
+        }])
+
+        result = self.score_memcache.fetch_changes(self.week, version)
+        self.assertFalse(
+            result['full'],
+            "Current token gets only the changes")
+        self.assertEqual(
+            [game[d.NFL_GAME_ID] for game in result['data']],
+            [data[0][d.NFL_GAME_ID]],
+            "Only the changed game is returned")
+
+        result = self.score_memcache.fetch_changes(self.week, result['version'])
+        self.assertEqual(
+            len(result['data']),
+            0,
+            "Nothing changed since the latest version")
+
+        result = self.score_memcache.fetch_changes(self.week, version - 1000)
+        self.assertTrue(
+            result['full'],
+            "Token older than the tracked history gets the full week")
+
+    def test_fetch_changes_reads_once(self):
+        """
+        Games and versions of a fresh week come from a single memcache read
+        """
+        data = [self.factory.generate_data(week=self.week)]
+
+        self.score_memcache.save(self.week, data)
+
+        with mock.patch('models.score.memcache.get', wraps=memcache.get) as get:
+            result = self.score_memcache.fetch_changes(self.week, None)
+
+        self.assertEqual(
+            get.call_count,
+            1,
+            "Week was read once")
+        self.assertEqual(
+            result['version'],
+            self.score_memcache.version(self.week),
+            "Token matches the games served")
+
     def test_tag_creation(self):
         tag = "SCORES_S2016W" + unicode(self.week)
 
@@ -216,7 +905,7 @@ class TestScoreMemcache(unittest.TestCase):
             "Memcached exactly 1 item")
 
         result_str = memcache.get(tag)
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][d.GAME_WEEK],
             self.week,
@@ -244,7 +933,7 @@ class TestScoreMemcache(unittest.TestCase):
             "Memcached exactly 1 item")
 
         result_str = memcache.get(tag)
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.GAME_WEEK],
             self.week,
@@ -253,7 +942,7 @@ class TestScoreMemcache(unittest.TestCase):
             result_dict['data'][0][d.NFL_GAME_ID],
             data[d.NFL_GAME_ID],
             "NFL game ID matches")
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.HOME_SCORE],
             data[d.HOME_SCORE],
@@ -276,7 +965,7 @@ class TestScoreMemcache(unittest.TestCase):
             "Memcached exactly 1 item")
 
         result_str = memcache.get(tag)
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.GAME_WEEK],
             self.week,
@@ -285,7 +974,7 @@ class TestScoreMemcache(unittest.TestCase):
             result_dict['data'][0][d.NFL_GAME_ID],
             update_data[d.NFL_GAME_ID],
             "NFL game ID matches")
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.HOME_SCORE],
             update_data[d.HOME_SCORE],
@@ -436,7 +1125,7 @@ class TestScoreMemcache(unittest.TestCase):
 
         # Validate preloaded data in memcache
         result_str = memcache.get(tag)
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.GAME_WEEK],
             self.week,
@@ -445,7 +1134,7 @@ class TestScoreMemcache(unittest.TestCase):
             result_dict['data'][0][d.NFL_GAME_ID],
             data[d.NFL_GAME_ID],
             "NFL game ID matches")
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.HOME_SCORE],
             data[d.HOME_SCORE],
@@ -470,7 +1159,7 @@ class TestScoreMemcache(unittest.TestCase):
             "Memcached exactly 1 item")
 
         result_str = memcache.get(tag)
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.GAME_WEEK],
             self.week,
@@ -479,7 +1168,7 @@ class TestScoreMemcache(unittest.TestCase):
             result_dict['data'][0][d.NFL_GAME_ID],
             update_data[d.NFL_GAME_ID],
             "NFL game ID matches")
-        result_dict = json.loads(result_str)
+        result_dict = GameRecordCodec().decode(result_str)
         self.assertEqual(
             result_dict['data'][0][d.HOME_SCORE],
             update_data[d.HOME_SCORE],
@@ -506,6 +1195,8 @@ class TestScoreDatastore(unittest.TestCase):
         self.testbed = testbed.Testbed()
         self.testbed.activate()
         self.testbed.init_datastore_v3_stub()
+        self.testbed.init_taskqueue_stub()
+        self.taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
 
         self.score_datastore = ScoreDatastore()
 
@@ -562,6 +1253,40 @@ class TestScoreDatastore(unittest.TestCase):
             data[d.GAME_WEEK],
             "Season week matches")
 
+    def test_fetch_async(self):
+        data = self.factory.generate_data(week=self.week)
+        ScoreModel(**data).put()
+
+        result = self.score_datastore.fetch_async(self.week).get_result()
+        self.assertEqual(
+            len(result),
+            1,
+            "Only 1 game in the datastore")
+        self.assertEqual(
+            result[0][d.NFL_GAME_ID],
+            data[d.NFL_GAME_ID],
+            "NFL game ID matches")
+
+    def test_fetch_many(self):
+        data = self.factory.generate_data(week=self.week)
+        other = self.factory.generate_data(week=self.week + 1)
+        ScoreModel(**data).put()
+        ScoreModel(**other).put()
+
+        result = self.score_datastore.fetch_many(
+            [self.week, self.week + 1, self.week + 2])
+        self.assertEqual(
+            result[self.week][0][d.NFL_GAME_ID],
+            data[d.NFL_GAME_ID],
+            "Games of the first week")
+        self.assertEqual(
+            result[self.week + 1][0][d.NFL_GAME_ID],
+            other[d.NFL_GAME_ID],
+            "Games of the second week")
+        self.assertIsNone(
+            result[self.week + 2],
+            "Nothing stored for the third week")
+
     def test_save_basic(self):
         """
         Test basic save operation
@@ -601,6 +1326,49 @@ class TestScoreDatastore(unittest.TestCase):
             result_arr[0].timestamp,
             "Timestamp is present")
 
+    def test_save_queues_changed_standings(self):
+        """
+        Only games whose score or status changed are rescored, by a task
+        """
+        data = self.factory.generate_data(week=self.week)
+
+        self.score_datastore.save(self.week, [data])
+        self.assertEqual(
+            len(self.taskqueue_stub.get_filtered_tasks()),
+            1,
+            "New game was queued")
+        self.taskqueue_stub.FlushQueue('default')
+
+        self.score_datastore.save(self.week, [data])
+        self.assertEqual(
+            len(self.taskqueue_stub.get_filtered_tasks()),
+            0,
+            "Unchanged game was not queued")
+
+        changed = dict(data, game_id=data[d.NFL_GAME_ID] + 1)
+        data[d.HOME_SCORE] += 7
+        self.score_datastore.save(self.week, [data, changed])
+        self.score_datastore.save(self.week, [changed])
+        tasks = self.taskqueue_stub.get_filtered_tasks()
+        self.assertEqual(
+            len(tasks),
+            1,
+            "Only the save that changed games was queued")
+
+        with mock.patch.object(Standings, 'update') as update:
+            deferred.run(tasks[0].payload)
+
+        (week, games) = update.call_args[0]
+        self.assertEqual(
+            week,
+            self.week,
+            "Standings of the week were updated")
+        self.assertEqual(
+            sorted((game[d.NFL_GAME_ID], game[d.HOME_SCORE]) for game in games),
+            [(data[d.NFL_GAME_ID], data[d.HOME_SCORE]),
+             (changed[d.NFL_GAME_ID], changed[d.HOME_SCORE])],
+            "Only the changed games were rescored")
+
     def test_save_updates(self):
         """
         Saving when a pre-existing entry is present leads to the data
@@ -745,6 +1513,102 @@ class TestScoreDatastore(unittest.TestCase):
             timestamp_static < result_arr[2].timestamp,
             "Game 2 timestamp is unchanged")
 
+    def test_save_uses_single_batch_put(self):
+        """
+        New and updated games are written together in one datastore put
+        """
+        data = [
+            self.factory.generate_data(week=self.week),
+            self.factory.generate_data(week=self.week),
+            self.factory.generate_data(week=self.week)
+        ]
+        result = 0
+
+        data[1][d.NFL_GAME_ID] += 10000
+        data[2][d.NFL_GAME_ID] += 30000
+
+        # Preload one game so the save is a mix of updates and inserts
+        ScoreModel(**data[0]).put()
+        data[0][d.HOME_SCORE] += 7
+
+        with mock.patch('models.score.db.put', wraps=db.put) as batch_put:
+            result = self.score_datastore.save(self.week, data)
+
+        self.assertEqual(
+            batch_put.call_count,
+            1,
+            "Datastore was written to exactly once")
+        self.assertEqual(
+            len(batch_put.call_args[0][0]),
+            3,
+            "Batch contained every game")
+        self.assertEqual(
+            result,
+            3,
+            "Saved exactly 3 entries")
+        self.assertEqual(
+            len(ScoreModel().all().fetch(4)),
+            3,
+            "Fetch exactly 3 entries")
+
+    def test_save_uses_derived_key(self):
+        """
+        Games are stored under a key derived from season, week and game_id,
+        so updates to them need no query
+        """
+        data = self.factory.generate_data(week=self.week)
+        key = ScoreModel.build_key(data[d.GAME_SEASON], self.week, data[d.NFL_GAME_ID])
+
+        self.score_datastore.save(self.week, [data])
+        self.assertIsNotNone(
+            db.get(key),
+            "Game is stored under its derived key")
+
+        data[d.HOME_SCORE] += 7
+        with mock.patch('models.score.db.GqlQuery') as query:
+            self.score_datastore.save(self.week, [dict(data)])
+
+        self.assertEqual(
+            query.call_count,
+            0,
+            "Update did not query the week")
+        self.assertEqual(
+            db.get(key).home_score,
+            data[d.HOME_SCORE],
+            "Data was updated")
+
+    def test_save_migrates_legacy_rows(self):
+        """
+        Rows stored under automatic ids are moved under their derived key
+        """
+        data = self.factory.generate_data(week=self.week)
+        key = ScoreModel.build_key(data[d.GAME_SEASON], self.week, data[d.NFL_GAME_ID])
+        legacy = ScoreModel(**data)
+        legacy.spread_odds = -3.5
+        legacy.put()
+
+        data[d.HOME_SCORE] += 7
+        del data[d.SPREAD_ODDS]
+        self.score_datastore.save(self.week, [data])
+
+        result_arr = ScoreModel().all().fetch(2)
+        self.assertEqual(
+            len(result_arr),
+            1,
+            "Legacy row was replaced")
+        self.assertEqual(
+            result_arr[0].key(),
+            key,
+            "Game moved under its derived key")
+        self.assertEqual(
+            result_arr[0].home_score,
+            data[d.HOME_SCORE],
+            "Data was updated")
+        self.assertEqual(
+            result_arr[0].spread_odds,
+            -3.5,
+            "Stored spread data was carried over")
+
     def test_stale_data_threshold(self):
         """
         Test against the threshold property for considering data as stale
@@ -892,6 +1756,13 @@ class TestScoreFilter(unittest.TestCase):
             score_filter.next,
             "Default doesn't have next in chain")
 
+    def test_fetch_many(self):
+        result = self.score_filter.fetch_many([self.week])
+        self.assertEqual(
+            result,
+            {self.week: self.test_data['expected_result']},
+            "Results are keyed by the weeks asked for")
+
     def test_fetch_basic(self):
         expected_result = self.test_data['expected_result']
         result = []
@@ -957,3 +1828,109 @@ class TestScoreFilter(unittest.TestCase):
             self.assertEqual(expected_result[key],
                              result[key],
                              'Result values match')
+
+
+class TestScoreIngester(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub()
+        self.testbed.init_urlfetch_stub()
+        # Create the mocked service & inject it into the testbed
+        self.fetch_mock = UrlFetchMock()
+        self.testbed._register_stub(testbed.URLFETCH_SERVICE_NAME, self.fetch_mock)
+        ScoreLocalCache.cache.flush()
+
+        self.feed = GameFeedFactory()
+        self.week = 11 + nfl.WEEK_PREFIX['REG']
+        self.saturday = datetime.datetime(2016, 10, 15, 18, 0, 0)
+        self.tuesday = datetime.datetime(2016, 10, 18, 18, 0, 0)
+
+    def tearDown(self):
+        ScoreLocalCache.cache.flush()
+        self.testbed.deactivate()
+
+    def __set_feed(self, data_type):
+        self.fetch_mock.set_return_values(
+            content=self.feed.generate_data(data_type=data_type).encode("UTF-8"),
+            final_url=(sb.URL_REG).encode("UTF-8"),
+            status_code=200)
+
+    def test_ingest_primes_chain(self):
+        self.__set_feed('REG')
+
+        result = ScoreIngester().ingest(self.tuesday)
+        self.assertTrue(
+            result['polled'],
+            "Scoreboard was polled without a previous run")
+        self.assertEqual(
+            result['week'],
+            self.week,
+            "Week comes from the feed")
+        self.assertEqual(
+            result['changed'],
+            2,
+            "Every game is new")
+        self.assertEqual(
+            len(ScoreDatastore().fetch_stored(self.week)),
+            2,
+            "Games were written to the datastore")
+
+        cached = ScoreMemcache(None).fetch(self.week)
+        self.assertEqual(
+            len(cached),
+            2,
+            "Memcache was primed with the full week")
+        self.assertEqual(
+            cached[0][d.SPREAD_ODDS],
+            0.0,
+            "Primed games carry the stored spread data")
+
+    def test_ingest_writes_only_changes(self):
+        self.__set_feed('REG')
+        ingester = ScoreIngester()
+        ingester.ingest(self.tuesday)
+
+        with mock.patch.object(ScoreIngester, 'in_game_window', return_value=True):
+            with mock.patch('models.score.db.put', wraps=db.put) as put:
+                result = ingester.ingest(self.tuesday)
+
+        self.assertTrue(
+            result['polled'],
+            "Scoreboard was polled within a game window")
+        self.assertEqual(
+            result['changed'],
+            0,
+            "Nothing changed between polls")
+        self.assertEqual(
+            put.call_count,
+            0,
+            "Unchanged games are not written")
+
+    def test_ingest_idles_outside_game_window(self):
+        self.__set_feed('REG')
+        ingester = ScoreIngester()
+        ingester.ingest(self.tuesday)
+
+        result = ingester.ingest(self.tuesday)
+        self.assertFalse(
+            result['polled'],
+            "Finished week is not polled again within the idle interval")
+
+    def test_in_game_window(self):
+        self.__set_feed('TST')
+        ingester = ScoreIngester()
+
+        self.assertTrue(
+            ingester.in_game_window(self.tuesday),
+            "No previous run is treated as a game window")
+
+        ingester.ingest(self.tuesday)
+        self.assertTrue(
+            ingester.in_game_window(self.saturday),
+            "Pregame game is played today")
+        self.assertFalse(
+            ingester.in_game_window(self.tuesday),
+            "No game is played today")
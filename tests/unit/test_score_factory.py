@@ -6,6 +6,7 @@ import unittest
 from models.score import ScoreFactory
 from models.score import Score
 from models.score import _ScoreDatastore
+from models.score import _ScoreLocalCache
 from models.score import _ScoreMemcache
 from models.score import _ScoreSource
 from models.score import _ScoreFilter
@@ -51,9 +52,12 @@ class TestScoreFactory(unittest.TestCase):
         self.assertIsNotNone(
             score.next.next.next,
             "Has a depth of 4")
-        self.assertIsNone(
+        self.assertIsNotNone(
             score.next.next.next.next,
-            "Doesn't have a depth of 5")
+            "Has a depth of 5")
+        self.assertIsNone(
+            score.next.next.next.next.next,
+            "Doesn't have a depth of 6")
 
     def test_depth_level_high_value(self):
         """
@@ -71,9 +75,12 @@ class TestScoreFactory(unittest.TestCase):
         self.assertIsNotNone(
             score.next.next.next,
             "Has a depth of 4")
-        self.assertIsNone(
+        self.assertIsNotNone(
             score.next.next.next.next,
-            "Doesn't have a depth of 5")
+            "Has a depth of 5")
+        self.assertIsNone(
+            score.next.next.next.next.next,
+            "Doesn't have a depth of 6")
 
     def test_depth_level_none(self):
         """
@@ -167,21 +174,27 @@ class TestScoreFactory(unittest.TestCase):
             score.next,
             "Has a depth of at least 2")
         self.assertTrue(
-            isinstance(score.next, _ScoreMemcache),
-            "ScoreMemcache is next in chain" )
+            isinstance(score.next, _ScoreLocalCache),
+            "ScoreLocalCache is next in chain" )
         self.assertIsNotNone(
             score.next.next,
             "Has a depth of at least 3")
         self.assertTrue(
-            isinstance(score.next.next, _ScoreDatastore),
-            "ScoreDatastore is next in chain" )
+            isinstance(score.next.next, _ScoreMemcache),
+            "ScoreMemcache is next in chain" )
         self.assertIsNotNone(
             score.next.next.next,
             "Has a depth of at least 4")
         self.assertTrue(
-            isinstance(score.next.next.next, _ScoreSource),
+            isinstance(score.next.next.next, _ScoreDatastore),
+            "ScoreDatastore is next in chain" )
+        self.assertIsNotNone(
+            score.next.next.next.next,
+            "Has a depth of at least 5")
+        self.assertTrue(
+            isinstance(score.next.next.next.next, _ScoreSource),
             "ScoreSource is next in chain" )
         self.assertIsNone(
-            score.next.next.next.next,
-            'Does not have a depth of 5')
+            score.next.next.next.next.next,
+            'Does not have a depth of 6')
 
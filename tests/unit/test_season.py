@@ -0,0 +1,115 @@
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+from models.season import SeasonCalculator
+from models.tally import TallyCalculator
+
+class TestSeasonCalculator(unittest.TestCase):
+    def setUp(self):
+        self.teams = ['HOU', 'SD', 'DAL', 'NYG', 'SF', 'KC']
+        self.random = random.Random(1234)
+
+    def __game(self, game_id):
+        (home_name, away_name) = self.random.sample(self.teams, 2)
+
+        return {
+            'away_name': away_name,
+            'away_score': self.random.randint(0, 40),
+            'home_name': home_name,
+            'home_score': self.random.randint(0, 40),
+            'game_id': game_id,
+            'spread_odds': self.random.choice([-7.0, -3.5, -3.0, 0.0, 3.0, 6.5]),
+            'spread_margin': self.random.choice([38.0, 41.5, 44.0, 47.5, 50.0])
+        }
+
+    def __player(self, week, owner, games):
+        player = {
+            'year': 2016,
+            'week': week,
+            'owner': owner
+        }
+
+        for game in games:
+            # Some games are left unpicked, and picks vary in length
+            pick = [self.random.choice(self.teams)]
+            if self.random.random() < 0.8:
+                pick.append(self.random.choice(['OV', 'UN']))
+                if self.random.random() < 0.5:
+                    pick.append(unicode(self.random.randint(30, 60)))
+
+            if self.random.random() < 0.9:
+                player[unicode(game['game_id'])] = pick
+
+        return player
+
+    def __season(self, weeks, owners, games_per_week):
+        result = []
+
+        for week in weeks:
+            games = [self.__game(week * 100 + index) for index in range(games_per_week)]
+            spreads = [self.__player(week, "Owner" + unicode(index), games)
+                       for index in range(owners)]
+            result.append((week, games, spreads))
+
+        return result
+
+    def test_identical_to_weekly_count(self):
+        season = self.__season(range(201, 218), 12, 16)
+        calculator = TallyCalculator()
+
+        result = SeasonCalculator().tally(season)
+        for (week, score_data, spreads_data) in season:
+            self.assertEqual(
+                result[week],
+                calculator.tally(score_data, spreads_data),
+                "Week " + unicode(week) + " matches the weekly count")
+
+    def test_known_answers(self):
+        score_data = [{
+            'away_name': 'HOU',
+            'away_score': 28,
+            'home_name': 'SD',
+            'home_score': 31,
+            'game_id': 1234,
+            'spread_odds': -3.5,
+            'spread_margin': 49.5,
+        }]
+        spreads_data = [
+            {'year': 2013, 'week': 201, 'owner': 'MegaMan', '1234': ['HOU', 'UN', '49']},
+            {'year': 2013, 'week': 201, 'owner': 'Zero', '1234': ['HOU', 'OV', '59']},
+            {'year': 2013, 'week': 201, 'owner': 'Bass', '1234': ['SD', 'OV', '58']}
+        ]
+
+        result = SeasonCalculator().tally([(201, score_data, spreads_data)])
+        self.assertEqual(
+            [tally['score'] for tally in result[201]],
+            [1, 4, 2],
+            "Expected results received")
+
+    def test_weeks_without_picks(self):
+        result = SeasonCalculator().tally([
+            (201, [self.__game(1)], []),
+            (202, [], [{'year': 2016, 'week': 202, 'owner': 'Zero'}])
+        ])
+
+        self.assertFalse(
+            201 in result,
+            "Weeks without players have no tallies")
+        self.assertEqual(
+            result[202][0]['score'],
+            0,
+            "Players without games score nothing")
+
+    def test_teams_outside_league(self):
+        self.teams = ['STL', 'LA', 'SD', 'Baltimore Ravens']
+        season = self.__season([201, 202], 4, 8)
+        calculator = TallyCalculator()
+
+        result = SeasonCalculator().tally(season)
+        for (week, score_data, spreads_data) in season:
+            self.assertEqual(
+                result[week],
+                calculator.tally(score_data, spreads_data),
+                "Teams outside the league index match by name")
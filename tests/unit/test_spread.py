@@ -153,6 +153,29 @@ class TestSpreadMemcache(unittest.TestCase):
                     game[item],
                     unicode(item) + " is equal")
 
+    def test_fetch_async(self):
+        data = DataBlobFactory().generate_data(
+            timestamp=self.timestamp, type="spread")
+        tag = "SPREAD_S2016W" + unicode(self.week)
+        memcache.add(tag, json.dumps(data))
+
+        future = self.spread_memcache.fetch_async(self.week)
+        self.assertEqual(
+            future.get_result(),
+            self.spread_memcache.fetch(self.week),
+            "Same result as fetch")
+
+    def test_fetch_many(self):
+        data = DataBlobFactory().generate_data(
+            timestamp=self.timestamp, type="spread")
+        memcache.add("SPREAD_S2016W" + unicode(self.week), json.dumps(data))
+
+        result = self.spread_memcache.fetch_many([self.week, self.week + 1])
+        self.assertEqual(
+            result,
+            {self.week: [data["data"]], self.week + 1: None},
+            "Only the cached week was found")
+
     def test_tag_creation(self):
         tag = u"SPREAD_S2016W" + unicode(self.week)
 
@@ -188,7 +211,7 @@ class TestSpreadMemcache(unittest.TestCase):
             result_str,
             "Memcache hit")
 
-        result_arr = json.loads(result_str)
+        result_arr = self.spread_memcache.codec.decode(result_str)
         self.assertEqual(
             len(result_arr["data"]),
             1,
@@ -223,7 +246,7 @@ class TestSpreadMemcache(unittest.TestCase):
             result_str,
             "Memcache hit")
 
-        result_arr = json.loads(result_str)
+        result_arr = self.spread_memcache.codec.decode(result_str)
         for i in range(0, len(result_arr["data"])):
             for item in data[i]:
                 self.assertEqual(
@@ -315,6 +338,31 @@ class TestSpreadDatastore(unittest.TestCase):
                 result[key],
                 'Value for key "' + key + '" matches')
 
+    def test_fetch_async(self):
+        test_data = self.factory.generate_data(week=self.week, type='spread')
+        test_data[self.game_id] = ['San Francisco']
+        SpreadModel(**test_data).put()
+
+        result = self.datastore.fetch_async(self.week).get_result()
+        self.assertEqual(
+            result,
+            self.datastore.fetch(self.week),
+            "Same result as fetch")
+
+    def test_fetch_many(self):
+        test_data = self.factory.generate_data(week=self.week, type='spread')
+        test_data[self.game_id] = ['San Francisco']
+        SpreadModel(**test_data).put()
+
+        result = self.datastore.fetch_many([self.week, self.week + 1])
+        self.assertEqual(
+            result[self.week],
+            self.datastore.fetch(self.week),
+            "Same result as fetch")
+        self.assertIsNone(
+            result[self.week + 1],
+            "Nothing stored for the second week")
+
     def test_basic_save(self):
         test_data = self.factory.generate_data(week=self.week, type='spread')
         test_data[self.game_id] = ['Green Bay']
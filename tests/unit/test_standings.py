@@ -0,0 +1,277 @@
+from __future__ import unicode_literals
+
+import datetime
+import unittest
+
+from google.appengine.ext import testbed
+
+from lib.constants import NFL as nfl
+
+from models.standings import SeasonStandings
+from models.standings import Standings
+from models.standings import StandingsModel
+from models.standings import score_categories
+from models.standings import score_game
+
+class TestScoreGame(unittest.TestCase):
+    def setUp(self):
+        self.game = {
+            'away_name': 'HOU',
+            'away_score': 28,
+            'home_name': 'SD',
+            'home_score': 31,
+            'game_id': 1234,
+            'spread_odds': -3.5,
+            'spread_margin': 49.5,
+        }
+
+    def test_score_game(self):
+        answer_key = [
+            (['HOU', 'UN', '49'], 1),
+            (['HOU', 'OV', '59'], 4),
+            (['SD', 'OV', '58'], 2),
+            (['SD'], 0),
+            (['HOU'], 1)
+        ]
+
+        for (pick, expected_result) in answer_key:
+            self.assertEqual(
+                score_game({'1234': pick}, self.game),
+                expected_result,
+                'Expected result received (' + unicode(expected_result) + ')')
+
+    def test_score_categories(self):
+        self.assertEqual(
+            score_categories({'1234': ['HOU', 'OV', '59']}, self.game),
+            {'spread': 1, 'over_under': 1, 'total': 2},
+            "Points are split by category")
+
+    def test_score_game_not_picked(self):
+        self.assertEqual(
+            score_game({'4321': ['HOU']}, self.game),
+            0,
+            "No points for games that were not picked")
+
+class TestStandings(unittest.TestCase):
+    class TestMockSpread(object):
+        def __init__(self, test_data):
+            self.test_data = test_data
+            self.fetch_count = 0
+
+        def fetch(self, week):
+            self.fetch_count += 1
+            return self.test_data
+
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+
+        self.timestamp = int(datetime.datetime.now().strftime('%s'))
+        self.week = self.timestamp % 1000 + 100
+        self.spreads = self.TestMockSpread([
+            {
+                'year': nfl.YEAR,
+                'week': self.week,
+                'owner': 'MegaMan',
+                '1234': ['HOU', 'UN', '49'],
+                '1235': ['DAL']
+            },
+            {
+                'year': nfl.YEAR,
+                'week': self.week,
+                'owner': 'Zero',
+                '1234': ['HOU', 'OV', '59']
+            }
+        ])
+        self.games = [
+            {
+                'away_name': 'HOU',
+                'away_score': 28,
+                'home_name': 'SD',
+                'home_score': 31,
+                'game_id': 1234,
+                'spread_odds': -3.5,
+                'spread_margin': 49.5,
+            },
+            {
+                'away_name': 'DAL',
+                'away_score': 0,
+                'home_name': 'NYG',
+                'home_score': 0,
+                'game_id': 1235,
+                'spread_odds': 3.0,
+                'spread_margin': 44.0,
+            }
+        ]
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def __scores(self, result):
+        return dict((tally['owner'], tally['score']) for tally in result)
+
+    def test_fetch_missing(self):
+        self.assertIsNone(
+            Standings(self.spreads).fetch(self.week),
+            "Week has no standings yet")
+
+    def test_rebuild(self):
+        standings = Standings(self.spreads)
+
+        result = standings.rebuild(self.week, self.games)
+        self.assertEqual(
+            self.__scores(result),
+            {'MegaMan': 1, 'Zero': 4},
+            "Every game was scored")
+        self.assertEqual(
+            standings.fetch(self.week),
+            result,
+            "Standings were stored")
+
+    def test_update_rescores_changed_games(self):
+        standings = Standings(self.spreads)
+        standings.rebuild(self.week, self.games)
+
+        changed = dict(self.games[1], away_score=14)
+        self.assertEqual(
+            standings.update(self.week, [changed]),
+            2,
+            "Every owner was updated")
+        self.assertEqual(
+            self.__scores(standings.fetch(self.week)),
+            {'MegaMan': 2, 'Zero': 4},
+            "Only the changed game was rescored")
+
+    def test_update_without_standings(self):
+        standings = Standings(self.spreads)
+
+        self.assertEqual(
+            standings.update(self.week, self.games),
+            0,
+            "Nothing to update")
+        self.assertEqual(
+            self.spreads.fetch_count,
+            0,
+            "Picks were not fetched")
+        self.assertIsNone(
+            standings.fetch(self.week),
+            "Partial standings were not stored")
+
+    def test_invalidate(self):
+        standings = Standings(self.spreads)
+        standings.rebuild(self.week, self.games)
+
+        Standings().invalidate(self.week)
+        self.assertIsNone(
+            StandingsModel.get(StandingsModel.build_key(nfl.YEAR, self.week)),
+            "Standings were dropped")
+
+class TestSeasonStandings(unittest.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+
+        self.year = 2013
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def __tally(self, owner, spread, over_under, total):
+        return {
+            'owner': owner,
+            'score': spread + over_under + total,
+            'spread': spread,
+            'over_under': over_under,
+            'total': total
+        }
+
+    def test_fetch_missing(self):
+        self.assertIsNone(
+            SeasonStandings().fetch(self.year),
+            "Season has no standings yet")
+
+    def test_update_ranks_season(self):
+        standings = SeasonStandings()
+
+        standings.update(self.year, 201, [
+            self.__tally('MegaMan', 3, 2, 1),
+            self.__tally('Zero', 2, 2, 0),
+            self.__tally('Bass', 1, 0, 0)
+        ])
+        standings.update(self.year, 202, [
+            self.__tally('MegaMan', 1, 0, 0),
+            self.__tally('Zero', 3, 1, 0),
+            self.__tally('Bass', 2, 1, 0)
+        ])
+
+        result = standings.fetch(self.year)['standings']
+        self.assertEqual(
+            [(item['rank'], item['owner'], item['points']) for item in result],
+            [(1, 'Zero', 8), (2, 'MegaMan', 7), (3, 'Bass', 4)],
+            "Owners are ranked by their season points")
+        self.assertEqual(
+            (result[0]['spread'], result[0]['over_under'], result[0]['total'], result[0]['weeks']),
+            (5, 3, 0, 2),
+            "Categories add up over the season")
+
+    def test_update_replaces_week(self):
+        standings = SeasonStandings()
+
+        standings.update(self.year, 201, [
+            self.__tally('MegaMan', 3, 2, 1),
+            self.__tally('Zero', 3, 2, 1)
+        ])
+        # A week tallied again replaces its earlier tally
+        standings.update(self.year, 201, [self.__tally('Zero', 1, 0, 0)])
+
+        result = standings.fetch(self.year)['standings']
+        self.assertEqual(
+            [(item['rank'], item['owner'], item['points']) for item in result],
+            [(1, 'MegaMan', 6), (2, 'Zero', 1)],
+            "Week was counted once")
+
+    def test_tied_owners_share_rank(self):
+        standings = SeasonStandings()
+
+        standings.update(self.year, 201, [
+            self.__tally('MegaMan', 1, 1, 0),
+            self.__tally('Zero', 2, 0, 0),
+            self.__tally('Bass', 1, 0, 0)
+        ])
+
+        result = standings.fetch(self.year)['standings']
+        self.assertEqual(
+            [item['rank'] for item in result],
+            [1, 1, 3],
+            "Tied owners share a rank")
+
+    def test_rebuild(self):
+        standings = SeasonStandings()
+
+        standings.update(self.year, 201, [self.__tally('Bass', 9, 9, 9)])
+
+        result = standings.rebuild(self.year, [
+            dict(self.__tally('MegaMan', 3, 2, 1), week=201),
+            dict(self.__tally('Zero', 2, 2, 0), week=201),
+            dict(self.__tally('MegaMan', 1, 0, 0), week=202),
+            dict(self.__tally('Zero', 3, 1, 0), week=202)
+        ])
+        self.assertEqual(
+            result,
+            standings.fetch(self.year),
+            "Rebuilt standings were stored")
+        self.assertEqual(
+            [(item['rank'], item['owner'], item['points'], item['weeks'])
+             for item in result['standings']],
+            [(1, 'Zero', 8, 2), (2, 'MegaMan', 7, 2)],
+            "Season was ranked from the given tallies only")
+
+    def test_rebuild_without_tallies(self):
+        self.assertIsNone(
+            SeasonStandings().rebuild(self.year, []),
+            "Season without tallies has no standings")
+        self.assertIsNone(
+            SeasonStandings().fetch(self.year),
+            "Nothing was stored")
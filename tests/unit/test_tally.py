@@ -1,12 +1,16 @@
 from __future__ import unicode_literals
 
 import datetime
+import mock
 import unittest
 
 from google.appengine.api import memcache
+from google.appengine.ext import db
+from google.appengine.ext import deferred
 from google.appengine.ext import testbed
 
 
+from models.standings import SeasonStandings
 from models.tally import TallyModel
 from models.tally import _TallyDatastore as TallyDatastore
 from models.tally import TallyCalculator
@@ -14,6 +18,7 @@ from models.tally import TallyCalculator
 from models.spread import SpreadFactory
 from models.score import ScoreFactory
 from models.score import ScoreModel
+from models.score import _ScoreLocalCache as ScoreLocalCache
 
 from test_lib.mock_service import UrlFetchMock
 
@@ -217,18 +222,129 @@ class TestTallyDatastore(unittest.TestCase):
                                  getattr(result[0], key), 
                                  'Value for key "' + key + '" matches')
 
+    def test_save_dedupes_owner(self):
+        data = [
+            {
+                'year': 2013,
+                'week': self.week,
+                'owner': 'MegaMan',
+                'score': 10
+            }
+        ]
+
+        # Earlier saves could leave an owner with several rows in a week
+        TallyModel(**data[0]).put()
+        TallyModel(**data[0]).put()
+
+        data[0]['score'] = 14
+        self.assertEqual(
+            len(data),
+            self.datastore.save(self.week, data),
+            'Datastore saved the correct amount')
+
+        result = TallyModel.all().fetch(3)
+        self.assertEqual(
+            len(result),
+            1,
+            'Owner has a single tally')
+        self.assertEqual(
+            result[0].key(),
+            TallyModel.build_key(2013, self.week, 'MegaMan'),
+            'Tally is stored under its derived key')
+        self.assertEqual(
+            result[0].score,
+            14,
+            'Tally was updated')
+
+    def test_save_uses_single_batch_put(self):
+        data = [
+            {
+                'year': 2013,
+                'week': self.week,
+                'owner': owner,
+                'score': 8
+            } for owner in ['MegaMan', 'Zero', 'Bass']
+        ]
+
+        TallyModel(**data[0]).put()
+
+        with mock.patch('models.tally.db.put', wraps=db.put) as batch_put:
+            self.datastore.save(self.week, data)
+
+        self.assertEqual(
+            batch_put.call_count,
+            1,
+            'Datastore was written to exactly once')
+        self.assertEqual(
+            len(TallyModel.all().fetch(4)),
+            3,
+            'Datastore has the correct amount')
+
+    def test_save_updates_season_standings(self):
+        data = [
+            {
+                'year': 2013,
+                'week': self.week,
+                'owner': 'MegaMan',
+                'score': 3,
+                'spread': 1,
+                'over_under': 0,
+                'total': 2
+            }
+        ]
+
+        self.datastore.save(self.week, data)
+
+        result = SeasonStandings().fetch(2013)
+        self.assertEqual(
+            result['standings'][0]['owner'],
+            'MegaMan',
+            'Owner is in the season standings')
+        self.assertEqual(
+            result['standings'][0]['points'],
+            3,
+            'Season standings have the tally')
+
+    def test_save_counts_earlier_weeks_in_season(self):
+        """
+        Weeks tallied before the season's standings were kept are not lost
+        """
+        TallyModel(year=2013, week=self.week - 1, owner='MegaMan', score=2, spread=2).put()
+        TallyModel(year=2013, week=self.week - 1, owner='Zero', score=4, spread=4).put()
+
+        self.datastore.save(self.week, [{
+            'year': 2013,
+            'week': self.week,
+            'owner': 'MegaMan',
+            'score': 3,
+            'spread': 3,
+            'over_under': 0,
+            'total': 0
+        }])
+
+        result = SeasonStandings().fetch(2013)['standings']
+        self.assertEqual(
+            [(item['owner'], item['points'], item['weeks']) for item in result],
+            [('MegaMan', 5, 2), ('Zero', 4, 1)],
+            'Earlier week was counted in')
+
 class TestTallyCalculator(unittest.TestCase):
     def setUp(self):
         self.testbed = testbed.Testbed()
         self.testbed.activate()
         self.testbed.init_datastore_v3_stub()
         self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub()
         self.testbed.init_urlfetch_stub()
+        self.taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
 
         # Create the mocked service & inject it into the testbed
         self.fetch_mock = UrlFetchMock()
         self.testbed._register_stub(testbed.URLFETCH_SERVICE_NAME, self.fetch_mock)
 
+        # Weeks cached in-process by earlier tests would mask this one's data
+        ScoreLocalCache.cache.flush()
+
         self.timestamp = int(datetime.datetime.now().strftime('%s'))
         self.week = self.timestamp % 1000 + 100
 
@@ -306,3 +422,73 @@ class TestTallyCalculator(unittest.TestCase):
                 'Expected result received (' + unicode(expected_result) + ')')
 
 
+
+    def __run_tasks(self):
+        """
+        Runs the tasks queued so far, as the queue would
+        """
+        for task in self.taskqueue_stub.get_filtered_tasks():
+            deferred.run(task.payload)
+
+        self.taskqueue_stub.FlushQueue('default')
+
+    def test_standings_follow_score_changes(self):
+        spread_data = [
+            {
+                'year': 2013,
+                'week': self.week,
+                'owner': 'MegaMan',
+                '1234': ['HOU', 'UN', '49']
+            },
+            {
+                'year': 2013,
+                'week': self.week,
+                'owner': 'Zero',
+                '1234': ['HOU', 'OV', '59']
+            },
+            {
+                'year': 2013,
+                'week': self.week,
+                'owner': 'Bass',
+                '1234': ['SD', 'OV', '58']
+            }
+        ]
+        score_data = [
+            {
+                'year': 2013,
+                'week': self.week,
+                'away_name': 'HOU',
+                'away_score': 28,
+                'home_name': 'SD',
+                'home_score': 31,
+                'game_id': 1234,
+                'spread_odds': -3.5,
+                'spread_margin': 49.5,
+            }
+        ]
+
+        score = ScoreFactory().get_instance(depth=4)
+        score.save(self.week, score_data)
+        SpreadFactory().get_instance().save(self.week, spread_data)
+        self.__run_tasks()
+
+        tallyator = TallyCalculator()
+        result = tallyator.standings(self.week)
+        self.assertEqual(
+            dict((tally['owner'], tally['score']) for tally in result),
+            {'MegaMan': 1, 'Zero': 4, 'Bass': 2},
+            'Standings were built from the week')
+
+        score.save(self.week, [{
+            'year': 2013,
+            'week': self.week,
+            'game_id': 1234,
+            'home_score': 20
+        }])
+        self.__run_tasks()
+
+        result = tallyator.standings(self.week)
+        self.assertEqual(
+            dict((tally['owner'], tally['score']) for tally in result),
+            {'MegaMan': 3, 'Zero': 1, 'Bass': 0},
+            'Standings follow the saved game')
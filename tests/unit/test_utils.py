@@ -2,8 +2,11 @@
 from __future__ import unicode_literals
 
 import datetime
+import mock
 import unittest
 
+from lib.constants import CONSTANTS as c
+from lib.constants import DATA_BLOB as d
 from lib.constants import NFL as nfl
 from lib.utils import Utils as utils
 
@@ -13,4 +16,103 @@ class TestUtils(unittest.TestCase):
         current_week = (time_delta.days/7)+1
 
         week = utils.default_week()
-        self.assertEqual(current_week, week)
\ No newline at end of file
+        self.assertEqual(current_week, week)
+
+    def test_game_status(self):
+        self.assertTrue(utils.is_final("Final"), "Final is final")
+        self.assertTrue(utils.is_final("Final Overtime"), "Final Overtime is final")
+        self.assertFalse(utils.is_final("Pregame"), "Pregame is not final")
+        self.assertTrue(utils.is_live("3"), "Quarter is live")
+        self.assertTrue(utils.is_live("Halftime"), "Halftime is live")
+        self.assertFalse(utils.is_live("Pregame"), "Pregame is not live")
+        self.assertFalse(utils.is_live("Final"), "Final is not live")
+        self.assertFalse(utils.is_live(""), "Unknown status is not live")
+
+    def test_is_game_day(self):
+        # Sunday 8:30pm Eastern is past midnight UTC
+        now = datetime.datetime(2016, 10, 17, 1, 30, 0)
+
+        self.assertTrue(utils.is_game_day("Sun", now), "Sunday night game")
+        self.assertFalse(utils.is_game_day("Mon", now), "Monday is tomorrow")
+
+        # Half past midnight Eastern is Monday in October, Sunday in January
+        self.assertTrue(
+            utils.is_game_day("Mon", datetime.datetime(2016, 10, 17, 4, 30, 0)),
+            "Daylight saving time")
+        self.assertTrue(
+            utils.is_game_day("Sun", datetime.datetime(2017, 1, 2, 4, 30, 0)),
+            "Standard time")
+
+    def test_eastern_offset(self):
+        # 2016 daylight saving time ran from March 13 to November 6
+        for (now, offset) in [
+                (datetime.datetime(2016, 3, 13, 6, 59, 0), -5),
+                (datetime.datetime(2016, 3, 13, 7, 0, 0), -4),
+                (datetime.datetime(2016, 9, 11, 17, 0, 0), -4),
+                (datetime.datetime(2016, 11, 6, 5, 59, 0), -4),
+                (datetime.datetime(2016, 11, 6, 6, 0, 0), -5),
+                (datetime.datetime(2017, 1, 1, 18, 0, 0), -5)]:
+            self.assertEqual(
+                utils.eastern_offset(now),
+                offset,
+                "Eastern offset at " + unicode(now))
+
+    @mock.patch.object(utils, 'default_week', return_value=11)
+    def test_score_ttl(self, default_week):
+        week = nfl.WEEK_PREFIX['REG'] + 11
+        not_today = [day for day in c.DAYS
+                     if not utils.is_game_day(day)][0]
+        final = {d.GAME_STATUS: "Final", d.GAME_DAY: "Sun"}
+        live = {d.GAME_STATUS: "2", d.GAME_DAY: "Sun"}
+        pregame = {d.GAME_STATUS: "Pregame", d.GAME_DAY: not_today}
+
+        self.assertIsNone(
+            utils.score_ttl(week - 1, [live]),
+            "Past weeks never change")
+        self.assertIsNone(
+            utils.score_ttl(week, [final, dict(final, game_status="Final Overtime")]),
+            "Finished weeks never change")
+        self.assertEqual(
+            utils.score_ttl(week, [final, live, pregame]),
+            c.LIVE_THRESHOLD,
+            "Live games are short lived")
+        self.assertEqual(
+            utils.score_ttl(week, [final, pregame]),
+            c.PREGAME_THRESHOLD,
+            "Pregame slates are hour-scale")
+        self.assertEqual(
+            utils.score_ttl(week, [dict(pregame, game_day=
+                [day for day in c.DAYS if utils.is_game_day(day)][0])]),
+            c.LIVE_THRESHOLD,
+            "Games kicking off today are short lived")
+        self.assertEqual(
+            utils.score_ttl(week, [], 42),
+            42,
+            "Default without games")
+
+    @mock.patch.object(utils, 'default_week', return_value=19)
+    def test_score_ttl_postseason(self, default_week):
+        week = nfl.WEEK_PREFIX['POS'] + 19
+        live = {d.GAME_STATUS: "2", d.GAME_DAY: "Sun"}
+
+        self.assertEqual(
+            utils.score_ttl(week, [live]),
+            c.LIVE_THRESHOLD,
+            "Live playoff games are short lived")
+        self.assertEqual(
+            utils.score_ttl(19, [live]),
+            c.LIVE_THRESHOLD,
+            "Weeks without a prefix are in the current part of the season")
+        self.assertIsNone(
+            utils.score_ttl(week - 1, [live]),
+            "Past playoff weeks never change")
+        self.assertIsNone(
+            utils.score_ttl(nfl.WEEK_PREFIX['REG'] + 17, [live]),
+            "Regular season weeks never change")
+        self.assertEqual(
+            utils.score_ttl(nfl.WEEK_PREFIX['POS'] + 2, [live]),
+            c.LIVE_THRESHOLD,
+            "Playoff weeks numbered from 1 are live")
+        self.assertIsNone(
+            utils.score_ttl(nfl.WEEK_PREFIX['POS'] + 1, [live]),
+            "Past playoff weeks numbered from 1 never change")